@@ -1,4 +1,5 @@
 from pathlib import Path
+import os
 from datetime import timedelta
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -27,6 +28,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'diary.usage.LLMUsageScopeMiddleware',  # LLM 사용량 기록 대상(사용자, URL) 지정
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -58,11 +60,121 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE=postgres 이면 PostgreSQL, 아니면 SQLite (로컬 개발용)
+DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgres':
+    # DB_POOL=1 이면 psycopg 커넥션 풀 사용 (psycopg[pool] 필요, 풀과 CONN_MAX_AGE 는 함께 쓸 수 없음)
+    # 아니면 요청이 끝나도 CONN_MAX_AGE 초 동안 커넥션을 재사용
+    DB_POOL = os.getenv('DB_POOL', '0') == '1'
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('POSTGRES_DB', 'diary'),
+            'USER': os.getenv('POSTGRES_USER', 'diary'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
+            'PORT': os.getenv('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': 0 if DB_POOL else int(os.getenv('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+                    'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 20)),
+                    'timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+                },
+            } if DB_POOL else {},
+        }
     }
+else:
+    # 동시 쓰기 시 'database is locked' 를 줄이기 위한 설정
+    # - WAL: 읽기와 쓰기가 서로 막지 않음
+    # - timeout(busy_timeout): 잠금이 풀릴 때까지 바로 실패하지 않고 기다림
+    # - IMMEDIATE: 트랜잭션 시작 시 쓰기 잠금을 잡아서, 읽기 → 쓰기 승격 도중 잠금 충돌(대기 없이 실패)을 방지
+    SQLITE_BUSY_TIMEOUT = int(os.getenv('SQLITE_BUSY_TIMEOUT', 20))  # 초
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                'timeout': SQLITE_BUSY_TIMEOUT,
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'  # WAL 에서는 NORMAL 로도 커밋 내용이 손상되지 않음
+                    f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT * 1000};'
+                    'PRAGMA temp_store=MEMORY;'
+                    'PRAGMA cache_size=-20000;'  # 약 20MB
+                    'PRAGMA mmap_size=134217728;'  # 128MB
+                ),
+            },
+        }
+    }
+
+# 캐시 (LLM 쿼터 카운터, 조회 API 응답/인증 사용자 캐시, LLM_CACHE 'django' 백엔드에서 사용)
+# REDIS_URL 이 있으면 Redis (redis 패키지 필요, 여러 프로세스가 캐시를 공유), 없으면 프로세스 내부 메모리
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': os.getenv('CACHE_KEY_PREFIX', 'diary'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'diary',
+            'OPTIONS': {'MAX_ENTRIES': int(os.getenv('LOCMEM_CACHE_MAX_ENTRIES', 10000))},
+        }
+    }
+
+# 조회 API 응답 / 인증 사용자 캐시 (diary/read_cache.py 기본값 덮어쓰기)
+# 무효화가 모든 워커에 보이도록 공유 캐시(REDIS_URL)일 때만 사용, 프로세스가 하나면 READ_CACHE_ALLOW_LOCAL=1 로 허용
+READ_CACHE = {
+    'ENABLED': os.getenv('READ_CACHE', '1') != '0',
+    'TTL': 60 * 10,
+    'AUTH_USER_TTL': 60 * 5,
+    'ALLOW_LOCAL_CACHE': os.getenv('READ_CACHE_ALLOW_LOCAL', '0') == '1',
+}
+
+# LLM 응답 캐시 (diary/llm_cache.py)
+# BACKEND: 'locmem'(프로세스 내부 LRU) | 'django'(CACHES 사용) | 'db'(LLMResponseCache 테이블) | None
+LLM_CACHE = {
+    'BACKEND': 'locmem',
+    'MAX_ENTRIES': 1000,
+    'TTL': 60 * 60 * 24,
+}
+
+# LLM 호출 제한 / 재시도 / 서킷 브레이커 (diary/llm_gateway.py 기본값 덮어쓰기)
+LLM_GATEWAY = {
+    'MAX_CONCURRENCY': int(os.getenv('LLM_MAX_CONCURRENCY', 16)),
+    'TIMEOUT': float(os.getenv('LLM_TIMEOUT', 30)),
+}
+
+# 일기 의미 검색 (diary/embeddings.py 기본값 덮어쓰기)
+# BACKEND: 'hashing'(외부 호출 없는 결정적 임베더) | 'openai'(임베딩 API)
+EMBEDDINGS = {
+    'BACKEND': os.getenv('EMBEDDINGS_BACKEND', 'hashing'),
+    'MODEL': os.getenv('EMBEDDINGS_MODEL', 'text-embedding-3-small'),
+    'DIMENSIONS': int(os.getenv('EMBEDDINGS_DIMENSIONS', 256)),
+}
+
+# LLM 호출 쿼터, '횟수/기간(s, m, h, d)' 또는 None (diary/quotas.py 기본값 덮어쓰기)
+LLM_QUOTA = {
+    'USER_REQUESTS': os.getenv('LLM_QUOTA_USER_REQUESTS', '20/m'),
+    'USER_TOKENS': os.getenv('LLM_QUOTA_USER_TOKENS', '200000/d'),
+    'GLOBAL_REQUESTS': os.getenv('LLM_QUOTA_GLOBAL_REQUESTS', '600/m'),
+    'GLOBAL_TOKENS': os.getenv('LLM_QUOTA_GLOBAL_TOKENS') or None,
+}
+
+# LLM 사용량 기록 (diary/usage.py 기본값 덮어쓰기)
+LLM_USAGE_LEDGER = {
+    'ENABLED': os.getenv('LLM_USAGE_LEDGER', '1') != '0',
+    'BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 5,
 }
 
 SIMPLE_JWT = {
@@ -97,7 +209,7 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',  # JWT 인증 + 사용자 조회 캐시
     ),
 }
 
@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class DiaryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'diary'
+
+    def ready(self):
+        from . import signals
+
+        post_migrate.connect(signals.restore_fulltext_triggers, sender=self)
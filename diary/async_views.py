@@ -0,0 +1,149 @@
+"""
+ASGI(uvicorn 등)에서 LLM 호출을 이벤트 루프 위에서 처리하는 비동기 뷰
+
+DRF APIView는 비동기 핸들러를 지원하지 않으므로 Django 비동기 뷰로 작성하고,
+인증은 DRF와 같은 CachedJWTAuthentication, LLM 쿼터는 LLMQuotaThrottle 과 같은 한도, 응답은 같은 시리얼라이저를 사용한다.
+"""
+import json
+import math
+from datetime import datetime
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseNotModified, JsonResponse
+from django.utils.http import quote_etag
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated, Throttled
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from users.authentication import CachedJWTAuthentication
+
+from .dates import parse_year_month
+from .models import DiaryEntry
+from .quotas import get_quota
+from .serializers import DiaryEntrySerializer
+from .services import (
+    DAILY_SUMMARY_MODES,
+    apply_gpt_result,
+    find_monthly_retrospect,
+    generate_daily_summary_async,
+    generate_diary_with_gpt_async,
+    get_or_generate_monthly_retrospect_async,
+    monthly_fingerprint,
+)
+from .views import etag_matches
+
+_jwt_authentication = CachedJWTAuthentication()
+
+
+async def quota_exceeded_response(user):
+    # LLM 쿼터 차감, 한도를 넘었으면 429 응답 반환
+    wait = await sync_to_async(get_quota().admit)(user)
+    if wait is None:
+        return None
+    return JsonResponse(
+        {"detail": str(Throttled(wait).detail)},
+        status=429,
+        headers={"Retry-After": str(math.ceil(wait))},
+    )
+
+
+def async_api_view(methods, quota: bool = True):
+    """
+    허용 메서드 확인 + JWT 인증 + LLM 쿼터 확인을 처리하는 비동기 뷰 데코레이터 (request.user 설정)
+    quota=False 면 쿼터는 뷰에서 LLM 을 호출하기 직전에 quota_exceeded_response 로 확인
+    """
+    def decorator(view):
+        @csrf_exempt
+        @wraps(view)
+        async def wrapped(request, *args, **kwargs):
+            if request.method not in methods:
+                return JsonResponse({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+            try:
+                result = await sync_to_async(_jwt_authentication.authenticate)(request)
+            except (InvalidToken, AuthenticationFailed) as e:
+                return JsonResponse({"detail": str(e.detail)}, status=401)
+            if result is None:
+                return JsonResponse({"detail": str(NotAuthenticated.default_detail)}, status=401)
+            request.user = result[0]
+
+            if quota:
+                response = await quota_exceeded_response(request.user)
+                if response is not None:
+                    return response
+            return await view(request, *args, **kwargs)
+        return wrapped
+    return decorator
+
+
+def _json_body(request) -> dict:
+    try:
+        return json.loads(request.body or b"{}")
+    except ValueError:
+        return {}
+
+
+@async_api_view(['POST'])
+async def generate_diary_view(request):
+    user_input = _json_body(request).get('input')
+    if not user_input:
+        return JsonResponse({"error": "input 값이 필요합니다."}, status=400)
+
+    gpt_result = await generate_diary_with_gpt_async(user_input)
+    if 'error' in gpt_result:
+        return JsonResponse(gpt_result, status=500)
+
+    diary_entry = apply_gpt_result(
+        DiaryEntry(user=request.user, raw_input=user_input, is_public=True),
+        gpt_result,
+    )
+    await diary_entry.asave()
+
+    serializer = DiaryEntrySerializer(diary_entry)
+    return JsonResponse(serializer.data, status=201)
+
+
+@async_api_view(['POST'])
+async def daily_summary_view(request):
+    data = _json_body(request)
+    date_str = data.get('date')
+    if not date_str:
+        return JsonResponse({"error": "date 파라미터가 필요합니다."}, status=400)
+    try:
+        date = datetime.strptime(date_str, "%Y-%m-%d").date()
+    except ValueError:
+        return JsonResponse({"error": "날짜 형식이 잘못되었습니다."}, status=400)
+
+    mode = data.get('mode', 'full')
+    if mode not in DAILY_SUMMARY_MODES:
+        return JsonResponse({"error": "mode는 full 또는 incremental 이어야 합니다."}, status=400)
+
+    summary_data = await generate_daily_summary_async(request.user, date, mode)
+    return JsonResponse(summary_data)
+
+
+@async_api_view(['GET'], quota=False)
+async def monthly_retrospect_view(request):
+    try:
+        year, month = parse_year_month(request.GET)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    fingerprint = await sync_to_async(monthly_fingerprint)(request.user, year, month)
+    if fingerprint is None:
+        return JsonResponse({"message": "해당 월의 일기가 없습니다."}, status=404)
+
+    etag = quote_etag(fingerprint)
+    if etag_matches(request, etag):
+        return HttpResponseNotModified(headers={"ETag": etag})
+
+    retrospect = await sync_to_async(find_monthly_retrospect)(request.user, year, month, fingerprint)
+    if retrospect is None:
+        # 저장된 회고가 없을 때만 LLM 을 호출하므로 이때만 쿼터 차감
+        response = await quota_exceeded_response(request.user)
+        if response is not None:
+            return response
+        retrospect = await get_or_generate_monthly_retrospect_async(request.user, year, month, fingerprint)
+    if retrospect is None:
+        return JsonResponse({"message": "해당 월의 일기가 없습니다."}, status=404)
+    return JsonResponse(retrospect.payload, headers={"ETag": etag})
@@ -0,0 +1,192 @@
+"""
+하루 종합 일기 일괄 생성(백필)
+
+장애 등으로 빠진 (사용자, 날짜) 의 하루 종합 일기를 워커 풀에서 생성한다.
+동시 실행 수와 초당 호출 수를 제한하고, 체크포인트 파일로 중단된 지점부터 이어서 실행할 수 있다.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+
+from .services import generate_daily_summary, token_usage
+from .usage import usage_scope
+
+User = get_user_model()
+
+
+class RateLimiter:
+    """
+    호출 시작 간격을 1/rate 초 이상으로 유지 (스레드 안전, rate 가 없으면 제한 없음)
+    """
+    def __init__(self, rate: float | None = None):
+        self.interval = 1 / rate if rate else 0
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class Checkpoint:
+    """
+    완료한 (user_id, 날짜) 목록을 JSON 파일에 기록 (path 가 없으면 메모리에만 유지)
+    """
+    def __init__(self, path: str | None = None, save_every: int = 20):
+        self.path = path
+        self.save_every = save_every
+        self.done = set()
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.done = set(json.load(f).get('done', []))
+
+    @staticmethod
+    def key(user_id: int, day: date) -> str:
+        return f"{user_id}:{day.isoformat()}"
+
+    def is_done(self, user_id: int, day: date) -> bool:
+        return self.key(user_id, day) in self.done
+
+    def mark_done(self, user_id: int, day: date):
+        with self._lock:
+            self.done.add(self.key(user_id, day))
+            self._unsaved += 1
+            if self._unsaved >= self.save_every:
+                self._save()
+
+    def save(self):
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        self._unsaved = 0
+        if not self.path:
+            return
+        # 중간에 종료돼도 파일이 깨지지 않도록 임시 파일에 쓴 뒤 교체
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'done': sorted(self.done)}, f)
+        os.replace(tmp_path, self.path)
+
+
+class BackfillReport:
+    def __init__(self, total: int):
+        self.total = total
+        self.succeeded = 0
+        self.skipped = 0  # 체크포인트에 있거나 그 사이 일기가 사라진 날짜
+        self.failures = []  # [(user_id, 날짜, 오류)]
+        self.elapsed = 0.0
+        self.token_usage = {}
+        self._lock = threading.Lock()
+
+    def record(self, user_id: int, day: date, outcome: str, error: str = ''):
+        with self._lock:
+            if outcome == 'ok':
+                self.succeeded += 1
+            elif outcome == 'skipped':
+                self.skipped += 1
+            else:
+                self.failures.append((user_id, day, error))
+
+    @property
+    def processed(self) -> int:
+        return self.succeeded + self.skipped + len(self.failures)
+
+    def as_dict(self) -> dict:
+        return {
+            'total': self.total,
+            'succeeded': self.succeeded,
+            'skipped': self.skipped,
+            'failed': len(self.failures),
+            'failures': [
+                {'user_id': user_id, 'date': str(day), 'error': error}
+                for user_id, day, error in self.failures
+            ],
+            'elapsed_seconds': round(self.elapsed, 2),
+            'throughput_per_second': round(self.succeeded / self.elapsed, 2) if self.elapsed else 0,
+            'token_usage': self.token_usage,
+        }
+
+
+def _usage_delta(before: dict, after: dict) -> dict:
+    return {key: after[key] - before[key] for key in after}
+
+
+def _backfill_one(user, day: date, mode: str, limiter: RateLimiter) -> tuple[str, str]:
+    limiter.wait()
+    try:
+        # 워커 스레드에는 호출한 쪽의 사용량 기록 대상이 전달되지 않으므로 스레드에서 지정
+        with usage_scope(user, 'backfill:daily_summary'):
+            result = generate_daily_summary(user, day, mode)
+    except Exception as e:
+        return 'failed', str(e)
+    finally:
+        # 워커 스레드마다 열린 DB 커넥션 정리
+        connection.close()
+
+    if 'error' in result:
+        return 'failed', result['error']
+    if 'message' in result:
+        return 'skipped', ''
+    return 'ok', ''
+
+
+def backfill_daily_summaries(pairs: list[tuple[int, date]], concurrency: int = 4, rate: float | None = None,
+                             checkpoint_path: str | None = None, mode: str = 'full',
+                             progress=None) -> BackfillReport:
+    """
+    (user_id, 날짜) 목록의 하루 종합 일기를 생성하고 결과 보고서 반환
+    progress(report) 는 한 건 처리될 때마다 호출됨.
+    토큰 사용량은 프로세스 전체 카운터의 차이라서 같은 프로세스의 다른 요청 사용량도 포함될 수 있음.
+    """
+    checkpoint = Checkpoint(checkpoint_path)
+    limiter = RateLimiter(rate)
+    report = BackfillReport(len(pairs))
+
+    pending = []
+    for user_id, day in pairs:
+        if checkpoint.is_done(user_id, day):
+            report.record(user_id, day, 'skipped')
+        else:
+            pending.append((user_id, day))
+    users = User.objects.in_bulk({user_id for user_id, _ in pending})
+
+    def run(user_id: int, day: date):
+        user = users.get(user_id)
+        if user is None:  # 그 사이 탈퇴한 사용자
+            report.record(user_id, day, 'skipped')
+            return
+        outcome, error = _backfill_one(user, day, mode, limiter)
+        if outcome != 'failed':
+            checkpoint.mark_done(user_id, day)
+        report.record(user_id, day, outcome, error)
+        if progress:
+            progress(report)
+
+    usage_before = token_usage.snapshot()
+    started = time.monotonic()
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='summary-backfill')
+    try:
+        for future in [pool.submit(run, user_id, day) for user_id, day in pending]:
+            future.result()
+    finally:
+        # 중단(Ctrl+C 등) 시 아직 시작하지 않은 작업은 취소하고 진행 상황 저장
+        pool.shutdown(wait=True, cancel_futures=True)
+        checkpoint.save()
+        report.elapsed = time.monotonic() - started
+        report.token_usage = _usage_delta(usage_before, token_usage.snapshot())
+    return report
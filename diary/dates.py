@@ -0,0 +1,39 @@
+"""
+날짜 범위 / 날짜 파라미터 헬퍼 (diary, users 의 뷰와 서비스에서 함께 사용)
+"""
+from datetime import MAXYEAR, MINYEAR, date, datetime, time, timedelta
+
+from django.utils import timezone
+
+
+# 하루 / 한 달의 시작~끝 시각 (현재 타임존 기준)
+# created_at__date, __year, __month 대신 범위 조건으로 조회해야 (user, created_at) 인덱스를 사용함
+def day_bounds(day: date) -> tuple[datetime, datetime]:
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+
+
+def month_bounds(year: int, month: int) -> tuple[datetime, datetime]:
+    start = timezone.make_aware(datetime(year, month, 1))
+    end = timezone.make_aware(datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1))
+    return start, end
+
+
+def parse_date_param(value):
+    # 'YYYY-MM-DD' 문자열을 date 로 변환 (값이 없으면 None, 형식 오류는 ValueError)
+    if not value:
+        return None
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def parse_year_month(params):
+    # year / month 쿼리 파라미터 → (year, month), 값이 없거나 범위를 벗어나면 ValueError
+    try:
+        year = int(params.get('year'))
+        month = int(params.get('month'))
+    except (TypeError, ValueError):
+        raise ValueError("year, month 파라미터가 필요합니다.")
+    # 월 경계(다음 달 1일)를 datetime 으로 만들 수 있는 범위
+    if not (MINYEAR <= year < MAXYEAR and 1 <= month <= 12):
+        raise ValueError("year, month 값이 올바르지 않습니다.")
+    return year, month
@@ -0,0 +1,523 @@
+"""
+일기 의미 검색 (임베딩 + 사용자별 벡터 인덱스)
+
+- 임베더: hashing(외부 호출 없이 단어/글자 2-gram 을 해시하는 결정적 임베더, 기본값) | openai(임베딩 API, llm_gateway 경유)
+- 저장: DiaryEmbedding 에 정규화된 float32 벡터를 바이트로 저장 (일기 / 하루 종합 일기가 저장되면 signals.py 에서 계산)
+- 검색: 사용자별 벡터를 (N, D) float32 행렬 하나로 메모리에 올려 내적으로 전수 검색 (NumPy)
+  벡터 수가 ANN_MIN_SIZE 이상이면 IVF(k-means 묶음 중 가까운 몇 개만 비교) 근사 검색 (학습은 백그라운드에서)
+- 인덱스는 프로세스마다 LRU 로 캐시하고, 검색할 때마다 DB 의 (벡터 수, 마지막 수정 시각)과 비교해서
+  바뀌었으면 바뀐 벡터만 다시 읽어 반영함 (여러 워커 프로세스에서도 캐시 백엔드와 관계없이 바로 반영)
+"""
+import hashlib
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Max
+
+from .models import DailySummaryDiary, DiaryEmbedding, DiaryEntry
+from .services import llm_gateway, record_llm_usage
+
+# EMBEDDINGS 설정 기본값 (settings.EMBEDDINGS 로 덮어씀)
+DEFAULT_EMBEDDINGS = {
+    'BACKEND': 'hashing',  # hashing | openai
+    'MODEL': 'text-embedding-3-small',  # openai 백엔드에서 사용
+    'DIMENSIONS': 256,
+    'BATCH_SIZE': 100,  # 임베딩을 한 번에 계산할 문서 수
+    'ANN_MIN_SIZE': 20000,  # 사용자 벡터 수가 이 이상이면 IVF 근사 검색 (None 이면 항상 전수 검색)
+    'ANN_PROBES': 8,  # IVF 검색 시 비교할 묶음 수
+    'INDEX_CACHE_SIZE': 64,  # 프로세스마다 메모리에 올려 두는 사용자 인덱스 수 (오래 안 쓴 것부터 제거)
+    'INDEX_CACHE_BYTES': 256 * 1024 * 1024,  # 올려 두는 인덱스 전체 크기 상한
+}
+
+KIND_ENTRY = 'entry'
+KIND_SUMMARY = 'summary'
+KINDS = (KIND_ENTRY, KIND_SUMMARY)
+
+TOKEN_PATTERN = re.compile(r"[0-9A-Za-z가-힣]+")
+
+
+def get_embeddings_config() -> dict:
+    return {**DEFAULT_EMBEDDINGS, **getattr(settings, 'EMBEDDINGS', {})}
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return (vectors / norms).astype(np.float32, copy=False)
+
+
+# ======================
+# 임베더
+# ======================
+
+class HashingEmbedder:
+    """
+    단어와 단어 안의 글자 2-gram 을 해시해서 D 차원에 더하는 임베더 (feature hashing)
+    같은 입력이면 항상 같은 벡터. 어간이 같은 한국어 활용형('외로웠던', '외로운')이 '외로' 를 공유해서 가까워짐
+    """
+    local = True
+
+    def __init__(self, dimensions: int):
+        self.dimensions = dimensions
+
+    @property
+    def id(self) -> str:
+        return f"hashing-v1-{self.dimensions}"
+
+    def _add(self, vector: np.ndarray, feature: str, weight: float):
+        value = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+        vector[value % self.dimensions] += weight if value >> 63 else -weight
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in TOKEN_PATTERN.findall(text.lower()):
+                self._add(vectors[row], word, 1.0)
+                for i in range(len(word) - 1):
+                    self._add(vectors[row], word[i:i + 2], 0.5)
+        return normalize_rows(vectors)
+
+
+class OpenAIEmbedder:
+    local = False
+
+    def __init__(self, model: str, dimensions: int):
+        self.model = model
+        self.dimensions = dimensions
+
+    @property
+    def id(self) -> str:
+        return f"openai-{self.model}-{self.dimensions}"
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        started = time.perf_counter()
+        response = llm_gateway.create_embeddings(model=self.model, input=texts, dimensions=self.dimensions)
+        record_llm_usage({"model": self.model, "prompt_id": "embedding"}, response.usage, time.perf_counter() - started)
+        data = sorted(response.data, key=lambda item: item.index)
+        return normalize_rows(np.array([item.embedding for item in data], dtype=np.float32))
+
+
+_embedder = None
+
+
+def get_embedder():
+    global _embedder
+    if _embedder is None:
+        config = get_embeddings_config()
+        if config['BACKEND'] == 'openai':
+            _embedder = OpenAIEmbedder(config['MODEL'], config['DIMENSIONS'])
+        else:
+            _embedder = HashingEmbedder(config['DIMENSIONS'])
+    return _embedder
+
+
+# ======================
+# 벡터 인덱스
+# ======================
+
+class IVFIndex:
+    """
+    벡터를 k-means(코사인) 로 sqrt(N) 개 묶음으로 나눠 두고, 질의와 가까운 probes 개 묶음의 벡터만 비교
+    중심점은 학습 시점의 벡터로 정하고, 이후 추가/수정된 벡터는 가장 가까운 묶음에만 배정 (재학습 없음)
+    """
+    SAMPLE_SIZE = 50000  # 중심점 학습에 쓰는 최대 벡터 수
+    ASSIGN_CHUNK = 8192
+
+    def __init__(self, centroids: np.ndarray, assign: np.ndarray, trained_size: int):
+        self.centroids = centroids
+        self.assign = assign  # 벡터별 묶음 번호
+        self.trained_size = trained_size
+        self.order = np.argsort(assign, kind='stable')
+        self.offsets = np.searchsorted(assign[self.order], np.arange(len(centroids) + 1))
+
+    @classmethod
+    def train(cls, vectors: np.ndarray, iterations: int = 8, seed: int = 0) -> 'IVFIndex':
+        rng = np.random.default_rng(seed)
+        n = len(vectors)
+        nlist = max(1, int(math.sqrt(n)))
+        sample = vectors if n <= cls.SAMPLE_SIZE else vectors[rng.choice(n, cls.SAMPLE_SIZE, replace=False)]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            filled = np.bincount(assign, minlength=nlist) > 0  # 빈 묶음은 이전 중심점 유지
+            centroids[filled] = normalize_rows(sums[filled])
+        return cls(centroids, cls.nearest(centroids, vectors), n)
+
+    @classmethod
+    def nearest(cls, centroids: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+        if not len(vectors):
+            return np.zeros(0, dtype=np.intp)
+        return np.concatenate([
+            np.argmax(vectors[start:start + cls.ASSIGN_CHUNK] @ centroids.T, axis=1)
+            for start in range(0, len(vectors), cls.ASSIGN_CHUNK)
+        ])
+
+    def updated(self, keep: np.ndarray | None, positions: np.ndarray, replaced: np.ndarray,
+                appended: np.ndarray) -> 'IVFIndex':
+        assign = self.assign[keep] if keep is not None else self.assign.copy()
+        if len(positions):
+            assign[positions] = self.nearest(self.centroids, replaced)
+        assign = np.concatenate([assign, self.nearest(self.centroids, appended)])
+        return IVFIndex(self.centroids, assign, self.trained_size)
+
+    def candidates(self, query: np.ndarray, probes: int) -> np.ndarray:
+        probes = min(probes, len(self.centroids))
+        nearest = np.argpartition(-(self.centroids @ query), probes - 1)[:probes]
+        return np.concatenate([self.order[self.offsets[c]:self.offsets[c + 1]] for c in nearest])
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    # 점수 높은 순 k 개의 위치 (전체 정렬 없이 argpartition)
+    if k < len(scores):
+        picked = np.argpartition(-scores, k - 1)[:k]
+    else:
+        picked = np.arange(len(scores))
+    return picked[np.argsort(-scores[picked], kind='stable')]
+
+
+def document_keys(kinds: np.ndarray, ids: np.ndarray) -> np.ndarray:
+    # (종류, id) 를 정수 하나로
+    return ids * len(KINDS) + kinds
+
+
+class VectorIndex:
+    """
+    사용자 한 명의 벡터 행렬 (검색 중인 다른 스레드가 있으므로 갱신은 새 객체로 만들어 교체)
+    """
+    def __init__(self, kinds: np.ndarray, ids: np.ndarray, vectors: np.ndarray, ann: IVFIndex | None = None):
+        self.kinds = kinds  # int8, KINDS 의 위치
+        self.ids = ids  # int64, 일기 / 하루 종합 일기 id
+        self.vectors = vectors  # (N, D) float32, 행마다 정규화됨
+        self.ann = ann
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        return self.vectors.nbytes + self.ids.nbytes + self.kinds.nbytes
+
+    def updated(self, kinds: np.ndarray, ids: np.ndarray, vectors: np.ndarray) -> 'VectorIndex':
+        """
+        같은 문서는 벡터를 바꾸고, 새 문서는 뒤에 붙인 인덱스 반환
+        """
+        if not len(self):
+            return VectorIndex(kinds, ids, vectors)
+        keys = document_keys(self.kinds, self.ids)
+        new_keys = document_keys(kinds, ids)
+        sorter = np.argsort(keys)
+        found_at = np.minimum(np.searchsorted(keys, new_keys, sorter=sorter), len(keys) - 1)
+        found = keys[sorter[found_at]] == new_keys
+        positions = sorter[found_at[found]]
+
+        merged = self.vectors.copy()
+        merged[positions] = vectors[found]
+        appended = ~found
+        ann = None
+        if self.ann is not None:
+            ann = self.ann.updated(None, positions, vectors[found], vectors[appended])
+        return VectorIndex(
+            np.concatenate([self.kinds, kinds[appended]]),
+            np.concatenate([self.ids, ids[appended]]),
+            np.concatenate([merged, vectors[appended]]) if appended.any() else merged,
+            ann,
+        )
+
+    def without_missing(self, kinds: np.ndarray, ids: np.ndarray) -> 'VectorIndex':
+        # (kinds, ids) 에 없는(삭제된) 문서를 뺀 인덱스 반환
+        keep = np.isin(document_keys(self.kinds, self.ids), document_keys(kinds, ids))
+        if keep.all():
+            return self
+        empty = np.zeros((0, self.vectors.shape[1]), dtype=np.float32)
+        ann = self.ann.updated(keep, np.zeros(0, dtype=np.intp), empty, empty) if self.ann is not None else None
+        return VectorIndex(self.kinds[keep], self.ids[keep], self.vectors[keep], ann)
+
+    def search(self, query: np.ndarray, k: int = 10, kinds=KINDS, probes: int = 8) -> list[tuple[str, int, float]]:
+        """
+        [(종류, id, 코사인 유사도)] 를 유사도 높은 순으로 반환
+        """
+        if not len(self):
+            return []
+        ann = self.ann
+        positions = ann.candidates(query, probes) if ann is not None else None
+        vectors = self.vectors if positions is None else self.vectors[positions]
+        scores = vectors @ query
+        if set(kinds) != set(KINDS):
+            kind_codes = self.kinds if positions is None else self.kinds[positions]
+            allowed = np.isin(kind_codes, [KINDS.index(kind) for kind in kinds])
+            scores = np.where(allowed, scores, -np.inf)
+        picked = top_k(scores, k)
+        picked = picked[np.isfinite(scores[picked])]
+        if positions is not None:
+            scores, picked = scores[picked], positions[picked]
+        else:
+            scores = scores[picked]
+        return [
+            (KINDS[self.kinds[position]], int(self.ids[position]), float(score))
+            for position, score in zip(picked, scores)
+        ]
+
+
+def _user_embeddings(user_id: int, embedder_id: str):
+    return DiaryEmbedding.objects.filter(user_id=user_id, embedder=embedder_id)
+
+
+def _read_rows(queryset) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    kinds, ids, buffers = [], [], []
+    for entry_id, summary_id, vector in queryset.values_list('entry_id', 'summary_id', 'vector').iterator(
+        chunk_size=2000
+    ):
+        kinds.append(0 if entry_id else 1)
+        ids.append(entry_id or summary_id)
+        buffers.append(bytes(vector))
+    dimensions = len(buffers[0]) // 4 if buffers else 0
+    return (
+        np.array(kinds, dtype=np.int8),
+        np.array(ids, dtype=np.int64),
+        np.frombuffer(b''.join(buffers), dtype=np.float32).reshape(len(buffers), dimensions),
+    )
+
+
+def load_user_index(user_id: int, embedder_id: str) -> VectorIndex:
+    return VectorIndex(*_read_rows(_user_embeddings(user_id, embedder_id)))
+
+
+def user_index_version(user_id: int, embedder_id: str) -> tuple:
+    """
+    (벡터 수, 마지막 수정 시각), DB 에서 계산하므로 어느 프로세스에서 저장/삭제해도 모든 프로세스가 바로 알 수 있음
+    (user, embedder, updated_at) 인덱스만 읽음
+    """
+    result = _user_embeddings(user_id, embedder_id).aggregate(count=Count('id'), updated=Max('updated_at'))
+    return result['count'], result['updated']
+
+
+def refresh_user_index(index: VectorIndex, old_version: tuple, new_version: tuple,
+                       user_id: int, embedder_id: str) -> VectorIndex:
+    """
+    old_version 이후 바뀐 벡터만 읽어서 반영 (삭제가 있으면 문서 id 목록만 읽어서 제외)
+    """
+    count, updated = new_version
+    if not count:
+        return VectorIndex(*_read_rows(DiaryEmbedding.objects.none()))
+    if old_version[1] is None:
+        return load_user_index(user_id, embedder_id)
+
+    rows = _user_embeddings(user_id, embedder_id)
+    index = index.updated(*_read_rows(rows.filter(updated_at__gte=old_version[1])))
+    if len(index) != count:
+        kinds, ids = [], []
+        for entry_id, summary_id in rows.values_list('entry_id', 'summary_id').iterator(chunk_size=10000):
+            kinds.append(0 if entry_id else 1)
+            ids.append(entry_id or summary_id)
+        index = index.without_missing(np.array(kinds, dtype=np.int8), np.array(ids, dtype=np.int64))
+    if len(index) != count:
+        # 읽는 사이에 또 바뀐 경우 전체를 다시 읽음
+        index = load_user_index(user_id, embedder_id)
+    return index
+
+
+# 프로세스별 인덱스 캐시: (user_id, embedder id) → (버전, VectorIndex), 오래 안 쓴 순서로 정렬 (LRU)
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+_ann_pending = set()
+# IVF 학습(k-means)은 검색 요청을 붙잡지 않도록 백그라운드에서, 끝나기 전까지는 전수 검색
+_ann_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='diary-ann')
+
+
+def _store_index(key, version: tuple, index: VectorIndex):
+    config = get_embeddings_config()
+    with _indexes_lock:
+        _indexes[key] = (version, index)
+        _indexes.move_to_end(key)
+        total = sum(cached.nbytes for _, cached in _indexes.values())
+        while len(_indexes) > 1 and (
+            len(_indexes) > config['INDEX_CACHE_SIZE'] or total > config['INDEX_CACHE_BYTES']
+        ):
+            _, (_, evicted) = _indexes.popitem(last=False)
+            total -= evicted.nbytes
+
+
+def _build_ann(key):
+    try:
+        with _indexes_lock:
+            cached = _indexes.get(key)
+        if cached is None:
+            return
+        ann = IVFIndex.train(cached[1].vectors)
+        with _indexes_lock:
+            current = _indexes.get(key)
+            if current is not None and current[1] is cached[1]:
+                cached[1].ann = ann
+                return
+        # 학습하는 동안 인덱스가 바뀌었으면 학습한 중심점으로 새 벡터를 배정
+        if current is not None and len(current[1]):
+            current[1].ann = IVFIndex(ann.centroids, IVFIndex.nearest(ann.centroids, current[1].vectors), len(current[1]))
+    except Exception as e:
+        print("❌ IVF 인덱스 생성 오류:", str(e))
+    finally:
+        with _indexes_lock:
+            _ann_pending.discard(key)
+
+
+def _schedule_ann(key, index: VectorIndex):
+    min_size = get_embeddings_config()['ANN_MIN_SIZE']
+    if min_size is None or len(index) < min_size:
+        return
+    # 학습 후 벡터 수가 두 배 넘게 늘면 중심점을 다시 학습
+    if index.ann is not None and len(index) <= index.ann.trained_size * 2:
+        return
+    with _indexes_lock:
+        if key in _ann_pending:
+            return
+        _ann_pending.add(key)
+    _ann_executor.submit(_build_ann, key)
+
+
+def get_user_index(user_id: int) -> VectorIndex:
+    embedder_id = get_embedder().id
+    key = (user_id, embedder_id)
+    version = user_index_version(user_id, embedder_id)
+    with _indexes_lock:
+        cached = _indexes.get(key)
+        if cached is not None:
+            _indexes.move_to_end(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    if cached is not None:
+        index = refresh_user_index(cached[1], cached[0], version, user_id, embedder_id)
+    else:
+        index = load_user_index(user_id, embedder_id)
+    _store_index(key, version, index)
+    _schedule_ann(key, index)
+    return index
+
+
+def search_user_diaries(user_id: int, query: str, k: int = 10, kinds=KINDS) -> list[tuple[str, int, float]]:
+    vector = get_embedder().embed([query])[0]
+    results = get_user_index(user_id).search(vector, k, kinds, get_embeddings_config()['ANN_PROBES'])
+    # 유사도가 0 이하인 문서는 질의와 겹치는 내용이 없는 것이므로 제외
+    return [result for result in results if result[2] > 0]
+
+
+# ======================
+# 임베딩 계산 / 저장
+# ======================
+
+def document_text(instance) -> str:
+    if isinstance(instance, DailySummaryDiary):
+        return instance.generated_diary or instance.summary or ''
+    return instance.generated_diary or ''
+
+
+def _content_hash(embedder_id: str, text: str) -> str:
+    return hashlib.sha256(f"{embedder_id}\n{text}".encode('utf-8')).hexdigest()
+
+
+def index_documents(instances: list) -> int:
+    """
+    일기 / 하루 종합 일기 목록의 임베딩을 계산해서 저장 (내용과 임베더가 그대로인 문서는 건너뜀), 계산한 수 반환
+    """
+    embedder = get_embedder()
+    config = get_embeddings_config()
+    field_of = {DiaryEntry: 'entry', DailySummaryDiary: 'summary'}
+
+    existing = {}
+    for model, field in field_of.items():
+        ids = [instance.pk for instance in instances if isinstance(instance, model)]
+        if ids:
+            for embedding in DiaryEmbedding.objects.filter(**{f"{field}_id__in": ids}).only(
+                'id', 'entry_id', 'summary_id', 'content_hash'
+            ):
+                existing[(field, embedding.entry_id or embedding.summary_id)] = embedding
+
+    pending, empty = [], []
+    for instance in instances:
+        key = (field_of[type(instance)], instance.pk)
+        text = document_text(instance).strip()
+        if not text:
+            empty.append(key)
+            continue
+        content_hash = _content_hash(embedder.id, text)
+        current = existing.get(key)
+        if current is None or current.content_hash != content_hash:
+            pending.append((key, instance.user_id, text, content_hash))
+
+    # 내용이 비워진 문서는 임베딩 삭제
+    for key in empty:
+        if key in existing:
+            existing[key].delete()
+
+    batch_size = config['BATCH_SIZE']
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        vectors = embedder.embed([text for _, _, text, _ in batch])
+        for (key, user_id, _, content_hash), vector in zip(batch, vectors):
+            field, pk = key
+            DiaryEmbedding.objects.update_or_create(
+                **{f"{field}_id": pk},
+                defaults={
+                    'user_id': user_id,
+                    'embedder': embedder.id,
+                    'content_hash': content_hash,
+                    'vector': vector.astype(np.float32).tobytes(),
+                },
+            )
+    return len(pending)
+
+
+def index_user_documents(user_ids=None, batch_size: int = 500) -> int:
+    """
+    사용자(없으면 전체)의 일기 / 하루 종합 일기 임베딩을 한 번에 계산 (bulk_create 로 저장된 경우, 임베더 변경 후 등)
+    """
+    total = 0
+    for model in (DiaryEntry, DailySummaryDiary):
+        queryset = model.objects.order_by('pk')
+        if user_ids is not None:
+            queryset = queryset.filter(user_id__in=user_ids)
+        batch = []
+        for instance in queryset.iterator(chunk_size=batch_size):
+            batch.append(instance)
+            if len(batch) >= batch_size:
+                total += index_documents(batch)
+                batch = []
+        if batch:
+            total += index_documents(batch)
+    return total
+
+
+# 외부 임베딩 API 는 저장 요청을 붙잡지 않도록 백그라운드에서 계산
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='diary-embedding')
+
+
+def _index_in_background(model, pk):
+    try:
+        instance = model.objects.filter(pk=pk).first()
+        if instance is not None:
+            index_documents([instance])
+    except Exception as e:
+        print("❌ 임베딩 계산 오류:", str(e))
+    finally:
+        connection.close()
+
+
+def schedule_indexing(instance):
+    """
+    저장된 일기 / 하루 종합 일기의 임베딩 계산 (로컬 임베더는 바로, 외부 API 는 백그라운드에서)
+    """
+    if get_embedder().local:
+        try:
+            index_documents([instance])
+        except Exception as e:
+            print("❌ 임베딩 계산 오류:", str(e))
+    else:
+        _executor.submit(_index_in_background, type(instance), instance.pk)
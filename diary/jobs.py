@@ -0,0 +1,200 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .backfill import backfill_daily_summaries
+from .models import DiaryEntry, GenerationJob
+from .serializers import DiaryEntrySerializer
+from .services import apply_gpt_result, find_missing_summary_pairs, generate_diary_with_gpt, generate_daily_summary
+from .usage import usage_scope
+
+# LLM 호출을 처리하는 워커 풀 (요청 스레드는 작업만 등록하고 바로 응답)
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'DIARY_JOB_WORKERS', 4),
+    thread_name_prefix='diary-job',
+)
+# 처리 중(RUNNING)인 작업의 하트비트가 이 시간(초) 동안 없으면 워커가 죽은 것으로 보고 다시 대기시키거나 실패 처리
+JOB_LEASE_SECONDS = getattr(settings, 'DIARY_JOB_LEASE_SECONDS', 60 * 10)
+JOB_MAX_ATTEMPTS = getattr(settings, 'DIARY_JOB_MAX_ATTEMPTS', 3)
+
+
+class JobFailed(Exception):
+    pass
+
+
+# ======================
+# 작업 종류별 처리 함수
+# ======================
+
+def _run_diary_job(job: GenerationJob) -> dict:
+    raw_input = job.payload['input']
+    gpt_result = generate_diary_with_gpt(raw_input)
+    if 'error' in gpt_result:
+        raise JobFailed(gpt_result['error'])
+
+    diary_entry = apply_gpt_result(DiaryEntry(user=job.user, raw_input=raw_input, is_public=True), gpt_result)
+    diary_entry.save()
+    return DiaryEntrySerializer(diary_entry).data
+
+
+def _run_regenerate_job(job: GenerationJob) -> dict:
+    raw_input = job.payload['raw_input']
+    try:
+        diary = DiaryEntry.objects.get(pk=job.payload['diary_id'], user=job.user)
+    except DiaryEntry.DoesNotExist:
+        raise JobFailed("일기를 찾을 수 없습니다.")
+
+    gpt_result = generate_diary_with_gpt(raw_input)
+    if 'error' in gpt_result:
+        raise JobFailed(gpt_result['error'])
+
+    diary.raw_input = raw_input
+    apply_gpt_result(diary, gpt_result)
+    diary.save()
+    return DiaryEntrySerializer(diary).data
+
+
+def _run_daily_summary_job(job: GenerationJob) -> dict:
+    date = datetime.strptime(job.payload['date'], "%Y-%m-%d").date()
+    summary_data = generate_daily_summary(job.user, date, job.payload.get('mode', 'full'))
+    if 'error' in summary_data:
+        raise JobFailed(summary_data['error'])
+    return summary_data
+
+
+def _parse_payload_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date() if value else None
+
+
+def _run_summary_backfill_job(job: GenerationJob) -> dict:
+    # 관리자 요청: 빠진 하루 종합 일기를 찾아 일괄 생성 (payload: from, to, user_ids, concurrency, rate, mode)
+    payload = job.payload
+    pairs = find_missing_summary_pairs(
+        _parse_payload_date(payload.get('from')), _parse_payload_date(payload.get('to')), payload.get('user_ids')
+    )
+    report = backfill_daily_summaries(
+        pairs,
+        concurrency=payload.get('concurrency', 4),
+        rate=payload.get('rate'),
+        mode=payload.get('mode', 'full'),
+    )
+    return report.as_dict()
+
+
+JOB_HANDLERS = {
+    GenerationJob.KIND_DIARY: _run_diary_job,
+    GenerationJob.KIND_REGENERATE: _run_regenerate_job,
+    GenerationJob.KIND_DAILY_SUMMARY: _run_daily_summary_job,
+    GenerationJob.KIND_SUMMARY_BACKFILL: _run_summary_backfill_job,
+}
+
+
+# ======================
+# 작업 등록 / 실행
+# ======================
+
+def enqueue_job(user, kind: str, payload: dict) -> GenerationJob:
+    job = GenerationJob.objects.create(user=user, kind=kind, payload=payload)
+    # 트랜잭션이 커밋된 뒤에 워커가 작업을 조회할 수 있도록 등록
+    transaction.on_commit(lambda: _executor.submit(_run_in_worker, job.id))
+    return job
+
+
+def _run_in_worker(job_id: int):
+    try:
+        run_job(job_id)
+    finally:
+        # 워커 스레드마다 열린 DB 커넥션 정리
+        connection.close()
+
+
+@contextmanager
+def _heartbeat(job_id: int, interval: float):
+    """
+    블록이 실행되는 동안 interval 초마다 작업의 heartbeat_at 갱신 (오래 걸리는 작업이 멈춘 작업으로 회수되지 않도록)
+    """
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(interval):
+                GenerationJob.objects.filter(
+                    pk=job_id, status=GenerationJob.STATUS_RUNNING
+                ).update(heartbeat_at=timezone.now())
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f'diary-job-heartbeat-{job_id}', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_job(job_id: int) -> GenerationJob | None:
+    # 다른 워커가 이미 가져간 작업이면 건너뜀
+    claimed = GenerationJob.objects.filter(
+        pk=job_id, status=GenerationJob.STATUS_PENDING
+    ).update(status=GenerationJob.STATUS_RUNNING, heartbeat_at=timezone.now(), attempts=F('attempts') + 1)
+    if not claimed:
+        return None
+
+    job = GenerationJob.objects.select_related('user').get(pk=job_id)
+    try:
+        with usage_scope(job.user, f'job:{job.kind}'), _heartbeat(job_id, JOB_LEASE_SECONDS / 3):
+            job.result = JOB_HANDLERS[job.kind](job)
+        job.status = GenerationJob.STATUS_DONE
+    except Exception as e:
+        print("❌ 백그라운드 작업 오류:", job_id, str(e))
+        job.status = GenerationJob.STATUS_FAILED
+        job.error = str(e)
+    job.save(update_fields=['status', 'result', 'error', 'updated_at'])
+    return job
+
+
+def recover_stale_jobs(lease_seconds: float | None = None) -> tuple[int, int]:
+    """
+    하트비트가 lease_seconds 동안 없는 처리 중 작업(처리하던 프로세스가 죽은 작업)을 회수
+    시도 횟수가 JOB_MAX_ATTEMPTS 보다 적으면 다시 대기(PENDING), 아니면 실패 처리. (다시 대기시킨 수, 실패 처리한 수) 반환
+    일기 저장 직후 상태를 기록하기 전에 죽은 경우에는 다시 실행되면서 일기가 한 번 더 만들어질 수 있음
+    """
+    cutoff = timezone.now() - timedelta(seconds=JOB_LEASE_SECONDS if lease_seconds is None else lease_seconds)
+    stale = GenerationJob.objects.filter(status=GenerationJob.STATUS_RUNNING).filter(
+        # 하트비트 필드가 생기기 전에 시작된 작업은 updated_at 으로 판단
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, updated_at__lt=cutoff)
+    )
+    now = timezone.now()
+    requeued = stale.filter(attempts__lt=JOB_MAX_ATTEMPTS).update(
+        status=GenerationJob.STATUS_PENDING, heartbeat_at=None, updated_at=now
+    )
+    failed = stale.filter(attempts__gte=JOB_MAX_ATTEMPTS).update(
+        status=GenerationJob.STATUS_FAILED, error="작업이 제한 시간 안에 끝나지 않았습니다.", updated_at=now
+    )
+    return requeued, failed
+
+
+def run_pending_jobs(limit: int | None = None) -> int:
+    """
+    대기 중인 작업을 현재 프로세스에서 순서대로 처리 (서버 재시작 등으로 남은 작업 복구용)
+    처리 중인 채로 멈춘 작업은 먼저 recover_stale_jobs 로 다시 대기시킴
+    """
+    recover_stale_jobs()
+    job_ids = GenerationJob.objects.filter(
+        status=GenerationJob.STATUS_PENDING
+    ).order_by('created_at').values_list('id', flat=True)
+    if limit:
+        job_ids = job_ids[:limit]
+
+    processed = 0
+    for job_id in list(job_ids):
+        if run_job(job_id):
+            processed += 1
+    return processed
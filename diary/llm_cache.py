@@ -0,0 +1,203 @@
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from .models import LLMResponseCache
+
+# LLM_CACHE 설정 기본값 (settings.LLM_CACHE 로 덮어씀)
+DEFAULT_LLM_CACHE = {
+    'BACKEND': 'locmem',  # locmem | django | db | None(캐시 사용 안 함)
+    'MAX_ENTRIES': 1000,
+    'TTL': 60 * 60 * 24,  # 초 단위, None 이면 만료 없음
+    'CACHE_ALIAS': 'default',  # django 백엔드에서 사용할 CACHES 이름
+}
+
+
+def make_cache_key(request: dict) -> str:
+    """
+    (모델, 시스템 프롬프트, 사용자 입력, temperature, max_tokens) 기준 캐시 키
+    """
+    payload = {
+        'model': request.get('model'),
+        'messages': [(m['role'], m['content']) for m in request.get('messages', [])],
+        'temperature': request.get('temperature'),
+        'max_tokens': request.get('max_tokens'),
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class BaseLLMCache:
+    def __init__(self, max_entries: int = 1000, ttl: int | None = None, **kwargs):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str):
+        try:
+            value = self._get(key)
+        except Exception as e:
+            # 캐시 오류는 캐시에 없는 것으로 처리 (LLM 호출은 그대로 진행)
+            print("❌ LLM 캐시 조회 오류:", str(e))
+            value = None
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: dict):
+        # 저장 실패가 이미 끝난(비용을 낸) LLM 호출 결과를 오류로 바꾸지 않도록 로그만 남김
+        try:
+            self._set(key, value)
+        except Exception as e:
+            print("❌ LLM 캐시 저장 오류:", str(e))
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'backend': type(self).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0,
+        }
+
+    def _get(self, key: str):
+        raise NotImplementedError
+
+    def _set(self, key: str, value: dict):
+        raise NotImplementedError
+
+
+class NullLLMCache(BaseLLMCache):
+    def _get(self, key):
+        return None
+
+    def _set(self, key, value):
+        pass
+
+
+class LocMemLRUCache(BaseLLMCache):
+    """
+    프로세스 내부 LRU 캐시 (TTL 지원)
+    """
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._data = OrderedDict()  # key -> (만료 시각, 값)
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return copy.deepcopy(value)
+
+    def _set(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, copy.deepcopy(value))
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+
+class DjangoCacheBackend(BaseLLMCache):
+    """
+    Django 캐시 프레임워크 사용 (크기 제한은 CACHES 설정의 MAX_ENTRIES 를 따름)
+    """
+    key_prefix = 'llm:'
+
+    def __init__(self, cache_alias: str = 'default', **kwargs):
+        super().__init__(**kwargs)
+        self.cache = caches[cache_alias]
+
+    def _get(self, key):
+        return self.cache.get(self.key_prefix + key)
+
+    def _set(self, key, value):
+        self.cache.set(self.key_prefix + key, value, timeout=self.ttl)
+
+
+class DatabaseLLMCache(BaseLLMCache):
+    """
+    LLMResponseCache 테이블 사용, 개수를 넘으면 오래된 항목부터 삭제
+    저장은 키 기준 upsert 한 번, 개수 확인(COUNT)과 삭제는 프로세스당 evict_every 번 저장할 때마다 한 번만 실행
+    (그 사이에는 max_entries 를 조금 넘을 수 있음)
+    """
+    evict_every = 50
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+    def _get(self, key):
+        item = LLMResponseCache.objects.filter(key=key).only('value', 'expires_at').first()
+        if item is None:
+            return None
+        if item.expires_at is not None and item.expires_at < timezone.now():
+            item.delete()
+            return None
+        return item.value
+
+    def _set(self, key, value):
+        expires_at = timezone.now() + timedelta(seconds=self.ttl) if self.ttl else None
+        # 같은 키를 동시에 저장해도 중복 키 오류가 나지 않도록 INSERT ... ON CONFLICT UPDATE
+        LLMResponseCache.objects.bulk_create(
+            [LLMResponseCache(key=key, value=value, expires_at=expires_at)],
+            update_conflicts=True,
+            unique_fields=['key'],
+            update_fields=['value', 'expires_at'],
+        )
+        with self._writes_lock:
+            self._writes += 1
+            evict = self._writes % self.evict_every == 0
+        if evict:
+            self.evict()
+
+    def evict(self):
+        overflow = LLMResponseCache.objects.count() - self.max_entries
+        if overflow > 0:
+            old_ids = LLMResponseCache.objects.order_by('created_at').values_list('id', flat=True)[:overflow]
+            LLMResponseCache.objects.filter(id__in=list(old_ids)).delete()
+
+
+BACKENDS = {
+    None: NullLLMCache,
+    'locmem': LocMemLRUCache,
+    'django': DjangoCacheBackend,
+    'db': DatabaseLLMCache,
+}
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> BaseLLMCache:
+    global _llm_cache
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                config = {**DEFAULT_LLM_CACHE, **getattr(settings, 'LLM_CACHE', {})}
+                _llm_cache = BACKENDS[config['BACKEND']](
+                    max_entries=config['MAX_ENTRIES'],
+                    ttl=config['TTL'],
+                    cache_alias=config['CACHE_ALIAS'],
+                )
+    return _llm_cache
@@ -0,0 +1,348 @@
+"""
+LLM 호출 게이트웨이
+
+모든 OpenAI 호출이 거쳐 가는 공용 계층으로 다음을 처리한다.
+- 분당 요청 수 / 토큰 수 제한 (토큰 버킷)
+- 동시 호출 수 제한 (사용자별로 차례대로 슬롯을 배분하는 공정 세마포어, 동기/비동기 호출 합산)
+- 재시도 가능한 오류(429, 5xx, 타임아웃, 연결 오류)에 대한 지터 포함 지수 백오프
+- 호출별 타임아웃
+- 서킷 브레이커 (연속 실패 시 일정 시간 동안 바로 실패)
+"""
+import asyncio
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+
+import openai
+from django.conf import settings
+
+from .usage import current_scope
+
+# LLM_GATEWAY 설정 기본값 (settings.LLM_GATEWAY 로 덮어씀)
+DEFAULT_LLM_GATEWAY = {
+    'REQUESTS_PER_MINUTE': 3000,  # None 이면 제한 없음
+    'TOKENS_PER_MINUTE': 250000,  # None 이면 제한 없음
+    'MAX_CONCURRENCY': 16,  # 프로세스 전체 동시 호출 수 (스레드 + 모든 이벤트 루프 합산)
+    'TIMEOUT': 30,  # 초, 호출 1회 기준
+    'MAX_RETRIES': 3,
+    'BACKOFF_BASE': 0.5,  # 초, 재시도마다 2배 (최대 BACKOFF_MAX)
+    'BACKOFF_MAX': 8,
+    'FAILURE_THRESHOLD': 5,  # 연속 실패 횟수가 넘으면 서킷 오픈
+    'RESET_TIMEOUT': 30,  # 초, 오픈 후 이 시간이 지나면 한 번 시험 호출
+}
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+# 토크나이저 없이 대략적인 토큰 수 계산
+# 한글은 글자당 1토큰, 영문은 3~4글자당 1토큰 정도라 UTF-8 바이트 수 / 3 으로 근사
+def estimate_tokens(text: str) -> int:
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+def estimate_request_tokens(request: dict) -> int:
+    prompt = sum(estimate_tokens(m.get('content') or '') for m in request.get('messages', []))
+    # 임베딩 요청은 input (문자열 또는 문자열 목록)
+    inputs = request.get('input') or []
+    prompt += sum(estimate_tokens(text) for text in ([inputs] if isinstance(inputs, str) else inputs))
+    return prompt + (request.get('max_tokens') or 0)
+
+
+class TokenBucket:
+    """
+    분당 rate 만큼 채워지는 버킷 (스레드 안전)
+    reserve() 는 기다려야 할 시간만 계산하므로 동기/비동기 호출 모두에서 사용 가능
+    """
+    def __init__(self, rate_per_minute: float | None):
+        self.rate = rate_per_minute / 60 if rate_per_minute else None
+        self.capacity = rate_per_minute or 0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1) -> float:
+        if self.rate is None:
+            return 0
+        # 버킷보다 큰 요청은 가득 찬 버킷 하나만큼만 차감
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            return max(0.0, -self.tokens / self.rate)
+
+
+class CircuitBreaker:
+    """
+    closed(정상) → 연속 실패가 threshold 이상이면 open(즉시 실패)
+    → reset_timeout 이 지나면 half-open(한 번만 시험 호출) → 성공하면 closed, 실패하면 다시 open
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return
+        raise CircuitOpenError("LLM 서비스 응답이 불안정해서 잠시 요청을 중단했습니다. 잠시 후 다시 시도해주세요.")
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class FairSemaphore:
+    """
+    동시 호출 슬롯을 key(사용자 id) 별로 돌아가며 배분하는 세마포어
+    슬롯이 없으면 key 별 대기열에 줄 세우고, 슬롯이 반납되면 대기 중인 key 를 차례대로(round-robin) 하나씩 깨운다.
+    한 사용자가 요청을 몰아 보내도 다른 사용자의 요청이 그 뒤에 모두 밀리지 않음.
+
+    스레드(acquire)와 이벤트 루프(acquire_async)가 슬롯 수 하나를 함께 쓰므로
+    WSGI 워커 스레드와 ASGI 루프가 섞여 있어도 프로세스 전체 동시 호출 수가 capacity 를 넘지 않는다.
+    """
+    def __init__(self, capacity: int):
+        self._available = capacity
+        self._queues = OrderedDict()  # key → 대기자(슬롯을 넘겨줄 때 호출할 함수) deque, 앞에 있는 key 가 다음 차례
+        self._lock = threading.Lock()
+
+    def _try_acquire(self) -> bool:
+        # self._lock 을 잡은 상태에서 호출
+        if self._available and not self._queues:
+            self._available -= 1
+            return True
+        return False
+
+    def _enqueue(self, key, wake):
+        self._queues.setdefault(key, deque()).append(wake)
+
+    def _discard(self, key, wake) -> bool:
+        # 아직 대기열에 있으면 빼고 True (슬롯을 넘겨받지 않음)
+        queue = self._queues.get(key)
+        if not queue or wake not in queue:
+            return False
+        queue.remove(wake)
+        if not queue:
+            del self._queues[key]
+        return True
+
+    def _next_waiter(self):
+        if not self._queues:
+            return None
+        key, queue = next(iter(self._queues.items()))
+        wake = queue.popleft()
+        if queue:
+            self._queues.move_to_end(key)
+        else:
+            del self._queues[key]
+        return wake
+
+    def acquire(self, key=None):
+        with self._lock:
+            if self._try_acquire():
+                return
+            waiter = threading.Event()
+            self._enqueue(key, waiter.set)
+        waiter.wait()  # release() 가 슬롯을 그대로 넘겨줌
+
+    async def acquire_async(self, key=None):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._try_acquire():
+                return
+            future = loop.create_future()
+
+            def wake():
+                # release() 는 다른 스레드에서 호출될 수 있으므로 루프 스레드에서 결과를 설정
+                try:
+                    loop.call_soon_threadsafe(self._hand_over, future)
+                except RuntimeError:  # 루프가 이미 닫힘
+                    self.release()
+
+            self._enqueue(key, wake)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                queued = self._discard(key, wake)
+            if not queued and future.done() and not future.cancelled():
+                self.release()  # 슬롯을 넘겨받은 직후 취소됨
+            # 넘겨주는 중에 취소된 경우는 _hand_over 에서 반납
+            raise
+
+    def _hand_over(self, future):
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+    def release(self):
+        with self._lock:
+            wake = self._next_waiter()
+            if wake is None:
+                self._available += 1
+                return
+        wake()
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def retry_after(error: Exception) -> float | None:
+    # 429 응답의 Retry-After 헤더(초)가 있으면 그 값을 우선 사용
+    response = getattr(error, 'response', None)
+    try:
+        return float(response.headers['retry-after'])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+
+class LLMGateway:
+    def __init__(self, client, async_client, config: dict):
+        self.client = client
+        self.async_client = async_client
+        self.timeout = config['TIMEOUT']
+        self.max_retries = config['MAX_RETRIES']
+        self.backoff_base = config['BACKOFF_BASE']
+        self.backoff_max = config['BACKOFF_MAX']
+        self.request_bucket = TokenBucket(config['REQUESTS_PER_MINUTE'])
+        self.token_bucket = TokenBucket(config['TOKENS_PER_MINUTE'])
+        self.breaker = CircuitBreaker(config['FAILURE_THRESHOLD'], config['RESET_TIMEOUT'])
+        self.max_concurrency = config['MAX_CONCURRENCY']
+        # 동기 / 비동기 호출이 같은 슬롯을 사용 (프로세스당 MAX_CONCURRENCY)
+        self._semaphore = FairSemaphore(self.max_concurrency)
+
+    def _reserve(self, request: dict) -> float:
+        return max(self.request_bucket.reserve(1), self.token_bucket.reserve(estimate_request_tokens(request)))
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        delay = retry_after(error)
+        if delay is not None:
+            return min(delay, self.timeout)
+        # full jitter: 0 ~ min(max, base * 2^attempt)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _after_error(self, error: Exception, attempt: int) -> float:
+        # 재시도할 수 있으면 기다릴 시간 반환, 아니면 오류를 그대로 다시 발생
+        if not is_retryable(error):
+            # 400 등은 요청 문제라서 업스트림은 정상으로 취급
+            self.breaker.record_success()
+            raise error
+        self.breaker.record_failure()
+        if attempt >= self.max_retries:
+            raise error
+        return self._backoff(attempt, error)
+
+    def _call(self, method, request: dict):
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            time.sleep(self._reserve(request))
+            self._semaphore.acquire(current_scope()[0])
+            try:
+                response = method(timeout=self.timeout, **request)
+            except Exception as e:
+                self._semaphore.release()
+                delay = self._after_error(e, attempt)
+                attempt += 1
+                time.sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            if request.get('stream'):
+                return _StreamSlot(response, self._semaphore.release)
+            self._semaphore.release()
+            return response
+
+    async def _acall(self, method, request: dict):
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            await asyncio.sleep(self._reserve(request))
+            try:
+                await self._semaphore.acquire_async(current_scope()[0])
+                try:
+                    response = await method(timeout=self.timeout, **request)
+                finally:
+                    self._semaphore.release()
+            except Exception as e:
+                delay = self._after_error(e, attempt)
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            return response
+
+    def create(self, **request):
+        """
+        client.chat.completions.create 와 같은 인자로 호출 (stream=True 면 스트림 반환, 세마포어는 스트림을 다 읽을 때까지 유지)
+        """
+        return self._call(self.client.chat.completions.create, request)
+
+    async def acreate(self, **request):
+        return await self._acall(self.async_client.chat.completions.create, request)
+
+    def create_embeddings(self, **request):
+        # client.embeddings.create 와 같은 인자로 호출
+        return self._call(self.client.embeddings.create, request)
+
+    async def acreate_embeddings(self, **request):
+        return await self._acall(self.async_client.embeddings.create, request)
+
+
+class _StreamSlot:
+    """
+    스트림을 다 읽거나 닫을 때 동시 호출 슬롯을 반납 (읽지 않고 버려져도 GC 시 반납)
+    """
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+        self._released = False
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        try:
+            yield from self._stream
+        finally:
+            self.close()
+
+    def close(self):
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self._release()
+
+    def __del__(self):
+        self.close()
+
+
+def get_gateway_config() -> dict:
+    return {**DEFAULT_LLM_GATEWAY, **getattr(settings, 'LLM_GATEWAY', {})}
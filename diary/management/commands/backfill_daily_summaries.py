@@ -0,0 +1,71 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from diary.backfill import backfill_daily_summaries
+from diary.services import DAILY_SUMMARY_MODES, find_missing_summary_pairs
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise CommandError(f"날짜 형식이 잘못되었습니다: {value} (YYYY-MM-DD)")
+
+
+class Command(BaseCommand):
+    help = "일기는 있지만 하루 종합 일기가 없는 (사용자, 날짜)를 찾아 일괄 생성합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start', type=parse_date, help="시작 날짜 (YYYY-MM-DD)")
+        parser.add_argument('--to', dest='end', type=parse_date, help="끝 날짜 (YYYY-MM-DD)")
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help="대상 사용자 id (여러 번 지정 가능, 생략하면 전체)")
+        parser.add_argument('--concurrency', type=int, default=4, help="동시에 생성할 최대 개수")
+        parser.add_argument('--rate', type=float, default=None, help="초당 최대 LLM 호출 수")
+        parser.add_argument('--mode', choices=DAILY_SUMMARY_MODES, default='full')
+        parser.add_argument('--checkpoint', default=None,
+                            help="진행 상황 파일 경로 (같은 경로로 다시 실행하면 완료한 항목은 건너뜀)")
+        parser.add_argument('--limit', type=int, default=None, help="처리할 최대 개수")
+        parser.add_argument('--dry-run', action='store_true', help="대상 목록만 출력")
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError("--concurrency 는 1 이상이어야 합니다.")
+
+        pairs = find_missing_summary_pairs(options['start'], options['end'], options['user_ids'])
+        if options['limit']:
+            pairs = pairs[:options['limit']]
+        self.stdout.write(f"하루 종합 일기가 없는 날짜 {len(pairs)}개")
+
+        if options['dry_run']:
+            for user_id, day in pairs:
+                self.stdout.write(f"  user={user_id} date={day}")
+            return
+
+        def progress(report):
+            if report.processed % 50 == 0:
+                self.stdout.write(f"  {report.processed}/{report.total} 처리 (실패 {len(report.failures)})")
+
+        report = backfill_daily_summaries(
+            pairs,
+            concurrency=options['concurrency'],
+            rate=options['rate'],
+            checkpoint_path=options['checkpoint'],
+            mode=options['mode'],
+            progress=progress,
+        ).as_dict()
+
+        usage = report['token_usage']
+        self.stdout.write(self.style.SUCCESS(
+            f"완료: 성공 {report['succeeded']}, 건너뜀 {report['skipped']}, 실패 {report['failed']} "
+            f"/ {report['elapsed_seconds']}초 ({report['throughput_per_second']}건/초)"
+        ))
+        self.stdout.write(
+            f"LLM 호출 {usage['calls']}회, 토큰 {usage['total_tokens']} "
+            f"(입력 {usage['prompt_tokens']}, 출력 {usage['completion_tokens']})"
+        )
+        for failure in report['failures']:
+            self.stdout.write(self.style.ERROR(
+                f"  실패 user={failure['user_id']} date={failure['date']}: {failure['error']}"
+            ))
@@ -0,0 +1,75 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+
+from diary.models import DiaryEntry
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "현재 DB 설정으로 동시 쓰기 성능을 측정합니다. "
+        "벤치마크용 사용자를 만들어 여러 스레드에서 일기를 저장하고(감정 집계 갱신 포함) 끝나면 삭제합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help="동시에 쓰는 스레드 수")
+        parser.add_argument('--writes', type=int, default=50, help="스레드당 저장할 일기 수")
+
+    def handle(self, *args, **options):
+        threads, writes = options['threads'], options['writes']
+        database = settings.DATABASES['default']
+        self.stdout.write(f"DB: {database['ENGINE']} {database.get('OPTIONS', {})}")
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                self.stdout.write(f"journal_mode: {cursor.fetchone()[0]}")
+
+        token = uuid.uuid4().hex[:12]
+        user = User.objects.create_user(f"bench-{token}", f"{token}@bench.local")
+        errors = []
+        lock = threading.Lock()
+        latencies = []
+
+        def write(worker: int):
+            try:
+                for i in range(writes):
+                    started = time.perf_counter()
+                    try:
+                        DiaryEntry.objects.create(
+                            user=user, raw_input=f"bench {worker}-{i}", generated_diary="bench", emotion="기쁨",
+                            happiness_score=i % 100, joy=25, anger=25, sadness=25, pleasure=25, hashtags=["bench"],
+                        )
+                    except OperationalError as e:  # database is locked 등
+                        with lock:
+                            errors.append(str(e))
+                        continue
+                    with lock:
+                        latencies.append(time.perf_counter() - started)
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                list(pool.map(write, range(threads)))
+            elapsed = time.perf_counter() - started
+        finally:
+            user.delete()
+
+        latencies.sort()
+        total = threads * writes
+        p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0
+        self.stdout.write(
+            f"쓰기 {len(latencies)}/{total}건 성공, 실패 {len(errors)}건, {elapsed:.2f}초 "
+            f"({len(latencies) / elapsed:.1f}건/초, p95 {p95:.1f}ms)"
+        )
+        for error in sorted(set(errors)):
+            self.stdout.write(self.style.ERROR(f"  {error}"))
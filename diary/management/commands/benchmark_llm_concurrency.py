@@ -0,0 +1,128 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from django.core.management.base import BaseCommand
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, OpenAI
+
+from diary.llm_gateway import LLMGateway, get_gateway_config
+
+REQUEST = {
+    'model': 'gpt-3.5-turbo',
+    'messages': [{'role': 'user', 'content': '오늘 산책을 했다.'}],
+    'max_tokens': 50,
+}
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    """
+    고정 지연 후 chat.completions 응답을 돌려주는 로컬 서버, 동시에 처리 중인 요청 수의 최댓값을 기록
+    """
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, latency: float):
+        super().__init__(('127.0.0.1', 0), FakeLLMHandler)
+        self.latency = latency
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with server.lock:
+            server.in_flight += 1
+            server.peak = max(server.peak, server.in_flight)
+        try:
+            time.sleep(server.latency)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+        raw = json.dumps({
+            'id': 'bench', 'object': 'chat.completion', 'created': 0, 'model': body['model'],
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': 'ok'}, 'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': 10, 'completion_tokens': 1, 'total_tokens': 11},
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+
+class Command(BaseCommand):
+    help = (
+        "지연이 있는 로컬 가짜 LLM 서버를 띄워서 한 프로세스의 동시 처리량을 측정합니다. "
+        "동기(WSGI 워커 스레드마다 요청 하나) 호출과 비동기(이벤트 루프 하나에서 공용 커넥션 풀) 호출을 비교합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=400, help="방식마다 보낼 요청 수")
+        parser.add_argument('--threads', type=int, default=8, help="동기 방식의 워커 스레드 수 (WSGI 스레드 수)")
+        parser.add_argument('--concurrency', type=int, default=200, help="비동기 방식의 최대 동시 요청 수")
+        parser.add_argument('--latency', type=float, default=0.2, help="가짜 LLM 서버 응답 지연(초)")
+
+    def handle(self, *args, **options):
+        server = FakeLLMServer(options['latency'])
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            self.report("동기", server, lambda gateway: self.run_sync(gateway, options), options)
+            self.report("비동기", server, lambda gateway: asyncio.run(self.run_async(gateway, options)), options)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def make_gateway(self, server, options) -> LLMGateway:
+        config = {
+            **get_gateway_config(),
+            'REQUESTS_PER_MINUTE': None,
+            'TOKENS_PER_MINUTE': None,
+            'MAX_CONCURRENCY': max(options['threads'], options['concurrency']),
+        }
+        limits = httpx.Limits(max_connections=options['concurrency'], max_keepalive_connections=options['concurrency'])
+        client = OpenAI(api_key='benchmark', base_url=server.base_url, max_retries=0)
+        async_client = AsyncOpenAI(
+            api_key='benchmark', base_url=server.base_url, max_retries=0,
+            http_client=DefaultAsyncHttpxClient(limits=limits),
+        )
+        return LLMGateway(client, async_client, config)
+
+    def run_sync(self, gateway, options):
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            list(pool.map(lambda _: gateway.create(**REQUEST), range(options['requests'])))
+
+    async def run_async(self, gateway, options):
+        limit = asyncio.Semaphore(options['concurrency'])
+
+        async def one():
+            async with limit:
+                await gateway.acreate(**REQUEST)
+
+        await asyncio.gather(*(one() for _ in range(options['requests'])))
+
+    def report(self, label, server, run, options):
+        gateway = self.make_gateway(server, options)
+        server.peak = 0
+        started = time.perf_counter()
+        run(gateway)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{label}: {options['requests']}건 {elapsed:.2f}초 "
+            f"({options['requests'] / elapsed:.1f}건/초, 최대 동시 요청 {server.peak}건)"
+        )
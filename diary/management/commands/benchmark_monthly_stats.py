@@ -0,0 +1,108 @@
+import random
+import statistics
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count, Sum
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from diary.dates import month_bounds
+from diary.models import DiaryEntry
+from diary.rollups import rebuild_rollups
+from diary.services import EMOTION_FIELDS, collect_monthly_stats, generate_monthly_retrospect
+
+User = get_user_model()
+SCORE_FIELDS = ("happiness_score", *EMOTION_FIELDS)
+TAGS = ["산책", "카페", "운동", "독서", "야근", "여행", "가족", "친구"]
+
+
+def python_iteration_stats(user, year: int, month: int) -> dict:
+    # 비교용 이전 방식: 일기 전체를 모델 인스턴스로 읽어서 필드마다 다시 순회
+    entries = DiaryEntry.objects.filter(user=user, created_at__year=year, created_at__month=month)
+    count = entries.count()
+    averages = {field: round(sum(getattr(e, field) or 0 for e in entries) / count, 1) for field in SCORE_FIELDS}
+    tags = Counter(tag for e in entries for tag in e.hashtags or [])
+    highlight = max(entries, key=lambda e: e.happiness_score or 0)
+    return {"averages": averages, "top_hashtags": [t for t, _ in tags.most_common(5)], "highlight": highlight.id}
+
+
+def sql_aggregate_stats(user, year: int, month: int) -> dict:
+    # 집계 쿼리 한 번 + 하이라이트 1건 + 해시태그 열만 조회
+    start, end = month_bounds(year, month)
+    entries = DiaryEntry.objects.filter(user=user, created_at__gte=start, created_at__lt=end)
+    totals = entries.aggregate(count=Count("id"), **{field: Sum(field) for field in SCORE_FIELDS})
+    averages = {field: round((totals[field] or 0) / totals["count"], 1) for field in SCORE_FIELDS}
+    tags = Counter(tag for hashtags in entries.values_list("hashtags", flat=True) for tag in hashtags or [])
+    highlight = entries.order_by("-happiness_score", "id").values_list("id", flat=True).first()
+    return {"averages": averages, "top_hashtags": [t for t, _ in tags.most_common(5)], "highlight": highlight}
+
+
+def rollup_stats(user, year: int, month: int) -> dict:
+    # 현재 방식: 일기 저장 시 갱신되는 월별 집계 한 행
+    stats = collect_monthly_stats(user, year, month)
+    generate_monthly_retrospect(user, year, month)
+    return stats
+
+
+class Command(BaseCommand):
+    help = (
+        "월간 회고 통계 계산 방식별 쿼리 수와 시간을 측정합니다. "
+        "벤치마크용 사용자를 만들어 한 달에 일기를 채우고 끝나면 삭제합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entries', type=int, default=10000, help="한 달 동안 만들 일기 수")
+        parser.add_argument('--repeat', type=int, default=5, help="방식마다 반복 측정 횟수 (중앙값 출력)")
+
+    def handle(self, *args, **options):
+        token = uuid.uuid4().hex[:12]
+        user = User.objects.create_user(f"bench-{token}", f"{token}@bench.local")
+        year, month = 2024, 3
+        try:
+            self.create_entries(user, year, month, options['entries'])
+            for label, stats in [
+                ("Python 반복(이전 방식)", python_iteration_stats),
+                ("SQL 집계", sql_aggregate_stats),
+                ("월별 집계(현재)", rollup_stats),
+            ]:
+                self.measure(label, stats, user, year, month, options['repeat'])
+        finally:
+            user.delete()
+
+    def create_entries(self, user, year: int, month: int, total: int):
+        rng = random.Random(0)
+        text = "오늘 하루를 돌아보며 " * 40
+        entries = DiaryEntry.objects.bulk_create([
+            DiaryEntry(
+                user=user, raw_input=text, generated_diary=text, emotion="기쁨",
+                happiness_score=rng.randint(0, 100), joy=25, anger=25, sadness=25, pleasure=25,
+                hashtags=rng.sample(TAGS, 3),
+            )
+            for _ in range(total)
+        ], batch_size=1000)
+        # created_at 은 auto_now_add 라서 저장 후 날짜별로 나눠서 바꿈
+        for day in range(1, 29):
+            DiaryEntry.objects.filter(pk__in=[entry.pk for entry in entries[day - 1::28]]).update(
+                created_at=timezone.make_aware(datetime(year, month, day, 12))
+            )
+        rebuild_rollups(user_ids=[user.pk])
+        self.stdout.write(f"일기 {total}건 생성")
+
+    def measure(self, label, stats, user, year: int, month: int, repeat: int):
+        timings = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                result = stats(user, year, month)
+                timings.append((time.perf_counter() - started) * 1000)
+        averages = result.get("averages") or {"happiness_score": result["average_happiness"]}
+        self.stdout.write(
+            f"{label}: 쿼리 {len(context.captured_queries)}개, {statistics.median(timings):.1f}ms "
+            f"(평균 행복지수 {averages['happiness_score']})"
+        )
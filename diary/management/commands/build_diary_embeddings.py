@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from diary.embeddings import get_embedder, index_user_documents
+
+
+class Command(BaseCommand):
+    help = "일기 / 하루 종합 일기의 의미 검색용 임베딩을 계산합니다. (내용과 임베더가 그대로인 문서는 건너뜀)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help="대상 사용자 id (여러 번 지정 가능, 생략하면 전체)")
+        parser.add_argument('--batch-size', type=int, default=500, help="한 번에 읽을 문서 수")
+
+    def handle(self, *args, **options):
+        total = index_user_documents(options['user_ids'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"임베딩 {total}개를 계산했습니다. (임베더: {get_embedder().id})"))
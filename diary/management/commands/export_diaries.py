@@ -0,0 +1,41 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from diary.transfer import EXPORT_TYPES, gzip_stream, iter_export_records, iter_ndjson
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "사용자의 일기 / 하루 종합 일기를 NDJSON 으로 내보냅니다. (한 줄에 레코드 하나, 메모리 사용량 일정)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, required=True, help="내보낼 사용자 id")
+        parser.add_argument('--types', default=','.join(EXPORT_TYPES),
+                            help=f"내보낼 종류 (쉼표로 구분, 기본 {','.join(EXPORT_TYPES)})")
+        parser.add_argument('--gzip', action='store_true', help="gzip 으로 압축")
+        parser.add_argument('--chunk-size', type=int, default=1000, help="DB 에서 한 번에 읽을 행 수")
+        parser.add_argument('-o', '--output', default='-', help="저장할 파일 경로 (기본 - : 표준 출력)")
+
+    def handle(self, *args, **options):
+        types = [t.strip() for t in options['types'].split(',') if t.strip()]
+        if not types or set(types) - set(EXPORT_TYPES):
+            raise CommandError(f"--types 는 {', '.join(EXPORT_TYPES)} 중에서 지정해야 합니다.")
+        try:
+            user = User.objects.get(pk=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"사용자 {options['user']} 가 없습니다.")
+
+        chunks = iter_ndjson(iter_export_records(user, types, chunk_size=options['chunk_size']))
+        if options['gzip']:
+            chunks = gzip_stream(chunks)
+
+        output = sys.stdout.buffer if options['output'] == '-' else open(options['output'], 'wb')
+        try:
+            for chunk in chunks:
+                output.write(chunk)
+        finally:
+            if output is not sys.stdout.buffer:
+                output.close()
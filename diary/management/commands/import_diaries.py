@@ -0,0 +1,55 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from diary.transfer import import_records, open_ndjson
+from diary.usage import usage_scope
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "NDJSON(gzip 가능) 파일의 일기 / 하루 종합 일기를 사용자에게 가져옵니다. (export_diaries 출력 형식)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="가져올 파일 경로 (- : 표준 입력)")
+        parser.add_argument('--user', type=int, required=True, help="가져올 대상 사용자 id")
+        parser.add_argument('--batch-size', type=int, default=500, help="트랜잭션 하나에 저장할 레코드 수")
+        parser.add_argument('--no-generate', action='store_true',
+                            help="생성된 일기가 없는 레코드는 LLM 을 호출하지 않고 건너뜀")
+        parser.add_argument('--regenerate', action='store_true',
+                            help="생성된 일기가 있어도 원문으로 다시 생성")
+        parser.add_argument('--workers', type=int, default=4, help="동시에 생성할 최대 개수")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['workers'] < 1:
+            raise CommandError("--batch-size, --workers 는 1 이상이어야 합니다.")
+        if options['no_generate'] and options['regenerate']:
+            raise CommandError("--no-generate 와 --regenerate 는 함께 쓸 수 없습니다.")
+        try:
+            user = User.objects.get(pk=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"사용자 {options['user']} 가 없습니다.")
+
+        source = sys.stdin.buffer if options['path'] == '-' else open(options['path'], 'rb')
+        try:
+            with usage_scope(user, 'command:import_diaries'):
+                report = import_records(
+                    user,
+                    open_ndjson(source),
+                    batch_size=options['batch_size'],
+                    generate=not options['no_generate'],
+                    regenerate=options['regenerate'],
+                    workers=options['workers'],
+                )
+        finally:
+            if source is not sys.stdin.buffer:
+                source.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"일기 {report.entries}개 (LLM 생성 {report.generated}개), 하루 종합 일기 {report.summaries}개를 가져왔습니다. "
+            f"건너뜀 {report.skipped}개"
+        ))
+        for line, error in report.errors:
+            self.stdout.write(self.style.WARNING(f"  {line}번째 줄: {error}"))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from diary.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "일기 전체를 다시 읽어서 일별/월별 감정 집계(EmotionRollup)를 새로 만듭니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help="집계할 사용자 id (여러 번 지정 가능, 생략하면 전체)")
+
+    def handle(self, *args, **options):
+        days, months = rebuild_rollups(user_ids=options['user_ids'])
+        self.stdout.write(self.style.SUCCESS(f"일별 집계 {days}개, 월별 집계 {months}개를 만들었습니다."))
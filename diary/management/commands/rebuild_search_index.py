@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from diary.search import rebuild_fulltext_index, rebuild_hashtag_index
+
+
+class Command(BaseCommand):
+    help = "일기 전체를 다시 읽어서 해시태그 색인(DiaryHashtag)과 전문 검색 색인을 새로 만듭니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help="해시태그를 색인할 사용자 id (여러 번 지정 가능, 생략하면 전체)")
+        parser.add_argument('--skip-fulltext', action='store_true', help="전문 검색 색인은 다시 만들지 않음")
+
+    def handle(self, *args, **options):
+        tags = rebuild_hashtag_index(user_ids=options['user_ids'])
+        if not options['skip_fulltext']:
+            # FTS5 색인은 테이블 단위라서 --user 와 관계없이 전체를 다시 만듦
+            rebuild_fulltext_index()
+        self.stdout.write(self.style.SUCCESS(f"해시태그 색인 {tags}개를 만들었습니다."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from diary.jobs import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = "대기 중인 백그라운드 생성 작업(GenerationJob)을 처리합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help="처리할 최대 작업 수")
+
+    def handle(self, *args, **options):
+        processed = run_pending_jobs(limit=options['limit'])
+        self.stdout.write(self.style.SUCCESS(f"{processed}개의 작업을 처리했습니다."))
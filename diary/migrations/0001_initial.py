@@ -0,0 +1,86 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMResponseCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('value', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DiaryEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('raw_input', models.TextField(blank=True)),
+                ('generated_diary', models.TextField()),
+                ('emotion', models.CharField(blank=True, max_length=50, null=True)),
+                ('happiness_score', models.PositiveIntegerField(default=0)),
+                ('joy', models.PositiveIntegerField(default=0)),
+                ('anger', models.PositiveIntegerField(default=0)),
+                ('sadness', models.PositiveIntegerField(default=0)),
+                ('pleasure', models.PositiveIntegerField(default=0)),
+                ('hashtags', models.JSONField(blank=True, default=list)),
+                ('is_public', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='GenerationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('diary', '일기 생성'), ('regenerate', '일기 재생성'), ('daily_summary', '하루 종합 일기')], max_length=20)),
+                ('status', models.CharField(choices=[('pending', '대기'), ('running', '처리 중'), ('done', '완료'), ('failed', '실패')], default='pending', max_length=10)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySummaryDiary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('original_inputs', models.JSONField(blank=True, default=list)),
+                ('summary', models.TextField(blank=True)),
+                ('emotion', models.CharField(blank=True, max_length=50, null=True)),
+                ('happiness_score', models.PositiveIntegerField(default=0)),
+                ('joy', models.PositiveIntegerField(default=0)),
+                ('anger', models.PositiveIntegerField(default=0)),
+                ('sadness', models.PositiveIntegerField(default=0)),
+                ('pleasure', models.PositiveIntegerField(default=0)),
+                ('hashtags', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('raw_input', models.TextField(blank=True)),
+                ('generated_diary', models.TextField(blank=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-date'],
+                'unique_together': {('user', 'date')},
+            },
+        ),
+    ]
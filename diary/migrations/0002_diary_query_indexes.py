@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('diary', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='diaryentry',
+            index=models.Index(fields=['user', 'created_at'], name='diary_entry_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='generationjob',
+            index=models.Index(fields=['status', 'created_at'], name='diary_job_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='llmresponsecache',
+            index=models.Index(fields=['created_at'], name='diary_llmcache_created_idx'),
+        ),
+    ]
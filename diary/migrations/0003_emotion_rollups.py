@@ -0,0 +1,73 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def build_rollups(apps, schema_editor):
+    # 기존 일기로 집계 테이블을 채움
+    from diary.rollups import rebuild_rollups
+
+    rebuild_rollups(
+        entry_model=apps.get_model('diary', 'DiaryEntry'),
+        daily_model=apps.get_model('diary', 'DailyEmotionRollup'),
+        monthly_model=apps.get_model('diary', 'MonthlyEmotionRollup'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('diary', '0002_diary_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyEmotionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('happiness_sum', models.PositiveIntegerField(default=0)),
+                ('joy_sum', models.PositiveIntegerField(default=0)),
+                ('anger_sum', models.PositiveIntegerField(default=0)),
+                ('sadness_sum', models.PositiveIntegerField(default=0)),
+                ('pleasure_sum', models.PositiveIntegerField(default=0)),
+                ('hashtag_counts', models.JSONField(blank=True, default=dict)),
+                ('top_happiness', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('date', models.DateField()),
+                ('top_entry', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='diary.diaryentry')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['date'],
+                'unique_together': {('user', 'date')},
+            },
+        ),
+        migrations.CreateModel(
+            name='MonthlyEmotionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('happiness_sum', models.PositiveIntegerField(default=0)),
+                ('joy_sum', models.PositiveIntegerField(default=0)),
+                ('anger_sum', models.PositiveIntegerField(default=0)),
+                ('sadness_sum', models.PositiveIntegerField(default=0)),
+                ('pleasure_sum', models.PositiveIntegerField(default=0)),
+                ('hashtag_counts', models.JSONField(blank=True, default=dict)),
+                ('top_happiness', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('top_entry', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='diary.diaryentry')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['year', 'month'],
+                'unique_together': {('user', 'year', 'month')},
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
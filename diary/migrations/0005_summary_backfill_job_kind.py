@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('diary', '0004_monthly_retrospect'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='generationjob',
+            name='kind',
+            field=models.CharField(choices=[('diary', '일기 생성'), ('regenerate', '일기 재생성'), ('daily_summary', '하루 종합 일기'), ('summary_backfill', '하루 종합 일기 일괄 생성')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def build_hashtag_index(apps, schema_editor):
+    # 기존 일기의 해시태그로 색인 테이블을 채움
+    from diary.search import rebuild_hashtag_index
+
+    rebuild_hashtag_index(
+        entry_model=apps.get_model('diary', 'DiaryEntry'),
+        hashtag_model=apps.get_model('diary', 'DiaryHashtag'),
+    )
+
+
+def create_fulltext_index(apps, schema_editor):
+    from diary.search import rebuild_fulltext_index
+
+    rebuild_fulltext_index(schema_editor.connection)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    from diary.search import drop_fulltext_index
+
+    drop_fulltext_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('diary', '0007_diary_embedding'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DiaryHashtag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tag', models.CharField(max_length=100)),
+                ('created_at', models.DateTimeField()),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hashtag_index', to='diary.diaryentry')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'tag', 'created_at'], name='diary_hashtag_user_tag_idx'), models.Index(fields=['user', 'created_at'], name='diary_hashtag_user_created_idx')],
+                'unique_together': {('entry', 'tag')},
+            },
+        ),
+        migrations.RunPython(build_hashtag_index, migrations.RunPython.noop),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
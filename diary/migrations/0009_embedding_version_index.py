@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('diary', '0008_hashtag_fulltext_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='diaryembedding',
+            name='diary_embedding_user_idx',
+        ),
+        migrations.AddIndex(
+            model_name='diaryembedding',
+            index=models.Index(fields=['user', 'embedder', 'updated_at'], name='diary_embedding_version_idx'),
+        ),
+    ]
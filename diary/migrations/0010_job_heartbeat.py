@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('diary', '0009_embedding_version_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generationjob',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='generationjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.contrib.auth import get_user_model
 
@@ -17,6 +18,13 @@ class DiaryEntry(models.Model):
     hashtags = models.JSONField(default=list, blank=True)
     is_public = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # 월간 회고 캐시 무효화 기준
+
+    class Meta:
+        indexes = [
+            # 사용자별 날짜/월 범위 조회, 작성순 정렬
+            models.Index(fields=['user', 'created_at'], name='diary_entry_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"[{self.user}] {self.created_at.date()} - {self.generated_diary[:20]}"
@@ -39,8 +47,211 @@ class DailySummaryDiary(models.Model):
     generated_diary = models.TextField(blank=True)
 
     class Meta:
+        # (user, date) 유니크 인덱스가 사용자별 날짜 조회/범위 조회를 함께 처리
         unique_together = ('user', 'date')
         ordering = ['-date']
 
     def __str__(self):
-        return f"[{self.user}] {self.date} 하루 종합"
\ No newline at end of file
+        return f"[{self.user}] {self.date} 하루 종합"
+
+class GenerationJob(models.Model):
+    """
+    LLM 호출을 백그라운드에서 처리하기 위한 작업 레코드
+    """
+    KIND_DIARY = 'diary'
+    KIND_REGENERATE = 'regenerate'
+    KIND_DAILY_SUMMARY = 'daily_summary'
+    KIND_SUMMARY_BACKFILL = 'summary_backfill'
+    KIND_CHOICES = [
+        (KIND_DIARY, '일기 생성'),
+        (KIND_REGENERATE, '일기 재생성'),
+        (KIND_DAILY_SUMMARY, '하루 종합 일기'),
+        (KIND_SUMMARY_BACKFILL, '하루 종합 일기 일괄 생성'),
+    ]
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, '대기'),
+        (STATUS_RUNNING, '처리 중'),
+        (STATUS_DONE, '완료'),
+        (STATUS_FAILED, '실패'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    payload = models.JSONField(default=dict, blank=True)  # 작업 입력값
+    result = models.JSONField(null=True, blank=True)  # 완료 시 응답 데이터
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)  # 실행(점유) 횟수
+    heartbeat_at = models.DateTimeField(null=True, blank=True)  # 처리 중인 워커가 주기적으로 갱신 (멈춘 작업 판별)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # 대기 중인 작업을 오래된 순으로 가져올 때 사용
+            models.Index(fields=['status', 'created_at'], name='diary_job_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"[{self.user}] {self.kind} #{self.pk} ({self.status})"
+
+
+class LLMResponseCache(models.Model):
+    """
+    LLM 응답 캐시 (DB 백엔드용), 파싱이 끝난 결과를 저장
+    """
+    key = models.CharField(max_length=64, unique=True)  # 요청 파라미터의 sha256
+    value = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # 개수 초과 시 오래된 항목부터 삭제
+            models.Index(fields=['created_at'], name='diary_llmcache_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.key[:12]} ({self.created_at})"
+
+
+class EmotionRollup(models.Model):
+    """
+    일기 감정 집계 공통 필드 (일기 저장/수정/삭제 시 갱신)
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    count = models.PositiveIntegerField(default=0)
+    happiness_sum = models.PositiveIntegerField(default=0)
+    joy_sum = models.PositiveIntegerField(default=0)
+    anger_sum = models.PositiveIntegerField(default=0)
+    sadness_sum = models.PositiveIntegerField(default=0)
+    pleasure_sum = models.PositiveIntegerField(default=0)
+    hashtag_counts = models.JSONField(default=dict, blank=True)  # {해시태그: 횟수}
+    top_entry = models.ForeignKey(
+        DiaryEntry, null=True, blank=True, on_delete=models.SET_NULL, related_name='+'
+    )  # 행복지수가 가장 높은 일기
+    top_happiness = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+
+class DailyEmotionRollup(EmotionRollup):
+    date = models.DateField()
+
+    class Meta:
+        unique_together = ('user', 'date')
+        ordering = ['date']
+
+    def __str__(self):
+        return f"[{self.user}] {self.date} 감정 집계 ({self.count})"
+
+
+class MonthlyEmotionRollup(EmotionRollup):
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+
+    class Meta:
+        unique_together = ('user', 'year', 'month')
+        ordering = ['year', 'month']
+
+    def __str__(self):
+        return f"[{self.user}] {self.year}-{self.month:02d} 감정 집계 ({self.count})"
+
+
+class MonthlyRetrospect(models.Model):
+    """
+    LLM 월간 회고 결과 저장 (그 달 일기의 id/수정 시각 fingerprint 가 같으면 재사용)
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    fingerprint = models.CharField(max_length=64)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)  # API 응답 본문
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('user', 'year', 'month')
+
+    def __str__(self):
+        return f"[{self.user}] {self.year}-{self.month:02d} 월간 회고"
+
+
+class LLMUsage(models.Model):
+    """
+    LLM 호출 1회의 사용량 기록 (diary/usage.py 에서 모아서 한 번에 저장)
+    """
+    user = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL)
+    endpoint = models.CharField(max_length=100, blank=True)  # URL 이름 또는 job:<종류>
+    model = models.CharField(max_length=50)
+    prompt = models.CharField(max_length=100, blank=True)  # 프롬프트 id (이름@v버전)
+    prompt_tokens = models.PositiveIntegerField(default=0)
+    completion_tokens = models.PositiveIntegerField(default=0)
+    latency_ms = models.PositiveIntegerField(default=0)
+    cache_hit = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            # 기간별 집계
+            models.Index(fields=['created_at'], name='diary_llmusage_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.endpoint} {self.model} ({self.prompt_tokens}+{self.completion_tokens})"
+
+
+class DiaryEmbedding(models.Model):
+    """
+    일기 / 하루 종합 일기의 임베딩 벡터 (의미 검색용, diary/embeddings.py)
+    entry 와 summary 중 하나만 채워짐. vector 는 정규화된 float32 배열의 바이트
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    entry = models.OneToOneField(DiaryEntry, null=True, blank=True, on_delete=models.CASCADE, related_name='embedding')
+    summary = models.OneToOneField(
+        DailySummaryDiary, null=True, blank=True, on_delete=models.CASCADE, related_name='embedding'
+    )
+    embedder = models.CharField(max_length=100)  # 임베더 id (모델, 차원이 바뀌면 다시 계산)
+    content_hash = models.CharField(max_length=64)  # 내용이 그대로면 다시 계산하지 않음
+    vector = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # 사용자별 인덱스 적재, 인덱스 버전(벡터 수, 마지막 수정 시각) 계산
+            models.Index(fields=['user', 'embedder', 'updated_at'], name='diary_embedding_version_idx'),
+        ]
+
+    def __str__(self):
+        return f"[{self.user}] {'entry' if self.entry_id else 'summary'} {self.entry_id or self.summary_id}"
+
+
+class DiaryHashtag(models.Model):
+    """
+    일기 해시태그 역색인 (DiaryEntry.hashtags 를 태그 하나당 한 행으로 펼침, diary/search.py 에서 갱신)
+    created_at 은 일기 작성 시각을 복사해 두고 태그별 기간 조회/빈도 집계에 사용
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    entry = models.ForeignKey(DiaryEntry, on_delete=models.CASCADE, related_name='hashtag_index')
+    tag = models.CharField(max_length=100)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('entry', 'tag')
+        indexes = [
+            # 태그별 일기 조회
+            models.Index(fields=['user', 'tag', 'created_at'], name='diary_hashtag_user_tag_idx'),
+            # 기간별 태그 빈도
+            models.Index(fields=['user', 'created_at'], name='diary_hashtag_user_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"[{self.user}] #{self.tag} ({self.entry_id})"
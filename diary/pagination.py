@@ -0,0 +1,59 @@
+import base64
+import heapq
+import json
+from datetime import datetime, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .dates import day_bounds
+
+# 일기(entry)와 하루 종합 일기(summary)를 하나의 최신순 목록으로 합칠 때의 정렬 키: (시각, rank, id)
+# 하루 종합 일기는 그날의 마지막 시각으로 취급해서 해당 날짜 일기들보다 앞에 오도록 함
+RANK_ENTRY = 0
+RANK_SUMMARY = 1
+
+
+def summary_timestamp(date) -> datetime:
+    return day_bounds(date)[1] - timedelta(microseconds=1)
+
+
+def encode_cursor(key: tuple) -> str:
+    timestamp, rank, pk = key
+    raw = json.dumps([timestamp.isoformat(), rank, pk])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple:
+    # 형식이 잘못된 커서는 ValueError
+    try:
+        timestamp, rank, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        timestamp = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError(str(e))
+    if timezone.is_naive(timestamp):
+        raise ValueError("cursor timestamp must be timezone-aware")
+    return timestamp, int(rank), int(pk)
+
+
+def paginate_diary_stream(entries, summaries, limit: int, cursor: tuple | None = None):
+    """
+    두 쿼리셋을 키셋 방식으로 잘라서 최신순으로 병합, (페이지 항목 [(key, kind, obj)], 다음 커서) 반환
+    """
+    entries = entries.order_by('-created_at', '-id')
+    summaries = summaries.order_by('-date', '-id')
+
+    if cursor is not None:
+        timestamp, rank, pk = cursor
+        # 같은 시각이면 rank, id 순으로 비교 (커서가 summary 였다면 같은 시각의 entry 는 모두 뒤에 옴)
+        same_time = Q(created_at=timestamp) if rank == RANK_SUMMARY else Q(created_at=timestamp, id__lt=pk)
+        entries = entries.filter(Q(created_at__lt=timestamp) | same_time)
+        summaries = summaries.filter(date__lt=timezone.localtime(timestamp).date())
+
+    entry_items = [((e.created_at, RANK_ENTRY, e.id), 'entry', e) for e in entries[:limit + 1]]
+    summary_items = [((summary_timestamp(s.date), RANK_SUMMARY, s.id), 'summary', s) for s in summaries[:limit + 1]]
+
+    merged = list(heapq.merge(entry_items, summary_items, key=lambda item: item[0], reverse=True))
+    page = merged[:limit]
+    next_cursor = encode_cursor(page[-1][0]) if len(merged) > limit else None
+    return page, next_cursor
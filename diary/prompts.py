@@ -0,0 +1,111 @@
+"""
+LLM 프롬프트 템플릿 모음
+
+프롬프트를 바꿀 때는 문구를 직접 고치지 말고 version 을 올려서 등록한다.
+사용량 기록(LLMUsage.prompt)에 "이름@v버전" 이 남으므로 버전별 토큰 사용량을 비교할 수 있다.
+"""
+from typing import NamedTuple
+
+
+class PromptTemplate(NamedTuple):
+    name: str
+    version: int
+    text: str  # str.format 형식 ({이름} 자리에 값을 채움, 중괄호 자체는 {{ }})
+
+    @property
+    def id(self) -> str:
+        return f"{self.name}@v{self.version}"
+
+    def render(self, **values) -> str:
+        return self.text.format(**values)
+
+
+PROMPTS: dict[str, PromptTemplate] = {}
+
+
+def register(name: str, version: int, text: str) -> PromptTemplate:
+    current = PROMPTS.get(name)
+    if current is not None and current.version >= version:
+        raise ValueError(f"{name} 프롬프트는 이미 v{current.version} 이 등록되어 있습니다.")
+    PROMPTS[name] = PromptTemplate(name, version, text)
+    return PROMPTS[name]
+
+
+def get_prompt(name: str) -> PromptTemplate:
+    return PROMPTS[name]
+
+
+# ======================
+# 응답 형식 (일기 / 하루 종합 일기 공용)
+# ======================
+
+register("output_format.text", 1, (
+    "응답 형식을 반드시 아래 [ ] 순서대로, 양식 그대로 출력해줘.\n"
+    "조건:\n"
+    "- 감정은 하나만\n"
+    "- 행복지수는 0~100 사이의 백분율\n"
+    "- 기쁨+분노+슬픔+즐거움 = 100(행복지수는 계산에 넣지 마)\n"
+    "- 해시태그는 3~5개\n\n"
+    "[일기]\n(감성적인 하루 종합 일기 내용)\n\n"
+    "[감정]\n감정: ...\n행복지수: ...\n기쁨: ...\n분노: ...\n슬픔: ...\n즐거움: ...\n\n"
+    "[해시태그]\n#..."
+))
+
+register("output_format.json", 1, (
+    "응답은 반드시 아래 키를 가진 JSON 객체 하나로만 출력해줘.\n"
+    "조건:\n"
+    "- emotion 은 감정 하나\n"
+    "- happiness_score 는 0~100 사이의 정수\n"
+    "- joy+anger+sadness+pleasure = 100(happiness_score 는 계산에 넣지 마)\n"
+    "- hashtags 는 # 없이 3~5개\n\n"
+    '{{"diary": "감성적인 하루 종합 일기 내용", "emotion": "...", "happiness_score": 0, '
+    '"joy": 0, "anger": 0, "sadness": 0, "pleasure": 0, "hashtags": ["..."]}}'
+))
+
+
+# ======================
+# 시스템 프롬프트 ({output_format} 자리에 응답 형식이 들어감)
+# ======================
+
+register("diary", 1, (
+    "너는 감성 일기 작가야. 사용자의 하루를 바탕으로 감성적인 일기를 작성해.\n"
+    "{output_format}"
+))
+
+register("daily_summary", 1, (
+    "너는 감성 일기 작가야. 다음은 사용자가 하루 동안 작성한 일기들과 키워드야.\n"
+    "이 내용을 종합해서 하나의 감성적인 하루 종합 일기를 작성해줘.\n"
+    "{output_format}"
+))
+
+register("daily_summary.incremental", 1, (
+    "너는 감성 일기 작가야. 다음은 사용자의 기존 하루 종합 일기와 그 이후 새로 작성한 일기들이야.\n"
+    "기존 종합 일기에 새 일기 내용을 자연스럽게 반영해서 하루 종합 일기를 다시 작성해줘.\n"
+    "{output_format}"
+))
+
+
+# ======================
+# 월간 요약 (사용자 메시지, {texts} 자리에 일기 목록)
+# ======================
+
+register("monthly_summary.partial", 1, (
+    "다음은 사용자의 한 달 중 일부 기간의 일기입니다.\n"
+    "날짜 순서대로 주요 사건과 감정 흐름, 키워드를 간결하게 요약해주세요:\n\n"
+    "{texts}"
+))
+
+register("monthly_summary", 1, (
+    "다음은 사용자의 한 달간 일기 목록입니다.\n"
+    "전체적인 감정 흐름과 키워드, 분위기를 분석한 다음 하나의 감성적인 일기를 작성해주세요:\n\n"
+    "{texts}"
+))
+
+
+def render_system_prompt(name: str, output_mode: str) -> tuple[str, str]:
+    """
+    (시스템 프롬프트, 사용량 기록용 프롬프트 id) 반환
+    """
+    template = get_prompt(name)
+    output_format = get_prompt(f"output_format.{output_mode}")
+    return template.render(output_format=output_format.render()), f"{template.id}+{output_format.id}"
@@ -0,0 +1,157 @@
+"""
+LLM 호출 쿼터 (사용자별 / 전체)
+
+고정 윈도우 카운터를 Django 캐시(CACHES, 기본 locmem)에 두고 요청 수와 토큰 수를 센다.
+- 요청 수: LLM 을 호출하는 API 요청이 들어올 때 (throttles.py / 비동기 뷰에서 admit 호출)
+- 토큰 수: LLM 응답을 받은 뒤 실제 사용량만큼 (services.record_llm_usage 에서 charge_tokens 호출)
+토큰은 응답을 받아야 알 수 있으므로, 이미 한도를 다 쓴 경우에만 다음 요청을 거절한다.
+여러 프로세스가 같은 한도를 나눠 쓰려면 CACHES 를 redis 등 공용 캐시로 설정해야 한다.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .usage import current_scope
+
+# LLM_QUOTA 설정 기본값 (settings.LLM_QUOTA 로 덮어씀), 한도는 '횟수/기간' (s, m, h, d), None 이면 제한 없음
+DEFAULT_LLM_QUOTA = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'USER_REQUESTS': '20/m',
+    'USER_TOKENS': '200000/d',
+    'GLOBAL_REQUESTS': '600/m',
+    'GLOBAL_TOKENS': None,
+    'EXEMPT_STAFF': True,  # 관리자는 사용자별 한도 제외 (전체 한도는 적용)
+}
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+
+def get_quota_config() -> dict:
+    return {**DEFAULT_LLM_QUOTA, **getattr(settings, 'LLM_QUOTA', {})}
+
+
+def parse_rate(rate: str | None) -> tuple[int, int] | None:
+    # '20/m' → (20, 60)
+    if not rate:
+        return None
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+class QuotaCounter:
+    """
+    subject(사용자 id 또는 'global') 별 고정 윈도우 카운터
+    """
+    def __init__(self, name: str, rate: str | None, cache):
+        self.name = name
+        self.limit = parse_rate(rate)
+        self.cache = cache
+
+    def _window(self, subject) -> tuple[str, float, int]:
+        # (캐시 키, 윈도우가 끝날 때까지 남은 초, 윈도우 길이)
+        count, period = self.limit
+        now = time.time()
+        start = int(now // period) * period
+        return f"llm-quota:{self.name}:{subject}:{start}", start + period - now, period
+
+    def used(self, subject) -> int:
+        key, _, _ = self._window(subject)
+        return self.cache.get(key, 0)
+
+    def add(self, subject, amount: int = 1) -> int:
+        key, _, period = self._window(subject)
+        self.cache.add(key, 0, period + 1)
+        try:
+            return self.cache.incr(key, amount)
+        except ValueError:  # 윈도우가 바뀌면서 키가 만료된 경우
+            self.cache.set(key, amount, period + 1)
+            return amount
+
+    def retry_after(self, subject) -> float:
+        return self._window(subject)[1]
+
+    def exhausted(self, subject) -> float | None:
+        # 이미 한도를 다 썼으면 다음 윈도우까지 남은 초
+        if self.limit is None or self.used(subject) < self.limit[0]:
+            return None
+        return self.retry_after(subject)
+
+    def take(self, subject) -> float | None:
+        # 1 증가시키고 한도를 넘었으면 되돌린 뒤 다음 윈도우까지 남은 초
+        if self.limit is None or self.add(subject) <= self.limit[0]:
+            return None
+        self.give_back(subject)
+        return self.retry_after(subject)
+
+    def give_back(self, subject):
+        # take() 로 차감한 1회를 되돌림 (다른 한도에 걸려 거절된 요청)
+        if self.limit is None:
+            return
+        key, _, _ = self._window(subject)
+        try:
+            self.cache.decr(key)
+        except ValueError:  # 그 사이 윈도우가 바뀜
+            pass
+
+
+class LLMQuota:
+    def __init__(self, config: dict):
+        self.enabled = config['ENABLED']
+        self.exempt_staff = config['EXEMPT_STAFF']
+        cache = caches[config['CACHE_ALIAS']]
+        self.user_requests = QuotaCounter('user-requests', config['USER_REQUESTS'], cache)
+        self.user_tokens = QuotaCounter('user-tokens', config['USER_TOKENS'], cache)
+        self.global_requests = QuotaCounter('global-requests', config['GLOBAL_REQUESTS'], cache)
+        self.global_tokens = QuotaCounter('global-tokens', config['GLOBAL_TOKENS'], cache)
+
+    def admit_user(self, user) -> float | None:
+        """
+        사용자 한도 확인 후 요청 1회 차감. 거절이면 Retry-After(초) 반환
+        """
+        if not self.enabled or (self.exempt_staff and user.is_staff):
+            return None
+        return self.user_tokens.exhausted(user.pk) or self.user_requests.take(user.pk)
+
+    def admit_global(self) -> float | None:
+        if not self.enabled:
+            return None
+        return self.global_tokens.exhausted('global') or self.global_requests.take('global')
+
+    def admit(self, user) -> float | None:
+        # 거절된 요청은 어느 한도도 차감하지 않음 (사용자 한도 통과 후 전체 한도에 걸리면 사용자 차감을 되돌림)
+        wait = self.admit_user(user)
+        if wait is not None:
+            return wait
+        wait = self.admit_global()
+        if wait is not None and not (self.exempt_staff and user.is_staff):
+            self.user_requests.give_back(user.pk)
+        return wait
+
+    def charge_tokens(self, user_id: int | None, tokens: int):
+        if not self.enabled or not tokens:
+            return
+        if user_id is not None and self.user_tokens.limit:
+            self.user_tokens.add(user_id, tokens)
+        if self.global_tokens.limit:
+            self.global_tokens.add('global', tokens)
+
+
+_quota = None
+
+
+def get_quota() -> LLMQuota:
+    global _quota
+    if _quota is None:
+        _quota = LLMQuota(get_quota_config())
+    return _quota
+
+
+def charge_tokens(tokens: int):
+    # 현재 사용량 기록 대상(usage_scope) 사용자와 전체 토큰 한도에 사용량 반영
+    try:
+        get_quota().charge_tokens(current_scope()[0], tokens)
+    except Exception as e:
+        # 캐시 장애가 LLM 응답을 막지 않도록 로그만 남김
+        print("❌ LLM 쿼터 기록 오류:", str(e))
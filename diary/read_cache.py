@@ -0,0 +1,120 @@
+"""
+조회 API 응답(직렬화된 일기 / 하루 종합 일기)과 인증 사용자 캐시
+
+- 사용자별 목록/하루 종합 일기: 사용자마다 버전 값을 두고 키에 포함한다.
+  일기나 하루 종합 일기가 저장/삭제되면 버전만 바꿔서 그 사용자의 캐시를 한 번에 무효화한다.
+- 일기 상세: 일기 id 별 키 (상세 API 는 작성자가 아니어도 조회할 수 있어서 일기 단위로 무효화)
+- 인증 사용자: JWT 의 user_id 별 키 (users.authentication.CachedJWTAuthentication)
+
+무효화는 signals.py 에서 트랜잭션 커밋 후에 실행한다. (커밋 전에 무효화하면 다른 요청이 이전 값을 다시 캐시할 수 있음)
+
+무효화는 캐시를 지우는 프로세스의 캐시에만 반영되므로 CACHES 가 프로세스 내부 캐시(LocMemCache)면
+워커가 여러 개일 때 다른 워커가 이전 값(비활성화된 사용자 포함)을 계속 사용한다.
+그래서 공유 캐시(Redis 등)가 아니면 캐시를 사용하지 않는다. (단일 프로세스면 ALLOW_LOCAL_CACHE 로 허용)
+"""
+import copy
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+# READ_CACHE 설정 기본값 (settings.READ_CACHE 로 덮어씀)
+DEFAULT_READ_CACHE = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'TTL': 60 * 10,  # 초, 무효화가 빠지는 경우(queryset.update 등)에도 이 시간이 지나면 갱신
+    'AUTH_USER_TTL': 60 * 5,
+    'ALLOW_LOCAL_CACHE': False,  # 프로세스 내부 캐시 허용 (runserver 처럼 프로세스가 하나일 때만)
+}
+
+_MISSING = object()
+
+
+def get_read_cache_config() -> dict:
+    return {**DEFAULT_READ_CACHE, **getattr(settings, 'READ_CACHE', {})}
+
+
+def _cache():
+    return caches[get_read_cache_config()['CACHE_ALIAS']]
+
+
+def read_cache_enabled() -> bool:
+    config = get_read_cache_config()
+    if not config['ENABLED']:
+        return False
+    return config['ALLOW_LOCAL_CACHE'] or not isinstance(_cache(), LocMemCache)
+
+
+def _version_key(user_id) -> str:
+    return f"read-cache:version:{user_id}"
+
+
+def user_cache_version(user_id) -> int:
+    cache = _cache()
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        # 버전 키가 지워져도 예전 키와 겹치지 않도록 1 부터 세지 않고 현재 시각 사용
+        version = time.time_ns()
+        if not cache.add(_version_key(user_id), version, None):
+            version = cache.get(_version_key(user_id), version)
+    return version
+
+
+def invalidate_user_payloads(user_id):
+    _cache().set(_version_key(user_id), time.time_ns(), None)
+
+
+def entry_payload_key(entry_id) -> str:
+    return f"read-cache:entry:{entry_id}"
+
+
+def invalidate_entry_payload(entry_id):
+    _cache().delete(entry_payload_key(entry_id))
+
+
+def cached_payload(key: str, build):
+    """
+    캐시에 있으면 그 값을, 없으면 build() 결과를 저장하고 반환 (build 에서 발생한 예외(404 등)는 캐시하지 않음)
+    """
+    if not read_cache_enabled():
+        return build()
+    cache = _cache()
+    payload = cache.get(key, _MISSING)
+    if payload is _MISSING:
+        payload = build()
+        cache.set(key, payload, get_read_cache_config()['TTL'])
+    return payload
+
+
+def cached_user_payload(user_id, name: str, build):
+    if not read_cache_enabled():
+        return build()
+    return cached_payload(f"read-cache:{user_id}:{user_cache_version(user_id)}:{name}", build)
+
+
+def auth_user_key(user_id) -> str:
+    return f"read-cache:auth-user:{user_id}"
+
+
+def get_cached_auth_user(user_id):
+    # (사용자, 토큰 폐기 확인용 비밀번호 해시 값) 또는 None
+    if not read_cache_enabled():
+        return None
+    return _cache().get(auth_user_key(user_id))
+
+
+def set_cached_auth_user(user_id, user, password_digest):
+    """
+    비밀번호 해시는 캐시에 넣지 않음: password 를 지연 로딩(deferred) 필드로 두어서 필요할 때만 DB 에서 읽고,
+    토큰 폐기 확인에는 토큰에 들어 있는 것과 같은 해시 값(password_digest)만 함께 저장
+    """
+    if not read_cache_enabled():
+        return
+    cached = copy.copy(user)
+    cached.__dict__.pop('password', None)
+    _cache().set(auth_user_key(user_id), (cached, password_digest), get_read_cache_config()['AUTH_USER_TTL'])
+
+
+def invalidate_auth_user(user_id):
+    _cache().delete(auth_user_key(user_id))
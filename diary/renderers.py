@@ -0,0 +1,21 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer
+
+
+def format_sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, cls=DjangoJSONEncoder)}\n\n"
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Accept: text/event-stream 요청을 허용하기 위한 렌더러
+    (정상 응답은 StreamingHttpResponse 로 직접 보내고, 오류 응답만 error 이벤트로 렌더링)
+    """
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_sse('error', data).encode(self.charset)
@@ -0,0 +1,161 @@
+from collections import Counter
+from datetime import date
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import DailyEmotionRollup, DiaryEntry, MonthlyEmotionRollup, User
+from .dates import day_bounds
+
+# 집계 필드 → DiaryEntry 필드
+SUM_FIELDS = {
+    'happiness_sum': 'happiness_score',
+    'joy_sum': 'joy',
+    'anger_sum': 'anger',
+    'sadness_sum': 'sadness',
+    'pleasure_sum': 'pleasure',
+}
+ENTRY_COLUMNS = ('id', *SUM_FIELDS.values(), 'hashtags')
+
+
+class RollupAccumulator:
+    def __init__(self):
+        self.count = 0
+        self.sums = dict.fromkeys(SUM_FIELDS, 0)
+        self.hashtags = Counter()
+        self.top_entry_id = None
+        self.top_happiness = 0
+
+    def _update_top(self, entry_id, happiness):
+        # 행복지수가 같으면 먼저 작성된(id가 작은) 일기
+        if entry_id is None:
+            return
+        if (
+            self.top_entry_id is None
+            or happiness > self.top_happiness
+            or (happiness == self.top_happiness and entry_id < self.top_entry_id)
+        ):
+            self.top_entry_id = entry_id
+            self.top_happiness = happiness
+
+    def add_entry(self, row: dict):
+        self.count += 1
+        for rollup_field, entry_field in SUM_FIELDS.items():
+            self.sums[rollup_field] += row[entry_field] or 0
+        self.hashtags.update(row['hashtags'] or [])
+        self._update_top(row['id'], row['happiness_score'] or 0)
+
+    def add_rollup(self, rollup):
+        self.count += rollup.count
+        for rollup_field in SUM_FIELDS:
+            self.sums[rollup_field] += getattr(rollup, rollup_field)
+        self.hashtags.update(rollup.hashtag_counts)
+        self._update_top(rollup.top_entry_id, rollup.top_happiness)
+
+    def merge(self, other: 'RollupAccumulator'):
+        self.count += other.count
+        for rollup_field, value in other.sums.items():
+            self.sums[rollup_field] += value
+        self.hashtags.update(other.hashtags)
+        self._update_top(other.top_entry_id, other.top_happiness)
+
+    def as_fields(self) -> dict:
+        return {
+            'count': self.count,
+            **self.sums,
+            'hashtag_counts': dict(self.hashtags),
+            'top_entry_id': self.top_entry_id,
+            'top_happiness': self.top_happiness,
+        }
+
+
+def refresh_month_rollup(user_id, year: int, month: int):
+    first_day = date(year, month, 1)
+    next_month = date(year + month // 12, month % 12 + 1, 1)
+    accumulator = RollupAccumulator()
+    rollups = DailyEmotionRollup.objects.filter(user_id=user_id, date__gte=first_day, date__lt=next_month)
+    for rollup in rollups:
+        accumulator.add_rollup(rollup)
+
+    if accumulator.count:
+        MonthlyEmotionRollup.objects.update_or_create(
+            user_id=user_id, year=year, month=month, defaults=accumulator.as_fields()
+        )
+    else:
+        MonthlyEmotionRollup.objects.filter(user_id=user_id, year=year, month=month).delete()
+
+
+def refresh_day_rollup(user_id, day):
+    """
+    하루치 일기로 일별 집계를 다시 계산하고, 그 달의 월별 집계를 일별 집계로부터 갱신
+    """
+    start, end = day_bounds(day)
+    rows = DiaryEntry.objects.filter(
+        user_id=user_id, created_at__gte=start, created_at__lt=end
+    ).values(*ENTRY_COLUMNS)
+
+    accumulator = RollupAccumulator()
+    for row in rows:
+        accumulator.add_entry(row)
+
+    if accumulator.count:
+        DailyEmotionRollup.objects.update_or_create(
+            user_id=user_id, date=day, defaults=accumulator.as_fields()
+        )
+    else:
+        DailyEmotionRollup.objects.filter(user_id=user_id, date=day).delete()
+
+    refresh_month_rollup(user_id, day.year, day.month)
+
+
+def refresh_rollups_for_entry(entry: DiaryEntry):
+    """
+    일기 저장/삭제 시그널에서 호출. 일기를 저장한 쪽의 트랜잭션이 있으면 그 안에서 실행됨 (없으면 새 트랜잭션)
+    집계는 일기를 다시 읽어 덮어쓰므로 동시에 저장된 일기를 서로 못 본 채 계산하면 한쪽이 빠진다.
+    같은 사용자의 갱신은 사용자 행을 잠가서 차례로 실행하고, 잠금을 얻은 뒤에 일기를 읽음
+    (집계 행은 아직 없을 수 있고 월별 집계는 여러 날짜가 함께 갱신하므로 사용자 행을 잠금)
+    """
+    with transaction.atomic():
+        list(User.objects.select_for_update().filter(pk=entry.user_id).values_list('pk', flat=True))
+        refresh_day_rollup(entry.user_id, timezone.localdate(entry.created_at))
+
+
+def rebuild_rollups(user_ids=None, entry_model=DiaryEntry, daily_model=DailyEmotionRollup,
+                    monthly_model=MonthlyEmotionRollup, batch_size: int = 1000) -> tuple[int, int]:
+    """
+    일기를 한 번 훑어서 일별/월별 집계를 새로 만든다 (user_ids 가 있으면 해당 사용자만).
+    마이그레이션에서도 쓸 수 있도록 모델을 인자로 받음. (생성된 일별, 월별 집계 수) 반환
+    """
+    entries = entry_model.objects.order_by()
+    existing_daily = daily_model.objects.all()
+    existing_monthly = monthly_model.objects.all()
+    if user_ids is not None:
+        entries = entries.filter(user_id__in=user_ids)
+        existing_daily = existing_daily.filter(user_id__in=user_ids)
+        existing_monthly = existing_monthly.filter(user_id__in=user_ids)
+
+    days = {}
+    for row in entries.values('user_id', 'created_at', *ENTRY_COLUMNS).iterator(chunk_size=2000):
+        key = (row['user_id'], timezone.localdate(row['created_at']))
+        days.setdefault(key, RollupAccumulator()).add_entry(row)
+
+    months = {}
+    for (user_id, day), accumulator in days.items():
+        months.setdefault((user_id, day.year, day.month), RollupAccumulator()).merge(accumulator)
+
+    with transaction.atomic():
+        existing_daily.delete()
+        existing_monthly.delete()
+
+        daily_model.objects.bulk_create(
+            [daily_model(user_id=user_id, date=day, **acc.as_fields()) for (user_id, day), acc in days.items()],
+            batch_size=batch_size,
+        )
+        monthly_model.objects.bulk_create(
+            [
+                monthly_model(user_id=user_id, year=year, month=month, **acc.as_fields())
+                for (user_id, year, month), acc in months.items()
+            ],
+            batch_size=batch_size,
+        )
+    return len(days), len(months)
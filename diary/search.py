@@ -0,0 +1,215 @@
+"""
+해시태그 / 전문(full-text) 검색 색인
+
+- 해시태그: DiaryEntry.hashtags(JSON 목록)를 DiaryHashtag 테이블에 태그 하나당 한 행으로 펼쳐 둔다.
+  일기 저장 시 signals.py 에서 갱신하고, bulk_create 처럼 시그널이 없는 경로는 rebuild_hashtag_index 로 다시 만든다.
+- 전문 검색: raw_input / generated_diary 대상
+  - SQLite: FTS5 외부 콘텐츠 테이블 + 트리거 (일기 테이블이 바뀌면 DB 가 직접 색인을 갱신)
+  - PostgreSQL: to_tsvector 식에 대한 GIN 인덱스
+  한국어는 조사가 붙어서 형태가 바뀌므로 검색어의 각 단어를 접두어로 검색한다. ("외로" → 외로운, 외로웠다)
+
+SQLite 는 테이블 구조를 바꾸는 마이그레이션에서 일기 테이블을 새로 만들면서 트리거가 사라지므로
+migrate 가 끝날 때마다(post_migrate) ensure_fulltext_index 로 다시 만든다.
+"""
+import re
+
+from django.db import connection, transaction
+from django.db.models import Count, Q
+
+from .models import DiaryEntry, DiaryHashtag
+
+TAG_MAX_LENGTH = DiaryHashtag._meta.get_field('tag').max_length
+QUERY_TERM_PATTERN = re.compile(r"\w+")
+MAX_QUERY_TERMS = 10
+
+FTS_TABLE = 'diary_entry_fts'
+ENTRY_TABLE = DiaryEntry._meta.db_table
+SQLITE_FTS_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        raw_input, generated_diary, content='{ENTRY_TABLE}', content_rowid='id', tokenize='unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {ENTRY_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, raw_input, generated_diary) VALUES (new.id, new.raw_input, new.generated_diary);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {ENTRY_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, raw_input, generated_diary)
+        VALUES ('delete', old.id, old.raw_input, old.generated_diary);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF raw_input, generated_diary ON {ENTRY_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, raw_input, generated_diary)
+        VALUES ('delete', old.id, old.raw_input, old.generated_diary);
+        INSERT INTO {FTS_TABLE}(rowid, raw_input, generated_diary) VALUES (new.id, new.raw_input, new.generated_diary);
+    END""",
+]
+# 인덱스와 검색 쿼리의 식이 같아야 GIN 인덱스를 사용함
+POSTGRES_DOCUMENT = "to_tsvector('simple', coalesce(raw_input, '') || ' ' || coalesce(generated_diary, ''))"
+POSTGRES_FTS_INDEX = f"{ENTRY_TABLE}_fts_idx"
+
+
+# ======================
+# 해시태그
+# ======================
+
+def normalize_tag(tag) -> str:
+    return str(tag).strip().lstrip('#').strip()[:TAG_MAX_LENGTH]
+
+
+def entry_tags(hashtags) -> list[str]:
+    # 정규화 후 빈 태그, 중복 제거 (순서 유지)
+    tags = (normalize_tag(tag) for tag in hashtags or [])
+    return list(dict.fromkeys(tag for tag in tags if tag))
+
+
+def sync_entry_hashtags(entry: DiaryEntry):
+    """
+    일기 하나의 해시태그 행을 hashtags 필드와 맞춤 (바뀐 태그만 추가/삭제)
+    """
+    tags = entry_tags(entry.hashtags)
+    with transaction.atomic():
+        existing = {row.tag: row for row in DiaryHashtag.objects.filter(entry=entry)}
+        removed = [row.pk for tag, row in existing.items() if tag not in tags]
+        if removed:
+            DiaryHashtag.objects.filter(pk__in=removed).delete()
+        moved = [row.pk for tag, row in existing.items() if tag in tags and row.created_at != entry.created_at]
+        if moved:
+            DiaryHashtag.objects.filter(pk__in=moved).update(created_at=entry.created_at)
+        DiaryHashtag.objects.bulk_create([
+            DiaryHashtag(user_id=entry.user_id, entry=entry, tag=tag, created_at=entry.created_at)
+            for tag in tags if tag not in existing
+        ])
+
+
+def rebuild_hashtag_index(user_ids=None, entry_model=DiaryEntry, hashtag_model=DiaryHashtag,
+                          batch_size: int = 1000) -> int:
+    """
+    일기를 한 번 훑어서 해시태그 색인을 새로 만든다 (user_ids 가 있으면 해당 사용자만).
+    마이그레이션에서도 쓸 수 있도록 모델을 인자로 받음. 만들어진 행 수 반환
+    """
+    entries = entry_model.objects.order_by()
+    existing = hashtag_model.objects.all()
+    if user_ids is not None:
+        entries = entries.filter(user_id__in=user_ids)
+        existing = existing.filter(user_id__in=user_ids)
+
+    total = 0
+    with transaction.atomic():
+        existing.delete()
+        rows = []
+        for entry_id, user_id, created_at, hashtags in entries.values_list(
+            'id', 'user_id', 'created_at', 'hashtags'
+        ).iterator(chunk_size=2000):
+            rows.extend(
+                hashtag_model(user_id=user_id, entry_id=entry_id, tag=tag, created_at=created_at)
+                for tag in entry_tags(hashtags)
+            )
+            if len(rows) >= batch_size:
+                hashtag_model.objects.bulk_create(rows, batch_size=batch_size)
+                total += len(rows)
+                rows = []
+        hashtag_model.objects.bulk_create(rows, batch_size=batch_size)
+        total += len(rows)
+    return total
+
+
+def _in_range(queryset, start=None, end=None):
+    # start 이상, end 미만 (aware datetime)
+    if start is not None:
+        queryset = queryset.filter(created_at__gte=start)
+    if end is not None:
+        queryset = queryset.filter(created_at__lt=end)
+    return queryset
+
+
+def tag_frequencies(user, start=None, end=None, limit: int | None = None) -> list[tuple[str, int]]:
+    """
+    기간 안의 일기 해시태그 빈도 [(태그, 횟수)] (많은 순, 같으면 태그 이름순)
+    """
+    rows = _in_range(DiaryHashtag.objects.filter(user=user), start, end)
+    rows = rows.values('tag').annotate(count=Count('id')).order_by('-count', 'tag')
+    if limit is not None:
+        rows = rows[:limit]
+    return [(row['tag'], row['count']) for row in rows]
+
+
+def entries_with_tag(user, tag: str, start=None, end=None):
+    """
+    태그가 달린 일기 쿼리셋 (해시태그 색인에서 일기 id 를 찾아 조회)
+    """
+    tagged = _in_range(DiaryHashtag.objects.filter(user=user, tag=normalize_tag(tag)), start, end)
+    return DiaryEntry.objects.filter(user=user, pk__in=tagged.values('entry_id'))
+
+
+# ======================
+# 전문 검색
+# ======================
+
+def ensure_fulltext_index(using=None):
+    """
+    전문 검색 색인(FTS5 테이블과 트리거 / GIN 인덱스)이 없으면 만든다 (여러 번 실행해도 됨)
+    """
+    db = connection if using is None else using
+    with db.cursor() as cursor:
+        if db.vendor == 'sqlite':
+            for statement in SQLITE_FTS_SCHEMA:
+                cursor.execute(statement)
+        elif db.vendor == 'postgresql':
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {POSTGRES_FTS_INDEX} ON {ENTRY_TABLE} USING GIN ({POSTGRES_DOCUMENT})")
+
+
+def rebuild_fulltext_index(using=None):
+    # 일기 테이블 내용으로 FTS5 색인을 다시 만든다 (PostgreSQL 은 인덱스가 자동으로 유지됨)
+    db = connection if using is None else using
+    ensure_fulltext_index(db)
+    if db.vendor == 'sqlite':
+        with db.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def drop_fulltext_index(using=None):
+    db = connection if using is None else using
+    with db.cursor() as cursor:
+        if db.vendor == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        elif db.vendor == 'postgresql':
+            cursor.execute(f"DROP INDEX IF EXISTS {POSTGRES_FTS_INDEX}")
+
+
+def query_terms(query: str) -> list[str]:
+    return QUERY_TERM_PATTERN.findall(query)[:MAX_QUERY_TERMS]
+
+
+def search_entries_fulltext(user, query: str, limit: int = 20) -> list[int]:
+    """
+    raw_input / generated_diary 에 검색어의 모든 단어(접두어)가 들어 있는 일기 id 를 관련도 순으로 반환
+    """
+    terms = query_terms(query)
+    if not terms:
+        return []
+
+    if connection.vendor == 'sqlite':
+        # 단어를 따옴표로 감싸서 FTS5 문법(AND, NEAR, 컬럼 필터 등)으로 해석되지 않게 함
+        match = ' '.join(f'"{term}"*' for term in terms)
+        sql = (
+            f"SELECT e.id FROM {FTS_TABLE} JOIN {ENTRY_TABLE} e ON e.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s AND e.user_id = %s ORDER BY bm25({FTS_TABLE}), e.id DESC LIMIT %s"
+        )
+        params = [match, user.pk, limit]
+    elif connection.vendor == 'postgresql':
+        tsquery = ' & '.join(f"{term}:*" for term in terms)
+        sql = (
+            f"SELECT id FROM {ENTRY_TABLE} WHERE user_id = %s AND {POSTGRES_DOCUMENT} @@ to_tsquery('simple', %s) "
+            f"ORDER BY ts_rank({POSTGRES_DOCUMENT}, to_tsquery('simple', %s)) DESC, id DESC LIMIT %s"
+        )
+        params = [user.pk, tsquery, tsquery, limit]
+    else:
+        # 전문 검색 색인이 없는 DB 는 부분 문자열 검색으로 대신함
+        entries = DiaryEntry.objects.filter(user=user)
+        for term in terms:
+            entries = entries.filter(Q(raw_input__icontains=term) | Q(generated_diary__icontains=term))
+        return list(entries.order_by('-created_at', '-id').values_list('id', flat=True)[:limit])
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
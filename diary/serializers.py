@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import DiaryEntry, DailySummaryDiary
+from .models import DiaryEntry, DailySummaryDiary, GenerationJob
 
 
 class DiaryEntrySerializer(serializers.ModelSerializer):
@@ -45,4 +45,18 @@ class DailySummarySerializer(serializers.ModelSerializer):
             'generated_diary',
             'original_inputs'
         ]
-        read_only_fields = ['user', 'created_at']
\ No newline at end of file
+        read_only_fields = ['user', 'created_at']
+
+class GenerationJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = GenerationJob
+        fields = [
+            'id',
+            'kind',
+            'status',
+            'result',
+            'error',
+            'created_at',
+            'updated_at',
+        ]
+        read_only_fields = fields
@@ -1,103 +1,456 @@
+import asyncio
+import contextvars
+import hashlib
+import json
 import os
 import re
+import threading
 from dotenv import load_dotenv
-from openai import OpenAI
-from .models import DiaryEntry, DailySummaryDiary
-from datetime import datetime
-from django.db import connection
+import httpx
+from asgiref.sync import sync_to_async
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, OpenAI
+from .models import DiaryEntry, DailySummaryDiary, MonthlyEmotionRollup, MonthlyRetrospect
+from .llm_cache import get_llm_cache, make_cache_key
+from .llm_gateway import LLMGateway, estimate_tokens, get_gateway_config
+from .prompts import get_prompt, render_system_prompt
+from .quotas import charge_tokens
+from .usage import get_usage_ledger
+from .singleflight import AsyncSingleFlight, SingleFlight
+from .dates import day_bounds, month_bounds
+from datetime import date, datetime
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import NamedTuple
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.db import connection, transaction
+from django.db.models.functions import TruncDate
 
 # .env 파일에서 OpenAI API 키 로드
 load_dotenv()
 api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=api_key)
+# 재시도는 llm_gateway 에서 처리하므로 SDK 자체 재시도는 끔
+client = OpenAI(api_key=api_key, max_retries=0)
+
+# ASGI(비동기) 뷰용 클라이언트: 하나의 커넥션 풀을 모든 요청이 공유
+async_client = AsyncOpenAI(
+    api_key=api_key,
+    max_retries=0,
+    http_client=DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", 200)),
+            max_keepalive_connections=int(os.getenv("OPENAI_MAX_KEEPALIVE", 50)),
+        ),
+    ),
+)
+
+# 모든 LLM 호출은 게이트웨이를 거침 (속도 제한, 동시 호출 제한, 재시도, 서킷 브레이커)
+llm_gateway = LLMGateway(client, async_client, get_gateway_config())
+
+# 프로세스 전체 LLM 토큰 사용량 (백필 등 일괄 작업의 사용량 보고용)
+class TokenUsageCounter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def add(self, usage):
+        if usage is None:
+            return
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += usage.prompt_tokens or 0
+            self.completion_tokens += getattr(usage, "completion_tokens", 0) or 0  # 임베딩 응답에는 없음
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "total_tokens": self.prompt_tokens + self.completion_tokens,
+            }
+
+token_usage = TokenUsageCounter()
+
+# 응답 형식(text/json)별 파싱 결과 집계: ok(정상) / fallback(json 실패 후 텍스트 파싱 성공) / failed(분석 실패)
+class ParseMetrics:
+    OUTCOMES = ("ok", "fallback", "failed")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}
+
+    def record(self, mode: str, outcome: str):
+        with self._lock:
+            counts = self.counts.setdefault(mode, dict.fromkeys(self.OUTCOMES, 0))
+            counts[outcome] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            result = {}
+            for mode, counts in self.counts.items():
+                total = sum(counts.values())
+                result[mode] = {
+                    **counts,
+                    "total": total,
+                    "failure_rate": round(counts["failed"] / total, 3) if total else 0,
+                    "fallback_rate": round(counts["fallback"] / total, 3) if total else 0,
+                }
+            return result
+
+parse_metrics = ParseMetrics()
+
+# 하루 종합 일기 생성 중복 호출 병합용
+_daily_summary_flight = SingleFlight()
+_daily_summary_flight_async = AsyncSingleFlight()
+_monthly_retrospect_flight = SingleFlight()
+_monthly_retrospect_flight_async = AsyncSingleFlight()
 
 # 숫자를 문자열에서 추출하는 유틸 함수 (ex: "행복지수: 80%" → 80)
+NUMBER_PATTERN = re.compile(r"\d+")
+
 def extract_number(text: str) -> int:
-    match = re.search(r"\d+", text)
+    match = NUMBER_PATTERN.search(text)
     return int(match.group()) if match else 0
 
-# GPT 응답을 파싱하여 일기 내용, 감정 정보, 해시태그 추출
-def parse_gpt_output(content: str) -> dict:
-    diary = ""
-    emotion_summary, happiness_score, joy, anger, sadness, pleasure, hashtags = "분석 실패", 0, 0, 0, 0, 0, []
+# GPT 응답 파싱용 패턴 (모듈 로드 시 한 번만 컴파일)
+SECTION_NAMES = {"일기": "diary", "감정": "emotion", "해시태그": "hashtags"}
+SECTION_PATTERN = re.compile(r"\[(일기|감정|해시태그)\]")
+EMOTION_KEYS = {
+    "감정": "emotion",
+    "행복지수": "happiness_score",
+    "기쁨": "joy",
+    "분노": "anger",
+    "슬픔": "sadness",
+    "즐거움": "pleasure",
+}
+# "- 기쁨: 40%" 처럼 줄 단위 "키: 값" (순서와 상관없이 키 이름으로 읽음)
+EMOTION_LINE_PATTERN = re.compile(r"^[\s\-*•]*(감정|행복지수|기쁨|분노|슬픔|즐거움)\s*[:：]\s*(.*?)\s*$", re.MULTILINE)
+HASHTAG_SPLIT_PATTERN = re.compile(r"[#,\s]+")
+EMOTION_FIELDS = ("joy", "anger", "sadness", "pleasure")
+
+# 기쁨/분노/슬픔/즐거움 합이 100이 되도록 비율 유지하며 정수로 맞춤 (모두 0이면 그대로)
+def normalize_distribution(values: dict) -> dict:
+    total = sum(values.values())
+    if total == 0 or total == 100:
+        return values
+    scaled = {key: value * 100 / total for key, value in values.items()}
+    result = {key: int(value) for key, value in scaled.items()}
+    # 남는 몫은 소수점 이하가 큰 항목부터 1씩 배분
+    remainder = 100 - sum(result.values())
+    for key in sorted(scaled, key=lambda k: scaled[k] - result[k], reverse=True)[:remainder]:
+        result[key] += 1
+    return result
 
-    diary_match = re.search(r"\[일기\](.*?)($|\[감정\]|\[해시태그\])", content, re.DOTALL)
-    emotion_match = re.search(r"\[감정\](.*?)($|\[일기\]|\[해시태그\])", content, re.DOTALL)
-    hashtag_match = re.search(r"\[해시태그\](.*?)($|\[일기\]|\[감정\])", content, re.DOTALL)
+def split_sections(content: str) -> dict:
+    # 구간 표시를 한 번만 훑어서 {구간 이름: 내용} 반환 (같은 구간이 여러 번 나오면 내용이 있는 첫 구간 사용)
+    sections = {}
+    matches = list(SECTION_PATTERN.finditer(content))
+    for match, next_match in zip(matches, matches[1:] + [None]):
+        name = SECTION_NAMES[match.group(1)]
+        end = next_match.start() if next_match else len(content)
+        text = content[match.end():end].strip()
+        if text and not sections.get(name):
+            sections[name] = text
+    return sections
 
-    if diary_match:
-        diary = diary_match.group(1).strip()
+def parse_emotion_section(text: str) -> dict:
+    values = {}
+    for key, value in EMOTION_LINE_PATTERN.findall(text):
+        values.setdefault(EMOTION_KEYS[key], value)
 
-    if emotion_match:
-        lines = emotion_match.group(1).strip().splitlines()
-        if len(lines) >= 5:
-            emotion_summary = lines[0].split(":")[-1].strip()
-            happiness_score = extract_number(lines[1])
-            joy = extract_number(lines[2])
-            anger = extract_number(lines[3])
-            sadness = extract_number(lines[4])
-            pleasure = extract_number(lines[5])
+    # 감정 이름이 없으면 분석 실패로 보고 점수도 모두 0 (일부 점수만 남지 않도록)
+    if not values.get("emotion"):
+        return {"emotion": "분석 실패", **dict.fromkeys(("happiness_score", *EMOTION_FIELDS), 0)}
 
-    if hashtag_match:
-        hashtags = [tag.strip().lstrip("#") for tag in re.split(r"[#,\\s]+", hashtag_match.group(1)) if tag.strip()]
+    result = {}
+    for field in ("happiness_score", *EMOTION_FIELDS):
+        result[field] = min(extract_number(values.get(field, "")), 100)
+    result.update(normalize_distribution({field: result[field] for field in EMOTION_FIELDS}))
+    result["emotion"] = values["emotion"]
+    return result
+
+# GPT 응답을 파싱하여 일기 내용, 감정 정보, 해시태그 추출
+def parse_gpt_output(content: str) -> dict:
+    sections = split_sections(content)
+    emotion = parse_emotion_section(sections.get("emotion", ""))
+
+    hashtags = []
+    for tag in HASHTAG_SPLIT_PATTERN.split(sections.get("hashtags", "")):
+        if tag and tag not in hashtags:
+            hashtags.append(tag)
 
     return {
-        "diary": diary,
-        "emotion": emotion_summary,
-        "happiness_score": happiness_score,
-        "joy": joy,
-        "anger": anger,
-        "sadness": sadness,
-        "pleasure": pleasure,
+        "diary": sections.get("diary", ""),
+        "emotion": emotion["emotion"],
+        "happiness_score": emotion["happiness_score"],
+        "joy": emotion["joy"],
+        "anger": emotion["anger"],
+        "sadness": emotion["sadness"],
+        "pleasure": emotion["pleasure"],
         "hashtags": hashtags,
     }
 
+# JSON 모드 응답 검증/파싱, 형식이 맞지 않으면 ValueError
+def parse_structured_output(content: str) -> dict:
+    content = content.strip()
+    if content.startswith("```"):
+        # ```json ... ``` 으로 감싼 응답
+        content = content.strip("`").removeprefix("json").strip()
+    data = json.loads(content)
+    if not isinstance(data, dict):
+        raise ValueError("JSON 객체가 아닙니다.")
+
+    diary, emotion = data.get("diary"), data.get("emotion")
+    if not isinstance(diary, str) or not diary.strip():
+        raise ValueError("diary 값이 없습니다.")
+    if not isinstance(emotion, str) or not emotion.strip():
+        raise ValueError("emotion 값이 없습니다.")
+
+    scores = {}
+    for field in ("happiness_score", *EMOTION_FIELDS):
+        value = data.get(field)
+        if isinstance(value, str):
+            value = extract_number(value) if NUMBER_PATTERN.search(value) else None
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= 100:
+            raise ValueError(f"{field} 값이 0~100 사이의 숫자가 아닙니다.")
+        scores[field] = round(value)
+    scores.update(normalize_distribution({field: scores[field] for field in EMOTION_FIELDS}))
+
+    raw_tags = data.get("hashtags", [])
+    if isinstance(raw_tags, str):
+        raw_tags = [raw_tags]
+    if not isinstance(raw_tags, list) or not all(isinstance(tag, str) for tag in raw_tags):
+        raise ValueError("hashtags 값이 문자열 목록이 아닙니다.")
+    hashtags = []
+    for tag in (part for raw in raw_tags for part in HASHTAG_SPLIT_PATTERN.split(raw)):
+        if tag and tag not in hashtags:
+            hashtags.append(tag)
+
+    return {"diary": diary.strip(), "emotion": emotion.strip(), **scores, "hashtags": hashtags}
+
+def request_output_mode(request: dict) -> str:
+    return "json" if request.get("response_format") else "text"
+
+# 응답 형식에 맞춰 파싱, JSON 이 깨졌으면 텍스트 양식 파싱으로 한 번 더 시도 (결과는 parse_metrics 에 기록)
+def parse_llm_output(content: str, mode: str = "text") -> dict:
+    if mode == "json":
+        try:
+            gpt = parse_structured_output(content)
+            parse_metrics.record(mode, "ok")
+            return gpt
+        except ValueError:
+            gpt = parse_gpt_output(content)
+            parse_metrics.record(mode, "fallback" if gpt["emotion"] != "분석 실패" else "failed")
+            return gpt
+
+    gpt = parse_gpt_output(content)
+    parse_metrics.record(mode, "ok" if gpt["emotion"] != "분석 실패" else "failed")
+    return gpt
+
+# GPT 분석 결과를 DiaryEntry 인스턴스에 반영 (저장은 호출하는 쪽에서)
+def apply_gpt_result(diary: DiaryEntry, gpt_result: dict) -> DiaryEntry:
+    diary.generated_diary = gpt_result.get('diary', '')
+    diary.emotion = gpt_result.get('emotion', '')
+    diary.happiness_score = gpt_result.get('happiness_score', 0)
+    diary.joy = gpt_result.get('joy', 0)
+    diary.anger = gpt_result.get('anger', 0)
+    diary.sadness = gpt_result.get('sadness', 0)
+    diary.pleasure = gpt_result.get('pleasure', 0)
+    diary.hashtags = gpt_result.get('hashtags', [])
+    return diary
+
+# 요청 dict 에서 API 인자가 아닌 값(prompt_id) 제외
+def llm_call_kwargs(request: dict) -> dict:
+    return {key: value for key, value in request.items() if key != "prompt_id"}
+
+# 토큰 사용량 집계 + 토큰 쿼터 차감 + 사용량 기록 (기록은 버퍼에 쌓였다가 백그라운드에서 한 번에 저장)
+def record_llm_usage(request: dict, usage=None, latency: float = 0.0, cache_hit: bool = False):
+    token_usage.add(usage)
+    charge_tokens(getattr(usage, "total_tokens", 0) or 0)
+    get_usage_ledger().record(
+        model=request.get("model"),
+        prompt=request.get("prompt_id", ""),
+        prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+        completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+        latency_ms=int(latency * 1000),
+        cache_hit=cache_hit,
+    )
+
+# 게이트웨이를 거쳐 LLM 호출 (모든 동기 호출은 여기를 거침)
+def create_completion(request: dict):
+    started = perf_counter()
+    response = llm_gateway.create(**llm_call_kwargs(request))
+    record_llm_usage(request, response.usage, perf_counter() - started)
+    return response
+
+# 캐시를 거쳐 GPT를 호출하고 파싱 결과 반환 (분석 실패한 응답은 캐시하지 않음)
+def complete_and_parse(request: dict) -> dict:
+    llm_cache = get_llm_cache()
+    key = make_cache_key(request)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        record_llm_usage(request, cache_hit=True)
+        return cached
+
+    response = create_completion(request)
+    content = response.choices[0].message.content.strip()
+
+    gpt = parse_llm_output(content, request_output_mode(request))
+    if gpt["emotion"] != "분석 실패":
+        llm_cache.set(key, gpt)
+    return gpt
+
+# LLM 응답 형식: text([일기]/[감정]/[해시태그] 양식) | json(JSON 객체로 받아서 서버에서 검증)
+LLM_OUTPUT_MODES = ("text", "json")
+LLM_OUTPUT_MODE = os.getenv("LLM_OUTPUT_MODE", "text")
+if LLM_OUTPUT_MODE not in LLM_OUTPUT_MODES:
+    LLM_OUTPUT_MODE = "text"
+
+def with_output_mode(request: dict, output_mode: str) -> dict:
+    if output_mode == "json":
+        request["response_format"] = {"type": "json_object"}
+    return request
+
+# 감성 일기 생성 요청 파라미터 구성 (동기/비동기 공용)
+def build_diary_request(user_input: str, output_mode: str | None = None) -> dict:
+    output_mode = output_mode or LLM_OUTPUT_MODE
+    system_prompt, prompt_id = render_system_prompt("diary", output_mode)
+    return with_output_mode(dict(
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_input},
+        ],
+        temperature=0.8,
+        max_tokens=700,
+        prompt_id=prompt_id,
+    ), output_mode)
+
 # 사용자의 일기를 기반으로 GPT를 호출하여 감성 일기 생성
 def generate_diary_with_gpt(user_input: str) -> dict:
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "너는 감성 일기 작가야. 사용자의 하루를 바탕으로 감성적인 일기를 작성해.\n"
-                        "응답 형식을 반드시 아래 [ ] 순서대로, 양식 그대로 출력해줘.\n"
-                        "조건:\n"
-                        "- 감정은 하나만\n"
-                        "- 행복지수는 0~100 사이의 백분율\n"
-                        "- 기쁨+분노+슬픔+즐거움 = 100(행복지수는 계산에 넣지 마)\n"
-                        "- 해시태그는 3~5개\n\n"
-                        "[일기]\n(감성적인 하루 종합 일기 내용)\n\n"
-                        "[감정]\n감정: ...\n행복지수: ...\n기쁨: ...\n분노: ...\n슬픔: ...\n즐거움: ...\n\n"
-                        "[해시태그]\n#..."
-                    )
-                },
-                {"role": "user", "content": user_input},
-            ],
-            temperature=0.8,
-            max_tokens=700,
-        )
-
-        content = response.choices[0].message.content.strip()
-        print("🔍 GPT 응답 원문:\n", content)  # 디버깅용 출력
-
-        return parse_gpt_output(content)
+        return complete_and_parse(build_diary_request(user_input))
 
     except Exception as e:
         print("❌ GPT 호출 오류:", str(e))
         return {"error": f"OpenAI API 호출 중 오류: {str(e)}"}
 
-# 하루 동안 여러 개의 일기를 기반으로 GPT 요약 및 감성 분석 수행
-def generate_daily_summary(user, date: datetime.date) -> dict:
-    connection.close()
-    entries = DiaryEntry.objects.filter(user=user, created_at__date=date).order_by('created_at')
+# 스트리밍 응답 조각을 받아 [일기]/[감정]/[해시태그] 구간을 도착하는 대로 인식
+class GptOutputStreamParser:
+    MAX_MARKER_LENGTH = len("[해시태그]")
+
+    def __init__(self):
+        self.text = ""
+        self.section = None
+        self._pos = 0  # 이벤트로 내보낸 위치
+
+    def feed(self, chunk: str) -> list[dict]:
+        self.text += chunk
+        return list(self._drain(final=False))
+
+    def close(self) -> list[dict]:
+        return list(self._drain(final=True))
+
+    def _drain(self, final: bool):
+        while True:
+            match = SECTION_PATTERN.search(self.text, self._pos)
+            if match:
+                if match.start() > self._pos:
+                    yield self._token(self.text[self._pos:match.start()])
+                self.section = SECTION_NAMES[match.group(1)]
+                self._pos = match.end()
+                yield {"event": "section", "section": self.section}
+                continue
+
+            end = len(self.text)
+            if not final:
+                # "[해시" 처럼 잘린 구간 표시일 수 있는 꼬리는 다음 조각이 올 때까지 보류
+                bracket = self.text.rfind("[", self._pos)
+                if bracket != -1 and end - bracket < self.MAX_MARKER_LENGTH:
+                    end = bracket
+            if end > self._pos:
+                yield self._token(self.text[self._pos:end])
+                self._pos = end
+            return
+
+    def _token(self, text: str) -> dict:
+        return {"event": "token", "section": self.section, "text": text}
+
+# GPT 스트리밍 모드로 감성 일기 생성, 구간/토큰 이벤트를 내보내고 마지막에 파싱 결과 이벤트 전달
+def stream_diary_with_gpt(user_input: str):
+    # 구간 단위 스트리밍은 텍스트 양식에서만 가능하므로 항상 text 모드
+    request = build_diary_request(user_input, "text")
+    llm_cache = get_llm_cache()
+    key = make_cache_key(request)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        record_llm_usage(request, cache_hit=True)
+        yield {"event": "section", "section": "diary"}
+        yield {"event": "token", "section": "diary", "text": cached["diary"]}
+        yield {"event": "result", "gpt": cached}
+        return
+
+    parser = GptOutputStreamParser()
+    started = perf_counter()
+    usage = None
+    stream = llm_gateway.create(**llm_call_kwargs(request), stream=True, stream_options={"include_usage": True})
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield from parser.feed(chunk.choices[0].delta.content)
+        usage = getattr(chunk, "usage", None) or usage  # 마지막 조각에 사용량이 옴
+    yield from parser.close()
+    record_llm_usage(request, usage, perf_counter() - started)
+
+    gpt = parse_llm_output(parser.text.strip())
+    if gpt["emotion"] != "분석 실패":
+        llm_cache.set(key, gpt)
+    yield {"event": "result", "gpt": gpt}
+
+# 하루 종합 일기 생성 방식: full(전체 재생성) | incremental(새로 추가된 일기만 반영)
+DAILY_SUMMARY_MODES = ('full', 'incremental')
+
+class DailySummaryPlan(NamedTuple):
+    original_inputs: list[dict]
+    combined_input: str
+    request: dict | None  # None 이면 GPT 호출 없이 기존 요약 사용
+    existing: DailySummaryDiary | None
+
+# 하루 종합 일기에 반영된 일기 내용 비교용 해시
+def hash_daily_input(raw_input: str, diary: str) -> str:
+    return hashlib.sha256(f"{raw_input}\x00{diary}".encode("utf-8")).hexdigest()[:16]
+
+# 기존 요약 이후 새로 추가된 일기만 반환, 반영된 일기가 수정/삭제됐으면 None (전체 재생성 필요)
+def find_new_inputs(previous: list[dict], current: list[dict]) -> list[dict] | None:
+    previous_hashes = {item.get("id"): item.get("hash") for item in previous}
+    if not previous_hashes or None in previous_hashes:
+        return None  # id가 기록되지 않은 예전 요약
+
+    current_hashes = {item["id"]: item["hash"] for item in current}
+    for entry_id, entry_hash in previous_hashes.items():
+        if current_hashes.get(entry_id) != entry_hash:
+            return None
+
+    return [item for item in current if item["id"] not in previous_hashes]
+
+# 하루 종합 일기 생성에 필요한 원본 일기 목록과 GPT 입력 구성
+def collect_daily_inputs(user, date: datetime.date) -> tuple[list[dict], str] | None:
+    start, end = day_bounds(date)
+    entries = DiaryEntry.objects.filter(user=user, created_at__gte=start, created_at__lt=end).order_by('created_at')
     if not entries.exists():
-        return {"message": "해당 날짜에는 일기가 없습니다."}
+        return None
 
-    # 1. 단일 일기들의 raw_input과 generated_diary를 수집
+    # 1. 단일 일기들의 raw_input과 generated_diary를 수집 (증분 요약 비교용 id, hash 포함)
     original_inputs = [
-        {"raw_input": e.raw_input, "diary": e.generated_diary}
+        {
+            "id": e.id,
+            "hash": hash_daily_input(e.raw_input, e.generated_diary),
+            "raw_input": e.raw_input,
+            "diary": e.generated_diary,
+        }
         for e in entries
     ]
 
@@ -106,57 +459,84 @@ def generate_daily_summary(user, date: datetime.date) -> dict:
         f"[입력]\n{item['raw_input']}\n\n[일기]\n{item['diary']}"
         for item in original_inputs
     )
+    return original_inputs, combined_input
 
-    system_prompt = (
-        "너는 감성 일기 작가야. 다음은 사용자가 하루 동안 작성한 일기들과 키워드야.\n"
-        "이 내용을 종합해서 하나의 감성적인 하루 종합 일기를 작성해줘.\n"
-        "응답 형식을 반드시 아래 [ ] 순서대로, 양식 그대로 출력해줘.\n"
-        "조건:\n"
-        "- 감정은 하나만\n"
-        "- 행복지수는 0~100 사이의 백분율\n"
-        "- 기쁨+분노+슬픔+즐거움 = 100(행복지수는 계산에 넣지 마)\n"
-        "- 해시태그는 3~5개\n\n"
-        "[일기]\n(감성적인 하루 종합 일기 내용)\n\n"
-        "[감정]\n감정: ...\n행복지수: ...\n기쁨: ...\n분노: ...\n슬픔: ...\n즐거움: ...\n\n"
-        "[해시태그]\n#..."
-    )
+# 하루 종합 일기 요청 파라미터 구성 (동기/비동기 공용)
+def build_daily_summary_request(combined_input: str, incremental: bool = False, output_mode: str | None = None) -> dict:
+    output_mode = output_mode or LLM_OUTPUT_MODE
+    prompt_name = "daily_summary.incremental" if incremental else "daily_summary"
+    system_prompt, prompt_id = render_system_prompt(prompt_name, output_mode)
+    return with_output_mode(dict(
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": combined_input},
+        ],
+        temperature=0.8,
+        max_tokens=700,
+        prompt_id=prompt_id,
+    ), output_mode)
 
-    try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": combined_input},
-            ],
-            temperature=0.8,
-            max_tokens=700,
-        )
-        content = response.choices[0].message.content.strip()
-        print("🔍 하루 종합 GPT 응답:\n", content)
-        gpt = parse_gpt_output(content)
+# 모드에 따라 GPT 요청을 구성 (incremental 이면 기존 요약 + 새 일기만 전달)
+def plan_daily_summary(user, date: datetime.date, mode: str = 'full') -> DailySummaryPlan | None:
+    collected = collect_daily_inputs(user, date)
+    if collected is None:
+        return None
+    original_inputs, combined_input = collected
 
-    except Exception as e:
-        print("❌ 하루 종합 GPT 호출 오류:", str(e))
-        return {"error": f"OpenAI API 호출 중 오류: {str(e)}"}
+    if mode == 'incremental':
+        existing = DailySummaryDiary.objects.filter(user=user, date=date).first()
+        new_inputs = find_new_inputs(existing.original_inputs, original_inputs) if existing else None
+        if new_inputs == []:
+            # 바뀐 일기가 없으면 GPT 호출 없이 저장된 요약 반환
+            return DailySummaryPlan(original_inputs, combined_input, None, existing)
+        if new_inputs:
+            delta_input = f"[기존 종합 일기]\n{existing.generated_diary}\n\n" + "\n\n".join(
+                f"[새 입력]\n{item['raw_input']}\n\n[새 일기]\n{item['diary']}"
+                for item in new_inputs
+            )
+            request = build_daily_summary_request(delta_input, incremental=True)
+            return DailySummaryPlan(original_inputs, combined_input, request, existing)
 
-    # ✅ 기존 하루 종합 일기 삭제 후 새로 생성
-    DailySummaryDiary.objects.filter(user=user, date=date).delete()
+    return DailySummaryPlan(original_inputs, combined_input, build_daily_summary_request(combined_input), None)
 
-    summary = DailySummaryDiary.objects.create(
+def input_keys(inputs: list[dict]) -> list[tuple]:
+    # 요약에 반영된 일기 (id, hash) 목록
+    return [(item.get("id"), item.get("hash")) for item in inputs]
+
+# 하루 종합 일기 저장 후 응답 데이터 반환
+def save_daily_summary(user, date: datetime.date, combined_input: str, original_inputs: list[dict], gpt: dict) -> dict:
+    with transaction.atomic():
+        # 저장된 요약 행을 잠그고 확인: 다른 요청(다른 프로세스 포함)이 현재 일기로 이미 저장했으면
+        # 그보다 먼저 읽은 일기로 만든 결과로 덮어쓰지 않고 저장된 요약을 반환
+        existing = DailySummaryDiary.objects.select_for_update().filter(user=user, date=date).first()
+        if existing is not None and input_keys(existing.original_inputs) != input_keys(original_inputs):
+            current = collect_daily_inputs(user, date)
+            if current is not None and input_keys(existing.original_inputs) == input_keys(current[0]):
+                return daily_summary_response(existing)
+        return _upsert_daily_summary(user, date, combined_input, original_inputs, gpt)
+
+def _upsert_daily_summary(user, date: datetime.date, combined_input: str, original_inputs: list[dict], gpt: dict) -> dict:
+    # ✅ (user, date) 기준 upsert: 동시 요청이 있어도 unique_together 충돌 없이 한 행만 유지
+    summary, _ = DailySummaryDiary.objects.update_or_create(
         user=user,
         date=date,
-        raw_input=combined_input,
-        generated_diary=gpt["diary"],
-        emotion=gpt.get("emotion", ""),
-        happiness_score=gpt.get("happiness_score", 0),
-        joy=gpt.get("joy", 0),
-        anger=gpt.get("anger", 0),
-        sadness=gpt.get("sadness", 0),
-        pleasure=gpt.get("pleasure", 0),
-        hashtags=gpt.get("hashtags", []),
-        original_inputs=original_inputs,
+        defaults=dict(
+            raw_input=combined_input,
+            generated_diary=gpt["diary"],
+            emotion=gpt.get("emotion", ""),
+            happiness_score=gpt.get("happiness_score", 0),
+            joy=gpt.get("joy", 0),
+            anger=gpt.get("anger", 0),
+            sadness=gpt.get("sadness", 0),
+            pleasure=gpt.get("pleasure", 0),
+            hashtags=gpt.get("hashtags", []),
+            original_inputs=original_inputs,
+        ),
     )
+    return daily_summary_response(summary)
 
+def daily_summary_response(summary: DailySummaryDiary) -> dict:
     return {
         "id": summary.id,
         "date": str(summary.date),
@@ -171,41 +551,309 @@ def generate_daily_summary(user, date: datetime.date) -> dict:
         "original_inputs": summary.original_inputs,
     }
 
-# GPT에게 한 달간 일기 목록을 요약하도록 요청
-def generate_monthly_summary(diary_texts: list[str]) -> str:
-    prompt = (
-        "다음은 사용자의 한 달간 일기 목록입니다.\n"
-        "전체적인 감정 흐름과 키워드, 분위기를 분석한 다음 하나의 감성적인 일기를 작성해주세요:\n\n"
-        + "\n\n".join(diary_texts)
+# 하루 동안 여러 개의 일기를 기반으로 GPT 요약 및 감성 분석 수행
+# 같은 (사용자, 날짜)로 동시에 들어온 요청은 모드(full / incremental)와 상관없이 한 번만 GPT를 호출하고 결과를 공유
+def generate_daily_summary(user, date: datetime.date, mode: str = 'full') -> dict:
+    return _daily_summary_flight.do((user.pk, date), _generate_daily_summary, user, date, mode)
+
+def _generate_daily_summary(user, date: datetime.date, mode: str) -> dict:
+    plan = plan_daily_summary(user, date, mode)
+    if plan is None:
+        return {"message": "해당 날짜에는 일기가 없습니다."}
+    if plan.request is None:
+        return daily_summary_response(plan.existing)
+
+    try:
+        gpt = complete_and_parse(plan.request)
+
+    except Exception as e:
+        print("❌ 하루 종합 GPT 호출 오류:", str(e))
+        return {"error": f"OpenAI API 호출 중 오류: {str(e)}"}
+
+    return save_daily_summary(user, date, plan.combined_input, plan.original_inputs, gpt)
+
+def _summary_gap_querysets(entries, summaries, start: date | None, end: date | None):
+    if start:
+        entries = entries.filter(created_at__gte=day_bounds(start)[0])
+        summaries = summaries.filter(date__gte=start)
+    if end:
+        entries = entries.filter(created_at__lt=day_bounds(end)[1])
+        summaries = summaries.filter(date__lte=end)
+    # TruncDate 는 현재 타임존(Asia/Seoul) 기준으로 날짜를 자름
+    return entries.annotate(day=TruncDate("created_at")).order_by(), summaries.order_by()
+
+# 일기는 있지만 하루 종합 일기가 없는 날짜 목록 (날짜별 조회 없이 양쪽 날짜 집합의 차집합으로 계산)
+def find_missing_summary_dates(user, start: date | None = None, end: date | None = None) -> list[date]:
+    entries, summaries = _summary_gap_querysets(
+        DiaryEntry.objects.filter(user=user), DailySummaryDiary.objects.filter(user=user), start, end
     )
-    response = client.chat.completions.create(
+    entry_dates = set(entries.values_list("day", flat=True).distinct())
+    summary_dates = set(summaries.values_list("date", flat=True))
+    return sorted(entry_dates - summary_dates)
+
+# 전체(또는 지정한) 사용자의 하루 종합 일기가 없는 (user_id, 날짜) 목록, 백필용
+def find_missing_summary_pairs(start: date | None = None, end: date | None = None,
+                               user_ids: list[int] | None = None) -> list[tuple[int, date]]:
+    entries, summaries = DiaryEntry.objects.all(), DailySummaryDiary.objects.all()
+    if user_ids:
+        entries = entries.filter(user_id__in=user_ids)
+        summaries = summaries.filter(user_id__in=user_ids)
+    entries, summaries = _summary_gap_querysets(entries, summaries, start, end)
+
+    entry_pairs = set(entries.values_list("user_id", "day").distinct())
+    summary_pairs = set(summaries.values_list("user_id", "date"))
+    return sorted(entry_pairs - summary_pairs)
+
+# 한 달 요약 입력 크기 설정 (프롬프트 크기는 달의 길이와 상관없이 CHUNK_TOKENS 이하로 유지)
+MONTHLY_CHUNK_TOKENS = int(os.getenv("MONTHLY_SUMMARY_CHUNK_TOKENS", 2500))
+MONTHLY_PARTIAL_MAX_TOKENS = int(os.getenv("MONTHLY_SUMMARY_PARTIAL_MAX_TOKENS", 300))
+MONTHLY_SUMMARY_MAX_TOKENS = int(os.getenv("MONTHLY_SUMMARY_MAX_TOKENS", 700))
+MONTHLY_SUMMARY_WORKERS = int(os.getenv("MONTHLY_SUMMARY_WORKERS", 4))
+
+
+class MonthlySummaryInput(NamedTuple):
+    date: date | None
+    text: str
+    reduced: bool  # 이미 요약된 텍스트(하루 종합 일기, 부분 요약)인지
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    if estimate_tokens(text) <= budget:
+        return text
+    # 한 글자는 최대 1토큰으로 계산되므로 budget 글자 이하로 자르면 예산을 넘지 않음
+    return text[:budget - 1]
+
+# 한 달 요약 입력 수집: 원본 일기가 그대로 반영된 하루 종합 일기는 이미 줄여 놓은 입력으로 재사용
+def collect_monthly_summary_inputs(user, year: int, month: int) -> list[MonthlySummaryInput]:
+    start, end = month_bounds(year, month)
+    entries_by_day = {}
+    for entry_id, created_at, raw_input, diary in DiaryEntry.objects.filter(
+        user=user, created_at__gte=start, created_at__lt=end
+    ).order_by("created_at", "id").values_list("id", "created_at", "raw_input", "generated_diary"):
+        entries_by_day.setdefault(timezone.localdate(created_at), []).append(
+            {"id": entry_id, "hash": hash_daily_input(raw_input, diary), "diary": diary}
+        )
+
+    summaries = DailySummaryDiary.objects.filter(
+        user=user, date__gte=start.date(), date__lt=end.date()
+    ).values_list("date", "generated_diary", "original_inputs")
+    fresh_summaries = {
+        day: text for day, text, original_inputs in summaries
+        if day in entries_by_day and find_new_inputs(original_inputs or [], entries_by_day[day]) == []
+    }
+
+    inputs = []
+    for day, items in sorted(entries_by_day.items()):
+        if day in fresh_summaries:
+            inputs.append(MonthlySummaryInput(day, f"[{day}]\n{fresh_summaries[day]}", True))
+        else:
+            text = "\n\n".join(item["diary"] for item in items if item["diary"])
+            inputs.append(MonthlySummaryInput(day, f"[{day}]\n{text}", False))
+    return inputs
+
+# 예산을 넘으면 이번 단계에서 처리할 작업 목록 반환, 한 번에 요약할 수 있으면 None
+# 작업은 그대로 넘길 텍스트(str) 또는 부분 요약할 묶음(list[str]) 이며 날짜 순서를 유지
+def plan_monthly_level(inputs: list[MonthlySummaryInput], budget: int = MONTHLY_CHUNK_TOKENS) -> list | None:
+    if sum(estimate_tokens(item.text) for item in inputs) <= budget:
+        return None
+
+    # 이미 요약된 입력만으로도 예산을 넘으면 요약본끼리 다시 묶어서 줄임
+    if all(item.reduced for item in inputs):
+        inputs = [item._replace(reduced=False) for item in inputs]
+
+    steps, batch, batch_tokens = [], [], 0
+    for item in inputs:
+        if item.reduced:
+            if batch:
+                steps.append(batch)
+                batch, batch_tokens = [], 0
+            steps.append(item.text)
+            continue
+
+        text = truncate_to_tokens(item.text, budget)
+        tokens = estimate_tokens(text)
+        if batch and batch_tokens + tokens > budget:
+            steps.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(text)
+        batch_tokens += tokens
+    if batch:
+        steps.append(batch)
+    return steps
+
+def normalize_monthly_inputs(inputs) -> list[MonthlySummaryInput]:
+    # 예전 호출 방식(일기 텍스트 목록)도 지원
+    return [item if isinstance(item, MonthlySummaryInput) else MonthlySummaryInput(None, item, False) for item in inputs]
+
+# 월간 요약 요청 파라미터 구성 (동기/비동기 공용)
+def build_monthly_partial_request(texts: list[str]) -> dict:
+    template = get_prompt("monthly_summary.partial")
+    return dict(
+        model="gpt-3.5-turbo",
+        messages=[{"role": "user", "content": template.render(texts="\n\n".join(texts))}],
+        temperature=0.3,
+        max_tokens=MONTHLY_PARTIAL_MAX_TOKENS,
+        prompt_id=template.id,
+    )
+
+def build_monthly_summary_request(diary_texts: list[str]) -> dict:
+    template = get_prompt("monthly_summary")
+    return dict(
         model="gpt-3.5-turbo",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.7
+        messages=[{"role": "user", "content": template.render(texts="\n\n".join(diary_texts))}],
+        temperature=0.7,
+        max_tokens=MONTHLY_SUMMARY_MAX_TOKENS,
+        prompt_id=template.id,
     )
+
+def summarize_monthly_partial(texts: list[str]) -> str:
+    response = create_completion(build_monthly_partial_request(texts))
     return response.choices[0].message.content.strip()
 
+def _summarize_partial_in_worker(context, texts: list[str]) -> str:
+    try:
+        return context.copy().run(summarize_monthly_partial, texts)
+    finally:
+        # 워커 스레드마다 열린 DB 커넥션 정리 (LLM_CACHE 'db' 백엔드, 사용량 기록 등)
+        connection.close()
+
+# GPT에게 한 달간 일기 목록을 요약하도록 요청
+# 입력이 길면 묶음별 부분 요약을 병렬로 만든 뒤(map) 그 결과를 모아 최종 요약(reduce)
+def generate_monthly_summary(inputs) -> str:
+    inputs = normalize_monthly_inputs(inputs)
+    with ThreadPoolExecutor(max_workers=MONTHLY_SUMMARY_WORKERS, thread_name_prefix="monthly-summary") as pool:
+        while (steps := plan_monthly_level(inputs)) is not None:
+            # 워커 스레드에서도 사용량 기록 대상(사용자, 엔드포인트)이 유지되도록 호출한 쪽 컨텍스트에서 실행
+            context = contextvars.copy_context()
+            texts = pool.map(
+                lambda step: step if isinstance(step, str) else _summarize_partial_in_worker(context, step),
+                steps,
+            )
+            inputs = [MonthlySummaryInput(None, text, True) for text in texts]
+
+    response = create_completion(build_monthly_summary_request([item.text for item in inputs]))
+    return response.choices[0].message.content.strip()
+
+# ======================
+# 비동기(ASGI) 버전
+# ======================
+
+async def acreate_completion(request: dict):
+    started = perf_counter()
+    response = await llm_gateway.acreate(**llm_call_kwargs(request))
+    record_llm_usage(request, response.usage, perf_counter() - started)
+    return response
+
+async def complete_and_parse_async(request: dict) -> dict:
+    llm_cache = get_llm_cache()
+    key = make_cache_key(request)
+    cached = await sync_to_async(llm_cache.get)(key)
+    if cached is not None:
+        record_llm_usage(request, cache_hit=True)
+        return cached
+
+    response = await acreate_completion(request)
+    content = response.choices[0].message.content.strip()
+
+    gpt = parse_llm_output(content, request_output_mode(request))
+    if gpt["emotion"] != "분석 실패":
+        await sync_to_async(llm_cache.set)(key, gpt)
+    return gpt
+
+async def generate_diary_with_gpt_async(user_input: str) -> dict:
+    try:
+        return await complete_and_parse_async(build_diary_request(user_input))
+
+    except Exception as e:
+        print("❌ GPT 호출 오류:", str(e))
+        return {"error": f"OpenAI API 호출 중 오류: {str(e)}"}
+
+async def generate_daily_summary_async(user, date: datetime.date, mode: str = 'full') -> dict:
+    return await _daily_summary_flight_async.do(
+        (user.pk, date), _generate_daily_summary_async, user, date, mode
+    )
+
+async def _generate_daily_summary_async(user, date: datetime.date, mode: str) -> dict:
+    plan = await sync_to_async(plan_daily_summary)(user, date, mode)
+    if plan is None:
+        return {"message": "해당 날짜에는 일기가 없습니다."}
+    if plan.request is None:
+        return daily_summary_response(plan.existing)
+
+    try:
+        gpt = await complete_and_parse_async(plan.request)
+
+    except Exception as e:
+        print("❌ 하루 종합 GPT 호출 오류:", str(e))
+        return {"error": f"OpenAI API 호출 중 오류: {str(e)}"}
+
+    return await sync_to_async(save_daily_summary)(user, date, plan.combined_input, plan.original_inputs, gpt)
+
+async def summarize_monthly_partial_async(texts: list[str]) -> str:
+    response = await acreate_completion(build_monthly_partial_request(texts))
+    return response.choices[0].message.content.strip()
+
+async def generate_monthly_summary_async(inputs) -> str:
+    inputs = normalize_monthly_inputs(inputs)
+    semaphore = asyncio.Semaphore(MONTHLY_SUMMARY_WORKERS)
+
+    async def run_step(step):
+        if isinstance(step, str):
+            return step
+        async with semaphore:
+            return await summarize_monthly_partial_async(step)
+
+    while (steps := plan_monthly_level(inputs)) is not None:
+        texts = await asyncio.gather(*(run_step(step) for step in steps))
+        inputs = [MonthlySummaryInput(None, text, True) for text in texts]
+
+    response = await acreate_completion(build_monthly_summary_request([item.text for item in inputs]))
+    return response.choices[0].message.content.strip()
+
+
+# 월별 감정 집계(일기 저장/수정/삭제 시 갱신됨)에서 평균 행복지수와 감정 평균 계산
+def rollup_averages(rollup: MonthlyEmotionRollup, ndigits: int | None = None) -> tuple[float, dict]:
+    average_happiness = round(rollup.happiness_sum / rollup.count, 1)
+    emotion_avg = {key: round(getattr(rollup, f"{key}_sum") / rollup.count, ndigits) for key in EMOTION_FIELDS}
+    return average_happiness, emotion_avg
+
+# 월간 회고 통계 (평균 감정, 상위 해시태그, 하이라이트 일기) 계산, 일기가 없으면 None
+def collect_monthly_stats(user, year: int, month: int) -> dict | None:
+    rollup = MonthlyEmotionRollup.objects.select_related("top_entry").filter(
+        user=user, year=year, month=month
+    ).first()
+    if rollup is None or not rollup.count:
+        return None
+
+    avg_happy, avg_emotions = rollup_averages(rollup)
+    top_tags = [tag for tag, _ in Counter(rollup.hashtag_counts).most_common(5)]
+    highlight = rollup.top_entry
+
+    return {
+        "average_happiness": avg_happy,
+        "average_emotions": avg_emotions,
+        "top_hashtags": top_tags,
+        "highlight_entry": {
+            "id": highlight.id,
+            "created_at": highlight.created_at,
+            "generated_diary": highlight.generated_diary,
+            "happiness_score": highlight.happiness_score,
+            "emotion": highlight.emotion,
+            "hashtags": highlight.hashtags
+        } if highlight else None,
+    }
+
 # 한 달간 평균 감정 통계 및 인사이트 계산
 def generate_monthly_retrospect(user, year: int, month: int) -> dict:
-    entries = DiaryEntry.objects.filter(user=user, created_at__year=year, created_at__month=month)
-    if not entries.exists():
+    rollup = MonthlyEmotionRollup.objects.filter(user=user, year=year, month=month).first()
+    if rollup is None or not rollup.count:
         return {
             "summary": f"{month}월에는 작성된 일기가 없습니다.",
             "average_happiness": 0,
             "insight": "일기를 더 자주 써보는 것은 어떨까요?",
         }
 
-    count = entries.count()
-    total_happiness = sum(e.happiness_score or 0 for e in entries)
-    average_happiness = round(total_happiness / count, 1)
-
-    emotion_totals = {
-        "joy": sum(e.joy or 0 for e in entries),
-        "anger": sum(e.anger or 0 for e in entries),
-        "sadness": sum(e.sadness or 0 for e in entries),
-        "pleasure": sum(e.pleasure or 0 for e in entries),
-    }
-    emotion_avg = {k: round(v / count, 1) for k, v in emotion_totals.items()}
+    average_happiness, emotion_avg = rollup_averages(rollup, 1)
 
     insight = (
         f"{month}월은 전반적으로 행복지수 {average_happiness}%이며, "
@@ -218,4 +866,80 @@ def generate_monthly_retrospect(user, year: int, month: int) -> dict:
         "average_happiness": average_happiness,
         "emotion_summary": emotion_avg,
         "insight": insight,
-    }
\ No newline at end of file
+    }
+
+# ======================
+# 저장된 월간 회고 (LLM 요약 포함)
+# ======================
+
+# 그 달 일기의 (id, 수정 시각) 목록 해시, 일기가 없으면 None
+# 일기가 작성/수정/삭제되면 값이 바뀌므로 저장된 회고의 유효성 판단과 ETag 로 사용
+def monthly_fingerprint(user, year: int, month: int) -> str | None:
+    start, end = month_bounds(year, month)
+    rows = DiaryEntry.objects.filter(
+        user=user, created_at__gte=start, created_at__lt=end
+    ).order_by("id").values_list("id", "updated_at")
+
+    digest = hashlib.sha256()
+    found = False
+    for entry_id, updated_at in rows:
+        digest.update(f"{entry_id}:{updated_at.isoformat()};".encode("utf-8"))
+        found = True
+    return digest.hexdigest() if found else None
+
+def build_monthly_retrospect_payload(year: int, month: int, stats: dict, summary: str) -> dict:
+    return {
+        "year": year,
+        "month": month,
+        "average_happiness": stats["average_happiness"],
+        "average_emotions": stats["average_emotions"],
+        "top_hashtags": stats["top_hashtags"],
+        "summary": summary,
+        "highlight_entry": stats["highlight_entry"],
+    }
+
+def save_monthly_retrospect(user, year: int, month: int, fingerprint: str, payload: dict) -> MonthlyRetrospect:
+    # 저장 후 다시 읽었을 때와 같은 응답이 되도록 JSON 직렬화 형태로 맞춤 (datetime → 문자열)
+    payload = json.loads(json.dumps(payload, cls=DjangoJSONEncoder))
+    retrospect, _ = MonthlyRetrospect.objects.update_or_create(
+        user=user, year=year, month=month,
+        defaults={"fingerprint": fingerprint, "payload": payload},
+    )
+    return retrospect
+
+def find_monthly_retrospect(user, year: int, month: int, fingerprint: str) -> MonthlyRetrospect | None:
+    return MonthlyRetrospect.objects.filter(user=user, year=year, month=month, fingerprint=fingerprint).first()
+
+def _generate_monthly_retrospect_record(user, year: int, month: int, fingerprint: str) -> MonthlyRetrospect | None:
+    stats = collect_monthly_stats(user, year, month)
+    if stats is None:
+        return None
+    summary = generate_monthly_summary(collect_monthly_summary_inputs(user, year, month))
+    payload = build_monthly_retrospect_payload(year, month, stats, summary)
+    return save_monthly_retrospect(user, year, month, fingerprint, payload)
+
+# 저장된 회고가 현재 일기 상태와 같으면 그대로 반환, 아니면 LLM 요약을 다시 만들어 저장
+def get_or_generate_monthly_retrospect(user, year: int, month: int, fingerprint: str) -> MonthlyRetrospect | None:
+    retrospect = find_monthly_retrospect(user, year, month, fingerprint)
+    if retrospect is not None:
+        return retrospect
+    return _monthly_retrospect_flight.do(
+        (user.pk, year, month, fingerprint), _generate_monthly_retrospect_record, user, year, month, fingerprint
+    )
+
+async def _generate_monthly_retrospect_record_async(user, year: int, month: int, fingerprint: str) -> MonthlyRetrospect | None:
+    stats = await sync_to_async(collect_monthly_stats)(user, year, month)
+    if stats is None:
+        return None
+    inputs = await sync_to_async(collect_monthly_summary_inputs)(user, year, month)
+    summary = await generate_monthly_summary_async(inputs)
+    payload = build_monthly_retrospect_payload(year, month, stats, summary)
+    return await sync_to_async(save_monthly_retrospect)(user, year, month, fingerprint, payload)
+
+async def get_or_generate_monthly_retrospect_async(user, year: int, month: int, fingerprint: str) -> MonthlyRetrospect | None:
+    retrospect = await sync_to_async(find_monthly_retrospect)(user, year, month, fingerprint)
+    if retrospect is not None:
+        return retrospect
+    return await _monthly_retrospect_flight_async.do(
+        (user.pk, year, month, fingerprint), _generate_monthly_retrospect_record_async, user, year, month, fingerprint
+    )
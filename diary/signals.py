@@ -0,0 +1,62 @@
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .embeddings import schedule_indexing
+from .models import DailySummaryDiary, DiaryEntry
+from .read_cache import invalidate_entry_payload, invalidate_user_payloads
+from .rollups import refresh_rollups_for_entry
+from .search import FTS_TABLE, ensure_fulltext_index, sync_entry_hashtags
+
+
+@receiver(post_save, sender=DiaryEntry)
+def update_rollups_on_save(sender, instance, raw=False, **kwargs):
+    # loaddata 로 들어온 일기는 rebuild_emotion_rollups 로 한 번에 집계
+    if raw:
+        return
+    refresh_rollups_for_entry(instance)
+
+
+@receiver(post_delete, sender=DiaryEntry)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    refresh_rollups_for_entry(instance)
+
+
+@receiver(post_save, sender=DiaryEntry)
+@receiver(post_delete, sender=DiaryEntry)
+def invalidate_entry_read_cache(sender, instance, **kwargs):
+    user_id, entry_id = instance.user_id, instance.pk
+    transaction.on_commit(lambda: (invalidate_user_payloads(user_id), invalidate_entry_payload(entry_id)))
+
+
+@receiver(post_save, sender=DailySummaryDiary)
+@receiver(post_delete, sender=DailySummaryDiary)
+def invalidate_summary_read_cache(sender, instance, **kwargs):
+    user_id = instance.user_id
+    transaction.on_commit(lambda: invalidate_user_payloads(user_id))
+
+
+@receiver(post_save, sender=DiaryEntry)
+@receiver(post_save, sender=DailySummaryDiary)
+def update_embedding_on_save(sender, instance, raw=False, **kwargs):
+    # loaddata 로 들어온 데이터는 build_diary_embeddings 로 한 번에 계산
+    if raw:
+        return
+    transaction.on_commit(lambda: schedule_indexing(instance))
+
+
+@receiver(post_save, sender=DiaryEntry)
+def update_hashtag_index_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    # loaddata 로 들어온 일기는 rebuild_search_index 로 한 번에 색인 (삭제는 CASCADE 로 함께 지워짐)
+    if raw:
+        return
+    if update_fields is not None and not {'hashtags', 'created_at'} & set(update_fields):
+        return
+    sync_entry_hashtags(instance)
+
+
+def restore_fulltext_triggers(sender, using, **kwargs):
+    # SQLite 는 일기 테이블을 다시 만드는 마이그레이션에서 FTS 트리거가 사라지므로 migrate 후 다시 만듦 (post_migrate)
+    db = connections[using]
+    if db.vendor == 'sqlite' and FTS_TABLE in db.introspection.table_names():
+        ensure_fulltext_index(db)
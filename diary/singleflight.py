@@ -0,0 +1,72 @@
+import asyncio
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 호출은 하나만 실행하고 나머지는 그 결과를 함께 받는다 (스레드용)
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """
+    SingleFlight 의 asyncio 버전 (같은 이벤트 루프 안에서만 공유)
+    """
+    def __init__(self):
+        self._futures = {}
+
+    async def do(self, key, fn, *args, **kwargs):
+        future = self._futures.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._futures[key] = future
+        try:
+            result = await fn(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            # 기다리는 쪽이 없을 때 "exception was never retrieved" 경고 방지
+            future.exception()
+            raise
+        finally:
+            # 취소된 경우에도 기다리던 호출이 멈추지 않도록 정리
+            if not future.done():
+                future.cancel()
+            del self._futures[key]
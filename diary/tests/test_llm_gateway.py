@@ -0,0 +1,236 @@
+"""
+LLMGateway 테스트: OpenAI 클라이언트 대신 지연 / 429 / 5xx 를 흉내 내는 스텁 클라이언트로 호출
+- 재시도와 Retry-After 백오프
+- 서킷 브레이커 open → half-open → closed
+- 동기 / 비동기 호출이 함께 쓰는 동시 호출 수 제한
+"""
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+import httpx
+import openai
+from django.test import SimpleTestCase
+
+from diary.llm_gateway import CircuitBreaker, CircuitOpenError, FairSemaphore, LLMGateway, get_gateway_config
+
+REQUEST = {'model': 'gpt-test', 'messages': [{'role': 'user', 'content': '안녕'}], 'max_tokens': 10}
+
+
+def status_error(status_code: int, retry_after: str | None = None) -> openai.APIStatusError:
+    headers = {'retry-after': retry_after} if retry_after is not None else {}
+    response = httpx.Response(status_code, headers=headers, request=httpx.Request('POST', 'http://llm.test/v1/chat'))
+    error_class = {429: openai.RateLimitError, 400: openai.BadRequestError}.get(status_code, openai.InternalServerError)
+    return error_class(f'status {status_code}', response=response, body=None)
+
+
+class StubCompletions:
+    """
+    outcomes 를 차례대로 사용 (예외면 발생시키고 아니면 그 값을 응답으로 반환), 다 쓰면 'ok'
+    delay 초 동안 응답을 늦추고 동시에 처리 중인 호출 수의 최댓값을 기록
+    """
+    def __init__(self, outcomes=(), delay: float = 0, tracker=None):
+        self.outcomes = list(outcomes)
+        self.delay = delay
+        self.calls = 0
+        self.tracker = tracker or ConcurrencyTracker()
+        self._lock = threading.Lock()
+
+    def _next(self):
+        with self._lock:
+            self.calls += 1
+            outcome = self.outcomes.pop(0) if self.outcomes else 'ok'
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def create(self, timeout=None, **request):
+        with self.tracker:
+            time.sleep(self.delay)
+            return self._next()
+
+
+class AsyncStubCompletions(StubCompletions):
+    async def create(self, timeout=None, **request):
+        with self.tracker:
+            await asyncio.sleep(self.delay)
+            return self._next()
+
+
+class ConcurrencyTracker:
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self.current -= 1
+
+
+def make_gateway(sync_completions=None, async_completions=None, **overrides) -> LLMGateway:
+    config = {
+        **get_gateway_config(),
+        'REQUESTS_PER_MINUTE': None,
+        'TOKENS_PER_MINUTE': None,
+        'MAX_RETRIES': 3,
+        'BACKOFF_BASE': 0.001,
+        'BACKOFF_MAX': 0.01,
+        'TIMEOUT': 5,
+        **overrides,
+    }
+    client = SimpleNamespace(chat=SimpleNamespace(completions=sync_completions or StubCompletions()))
+    async_client = SimpleNamespace(chat=SimpleNamespace(completions=async_completions or AsyncStubCompletions()))
+    return LLMGateway(client, async_client, config)
+
+
+class RetryTests(SimpleTestCase):
+    def test_retries_429_using_retry_after(self):
+        completions = StubCompletions([status_error(429, '0.25'), status_error(429, '0.5')])
+        gateway = make_gateway(completions)
+        with mock.patch('diary.llm_gateway.time.sleep') as sleep:
+            self.assertEqual(gateway.create(**REQUEST), 'ok')
+        self.assertEqual(completions.calls, 3)
+        self.assertIn(mock.call(0.25), sleep.call_args_list)
+        self.assertIn(mock.call(0.5), sleep.call_args_list)
+
+    def test_retry_after_is_capped_by_timeout(self):
+        gateway = make_gateway(StubCompletions([status_error(429, '600')]), TIMEOUT=2)
+        with mock.patch('diary.llm_gateway.time.sleep') as sleep:
+            gateway.create(**REQUEST)
+        self.assertIn(mock.call(2), sleep.call_args_list)
+
+    def test_gives_up_after_max_retries(self):
+        completions = StubCompletions([status_error(503) for _ in range(10)])
+        gateway = make_gateway(completions, MAX_RETRIES=2)
+        with self.assertRaises(openai.InternalServerError):
+            gateway.create(**REQUEST)
+        self.assertEqual(completions.calls, 3)
+
+    def test_client_errors_are_not_retried(self):
+        completions = StubCompletions([status_error(400)])
+        gateway = make_gateway(completions)
+        with self.assertRaises(openai.BadRequestError):
+            gateway.create(**REQUEST)
+        self.assertEqual(completions.calls, 1)
+        self.assertEqual(gateway.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_async_retries_429(self):
+        completions = AsyncStubCompletions([status_error(429, '0.01')])
+        gateway = make_gateway(async_completions=completions)
+        self.assertEqual(asyncio.run(gateway.acreate(**REQUEST)), 'ok')
+        self.assertEqual(completions.calls, 2)
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def test_open_half_open_close(self):
+        completions = StubCompletions([status_error(500), status_error(500)])
+        gateway = make_gateway(completions, MAX_RETRIES=0, FAILURE_THRESHOLD=2, RESET_TIMEOUT=0.05)
+        for _ in range(2):
+            with self.assertRaises(openai.InternalServerError):
+                gateway.create(**REQUEST)
+        self.assertEqual(gateway.breaker.state, CircuitBreaker.OPEN)
+
+        # 열려 있는 동안에는 업스트림을 호출하지 않음
+        with self.assertRaises(CircuitOpenError):
+            gateway.create(**REQUEST)
+        self.assertEqual(completions.calls, 2)
+
+        time.sleep(0.06)
+        self.assertEqual(gateway.create(**REQUEST), 'ok')  # half-open 시험 호출 성공
+        self.assertEqual(gateway.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(gateway.breaker.failures, 0)
+
+    def test_half_open_failure_reopens(self):
+        completions = StubCompletions([status_error(500), status_error(500)])
+        gateway = make_gateway(completions, MAX_RETRIES=0, FAILURE_THRESHOLD=1, RESET_TIMEOUT=0.05)
+        with self.assertRaises(openai.InternalServerError):
+            gateway.create(**REQUEST)
+        time.sleep(0.06)
+        with self.assertRaises(openai.InternalServerError):
+            gateway.create(**REQUEST)
+        self.assertEqual(gateway.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            gateway.create(**REQUEST)
+
+
+class ConcurrencyTests(SimpleTestCase):
+    def test_sync_and_async_calls_share_one_limit(self):
+        tracker = ConcurrencyTracker()
+        gateway = make_gateway(
+            StubCompletions(delay=0.03, tracker=tracker),
+            AsyncStubCompletions(delay=0.03, tracker=tracker),
+            MAX_CONCURRENCY=3,
+        )
+        results = []
+
+        def run_sync():
+            results.append(gateway.create(**REQUEST))
+
+        async def run_async(count):
+            results.extend(await asyncio.gather(*(gateway.acreate(**REQUEST) for _ in range(count))))
+
+        threads = [threading.Thread(target=run_sync) for _ in range(6)]
+        threads += [threading.Thread(target=asyncio.run, args=(run_async(5),)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+
+        self.assertEqual(results, ['ok'] * 16)
+        self.assertEqual(tracker.peak, 3)
+        self.assertEqual(gateway._semaphore._available, 3)
+
+    def test_cancelled_async_waiter_does_not_leak_slot(self):
+        semaphore = FairSemaphore(1)
+
+        async def scenario():
+            await semaphore.acquire_async('a')
+            waiter = asyncio.ensure_future(semaphore.acquire_async('b'))
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+            semaphore.release()
+
+        asyncio.run(scenario())
+        self.assertEqual(semaphore._available, 1)
+        self.assertFalse(semaphore._queues)
+
+    def test_slots_are_handed_out_round_robin(self):
+        semaphore = FairSemaphore(1)
+        semaphore.acquire('holder')
+        order = []
+        lock = threading.Lock()
+
+        def worker(key):
+            semaphore.acquire(key)
+            with lock:
+                order.append(key)
+            semaphore.release()
+
+        threads = []
+        for key in ['a'] * 4 + ['b'] * 2:
+            thread = threading.Thread(target=worker, args=(key,))
+            thread.start()
+            threads.append(thread)
+            time.sleep(0.01)  # 대기열에 들어가는 순서 고정
+        semaphore.release()
+        for thread in threads:
+            thread.join(timeout=5)
+        self.assertEqual(''.join(order), 'ababaa')
+
+    def test_stream_holds_slot_until_consumed(self):
+        completions = StubCompletions([iter(['a', 'b'])])
+        gateway = make_gateway(completions, MAX_CONCURRENCY=1)
+        stream = gateway.create(stream=True, **REQUEST)
+        self.assertEqual(gateway._semaphore._available, 0)
+        self.assertEqual(list(stream), ['a', 'b'])
+        self.assertEqual(gateway._semaphore._available, 1)
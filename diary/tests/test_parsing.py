@@ -0,0 +1,165 @@
+"""
+GPT 텍스트 응답 파싱(parse_gpt_output) 테스트
+
+- 무작위 응답 모음(고정 시드): 구간 반복 / 빈 구간 / 깨진 감정 줄 / CRLF 줄바꿈을 섞어서 항상 지켜야 하는 성질을 확인
+- 벤치마크: 구간 표시를 한 번만 훑는 현재 방식과 구간마다 정규식을 다시 실행하던 이전 방식 비교
+  (시간이 걸리므로 DIARY_BENCHMARK=1 일 때만 실행)
+"""
+import os
+import random
+import re
+import time
+import unittest
+
+from django.test import SimpleTestCase
+
+from diary.services import EMOTION_FIELDS, parse_gpt_output
+
+RESULT_KEYS = {"diary", "emotion", "happiness_score", *EMOTION_FIELDS, "hashtags"}
+SEPARATORS = re.compile(r"[#,\s]")
+
+MARKERS = ["[일기]", "[감정]", "[해시태그]"]
+EMOTION_LABELS = ["감정", "행복지수", "기쁨", "분노", "슬픔", "즐거움"]
+WORDS = ["오늘", "산책", "카페", "비", "친구", "[메모]", "##", "100%", "：", "-", "•", "ㅎㅎ", "\t", "0", "9999"]
+
+
+def random_value(rng: random.Random) -> str:
+    return rng.choice([
+        f"{rng.randint(0, 150)}%",
+        str(rng.randint(0, 10 ** 6)),
+        f"약 {rng.randint(0, 100)}점",
+        f"-{rng.randint(0, 50)}",
+        rng.choice(["기쁨", "슬픔", "평온", "", "없음", "높음"]),
+    ])
+
+
+def random_emotion_line(rng: random.Random) -> str:
+    label = rng.choice(EMOTION_LABELS + ["감정상태", "기븜"])
+    prefix = rng.choice(["", "- ", "* ", "• ", "  "])
+    separator = rng.choice([": ", ":", "：", " - ", " "])
+    return f"{prefix}{label}{separator}{random_value(rng)}"
+
+
+def random_hashtags(rng: random.Random) -> str:
+    tags = [rng.choice(["#산책", "#비", "카페", "#", "##친구", "#오늘,#산책", " ", "#ㅎㅎ"]) for _ in range(rng.randint(0, 6))]
+    return rng.choice([" ", ", ", "\n", "\t", ""]).join(tags)
+
+
+def random_response(rng: random.Random) -> str:
+    """
+    구간 표시가 빠지거나 반복되고, 내용이 비었거나 깨진 응답
+    """
+    blocks = []
+    for _ in range(rng.randint(0, 6)):
+        marker = rng.choice(MARKERS + [""])
+        if marker == "[감정]":
+            body = [random_emotion_line(rng) for _ in range(rng.randint(0, 7))]
+        elif marker == "[해시태그]":
+            body = [random_hashtags(rng)]
+        else:
+            body = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 8))) for _ in range(rng.randint(0, 3))]
+        blocks.append("\n".join([marker, *body]))
+    text = "\n".join(blocks)
+    if rng.random() < 0.5:
+        text = text.replace("\n", "\r\n")
+    return text
+
+
+def build_response(diary: str, newline: str = "\n") -> str:
+    return newline.join([
+        "[일기]", diary,
+        "[감정]", "감정: 기쁨", "행복지수: 80%", "기쁨: 50%", "분노: 0%", "슬픔: 10%", "즐거움: 40%",
+        "[해시태그]", "#산책 #카페 #오늘",
+    ])
+
+
+class ParseGptOutputTests(SimpleTestCase):
+    def test_well_formed_response(self):
+        result = parse_gpt_output(build_response("비 오는 날 산책을 했다."))
+        self.assertEqual(result, {
+            "diary": "비 오는 날 산책을 했다.",
+            "emotion": "기쁨",
+            "happiness_score": 80,
+            "joy": 50, "anger": 0, "sadness": 10, "pleasure": 40,
+            "hashtags": ["산책", "카페", "오늘"],
+        })
+
+    def test_crlf_line_endings(self):
+        self.assertEqual(
+            parse_gpt_output(build_response("산책을 했다.", "\r\n")),
+            parse_gpt_output(build_response("산책을 했다.")),
+        )
+
+    def test_repeated_marker_uses_first_non_empty_section(self):
+        result = parse_gpt_output("[일기]\n\n[일기]\n첫 번째\n[일기]\n두 번째\n[감정]\n감정: 슬픔\n슬픔: 100")
+        self.assertEqual(result["diary"], "첫 번째")
+        self.assertEqual(result["emotion"], "슬픔")
+
+    def test_missing_emotion_name_zeroes_scores(self):
+        result = parse_gpt_output("[일기]\n산책\n[감정]\n행복지수: 70\n기쁨: 30\n슬픔: 10")
+        self.assertEqual(result["emotion"], "분석 실패")
+        self.assertEqual([result[field] for field in ("happiness_score", *EMOTION_FIELDS)], [0] * 5)
+
+    def test_random_corpus_invariants(self):
+        rng = random.Random(20240501)
+        for case in range(3000):
+            content = random_response(rng)
+            with self.subTest(case=case, content=content):
+                result = parse_gpt_output(content)
+                self.assertEqual(set(result), RESULT_KEYS)
+                self.assertIsInstance(result["diary"], str)
+                self.assertTrue(result["emotion"])
+
+                scores = [result["happiness_score"], *(result[field] for field in EMOTION_FIELDS)]
+                self.assertTrue(all(isinstance(score, int) and 0 <= score <= 100 for score in scores))
+                self.assertIn(sum(result[field] for field in EMOTION_FIELDS), (0, 100))
+                if result["emotion"] == "분석 실패":
+                    self.assertEqual(scores, [0] * 5)
+
+                tags = result["hashtags"]
+                self.assertEqual(len(tags), len(set(tags)))
+                self.assertTrue(all(tag and not SEPARATORS.search(tag) for tag in tags))
+
+
+def legacy_parse(content: str) -> dict:
+    # 비교용 이전 방식: 구간마다 전체 응답을 다시 검색하고 호출할 때마다 패턴을 해석
+    def extract_number(text):
+        match = re.search(r"\d+", text)
+        return int(match.group()) if match else 0
+
+    diary_match = re.search(r"\[일기\](.*?)($|\[감정\]|\[해시태그\])", content, re.DOTALL)
+    emotion_match = re.search(r"\[감정\](.*?)($|\[일기\]|\[해시태그\])", content, re.DOTALL)
+    hashtag_match = re.search(r"\[해시태그\](.*?)($|\[일기\]|\[감정\])", content, re.DOTALL)
+    result = {"diary": diary_match.group(1).strip() if diary_match else ""}
+    lines = emotion_match.group(1).strip().splitlines() if emotion_match else []
+    if len(lines) >= 6:
+        result["emotion"] = lines[0].split(":")[-1].strip()
+        for field, line in zip(("happiness_score", *EMOTION_FIELDS), lines[1:6]):
+            result[field] = extract_number(line)
+    result["hashtags"] = [
+        tag.strip().lstrip("#") for tag in re.split(r"[#,\s]+", hashtag_match.group(1)) if tag.strip()
+    ] if hashtag_match else []
+    return result
+
+
+@unittest.skipUnless(os.getenv("DIARY_BENCHMARK"), "DIARY_BENCHMARK=1 일 때만 실행")
+class ParseGptOutputBenchmark(SimpleTestCase):
+    rounds = 2000
+
+    def measure(self, parse, responses) -> float:
+        started = time.perf_counter()
+        for _ in range(self.rounds):
+            for content in responses:
+                parse(content)
+        return (time.perf_counter() - started) / (self.rounds * len(responses)) * 1e6
+
+    def test_one_pass_parser(self):
+        responses = [
+            build_response("짧은 일기"),
+            build_response("긴 일기 문장입니다. " * 200),
+            build_response("줄이 많은 일기\n" * 100, "\r\n"),
+        ]
+        current = self.measure(parse_gpt_output, responses)
+        legacy = self.measure(legacy_parse, responses)
+        print(f"\nparse_gpt_output {current:.1f}us / 이전 방식 {legacy:.1f}us (응답 1건 평균)")
+        self.assertLess(current, legacy)
@@ -0,0 +1,98 @@
+"""
+날짜 조건 조회가 (user, created_at) 인덱스를 사용하는지 확인 (0002_diary_query_indexes)
+
+서비스 함수가 실제로 실행한 쿼리를 모아서 EXPLAIN 결과에 인덱스 이름이 나오는지 본다.
+created_at__date 처럼 인덱스를 쓸 수 없는 조건으로 바뀌면 전체 테이블 스캔이 되어 실패함.
+"""
+from datetime import date, datetime
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from diary.models import DailySummaryDiary, DiaryEntry
+from diary.services import (
+    collect_daily_inputs,
+    collect_monthly_summary_inputs,
+    find_missing_summary_dates,
+    monthly_fingerprint,
+)
+
+User = get_user_model()
+ENTRY_INDEX = 'diary_entry_user_created_idx'
+
+
+def explain(sql: str) -> str:
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # 행이 적으면 순차 스캔이 더 싸다고 판단하므로 인덱스를 쓸 수 있는지만 확인
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN {sql}')
+        else:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+
+
+def summary_unique_index() -> str:
+    # unique_together(user, date) 로 만들어진 인덱스 이름 (DB 마다 다름)
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, DailySummaryDiary._meta.db_table)
+    return next(
+        name for name, info in constraints.items()
+        if info['unique'] and info['columns'] == ['user_id', 'date']
+    )
+
+
+class QueryIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('index-user', 'index@test.local', 'pw')
+        other = User.objects.create_user('index-other', 'other@test.local', 'pw')
+        for owner in (cls.user, other):
+            for day in range(1, 29):
+                entries = DiaryEntry.objects.bulk_create(
+                    [DiaryEntry(user=owner, raw_input=f'{day}', generated_diary=f'{day}') for _ in range(3)]
+                )
+                # created_at 은 auto_now_add 라서 저장 후 바꿈
+                DiaryEntry.objects.filter(pk__in=[entry.pk for entry in entries]).update(
+                    created_at=timezone.make_aware(datetime(2026, 2, day, 9))
+                )
+        DailySummaryDiary.objects.create(user=cls.user, date=date(2026, 2, 1), summary='요약')
+
+    def entry_query_plans(self, call) -> list[tuple[str, str]]:
+        with CaptureQueriesContext(connection) as context:
+            call()
+        queries = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT') and DiaryEntry._meta.db_table in query['sql']
+        ]
+        self.assertTrue(queries)
+        return [(sql, explain(sql)) for sql in queries]
+
+    def assert_entry_index_used(self, call):
+        for sql, plan in self.entry_query_plans(call):
+            with self.subTest(sql=sql):
+                self.assertIn(ENTRY_INDEX, plan)
+
+    def test_daily_queries_use_user_created_index(self):
+        self.assert_entry_index_used(lambda: collect_daily_inputs(self.user, date(2026, 2, 10)))
+
+    def test_monthly_queries_use_user_created_index(self):
+        self.assert_entry_index_used(lambda: monthly_fingerprint(self.user, 2026, 2))
+        self.assert_entry_index_used(lambda: collect_monthly_summary_inputs(self.user, 2026, 2))
+
+    def test_missing_summary_queries_use_indexes(self):
+        with CaptureQueriesContext(connection) as context:
+            missing = find_missing_summary_dates(self.user, date(2026, 2, 1), date(2026, 2, 28))
+        self.assertEqual(len(missing), 27)
+
+        summary_index = summary_unique_index()
+        for query in context.captured_queries:
+            sql = query['sql']
+            with self.subTest(sql=sql):
+                if DiaryEntry._meta.db_table in sql:
+                    self.assertIn(ENTRY_INDEX, explain(sql))
+                else:
+                    self.assertIn(summary_index, explain(sql))
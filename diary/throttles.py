@@ -0,0 +1,47 @@
+"""
+LLM 을 호출하는 API 에 붙이는 DRF 스로틀 (한도는 quotas.py / settings.LLM_QUOTA)
+
+거절되면 DRF 가 429 와 Retry-After 헤더로 응답한다.
+GET 과 POST 중 한쪽만 LLM 을 호출하는 뷰는 for_methods('POST') 로 대상 메서드를 지정한다.
+저장된 결과로 응답할 수 있어서 LLM 호출 여부를 뷰 안에서야 알 수 있는 경우는 check_llm_quota 를 호출한다.
+"""
+import math
+
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import BaseThrottle
+
+from .quotas import get_quota
+
+
+class LLMQuotaThrottle(BaseThrottle):
+    """
+    사용자 한도 → 전체 한도 순서로 확인
+    DRF 는 스로틀 클래스를 모두 실행하므로 한 클래스에서 처리해서,
+    사용자 한도에 걸린 요청이 전체 한도를 깎아 다른 사용자를 막지 않도록 함
+    """
+    methods = None  # None 이면 모든 메서드
+
+    def __init__(self):
+        self.retry_after = None
+
+    @classmethod
+    def for_methods(cls, *methods):
+        return type(cls.__name__, (cls,), {'methods': methods})
+
+    def allow_request(self, request, view) -> bool:
+        if self.methods is not None and request.method not in self.methods:
+            return True
+        if not request.user or not request.user.is_authenticated:
+            return True  # 인증은 permission_classes 에서 처리
+        self.retry_after = get_quota().admit(request.user)
+        return self.retry_after is None
+
+    def wait(self):
+        return math.ceil(self.retry_after) if self.retry_after is not None else None
+
+
+def check_llm_quota(user):
+    # LLM 을 호출하기 직전에 쿼터 차감, 한도를 넘었으면 Throttled (DRF 가 429 + Retry-After 로 응답)
+    wait = get_quota().admit(user)
+    if wait is not None:
+        raise Throttled(math.ceil(wait))
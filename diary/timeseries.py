@@ -0,0 +1,112 @@
+"""
+기간별 감정 추이 (차트용 시계열)
+
+일별 감정 집계(DailyEmotionRollup)를 TruncDay / TruncWeek / TruncMonth 로 묶어 쿼리 한 번으로 합산한다.
+원본 일기를 읽지 않으므로 기간이 길어도 사용자당 하루 한 행만 읽음.
+
+응답은 점마다 객체를 만들지 않고 필드별 배열(열 단위)로 반환한다. 일기가 없는 구간도 차트의 x 축이
+끊기지 않도록 count 0, 평균 None 으로 채움.
+"""
+from datetime import date, timedelta
+from itertools import accumulate
+
+from django.db.models import Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+from .models import DailyEmotionRollup
+from .rollups import SUM_FIELDS
+
+GRANULARITIES = {
+    'day': TruncDay,
+    'week': TruncWeek,  # 월요일 시작
+    'month': TruncMonth,
+}
+MAX_POINTS = 1000
+# 집계 필드 → 응답 필드 (happiness_sum → happiness)
+SERIES_FIELDS = {rollup_field: rollup_field.removesuffix('_sum') for rollup_field in SUM_FIELDS}
+
+
+def period_start(day: date, granularity: str) -> date:
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_period(start: date, granularity: str) -> date:
+    if granularity == 'week':
+        return start + timedelta(days=7)
+    if granularity == 'month':
+        return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start + timedelta(days=1)
+
+
+def iter_periods(start: date, end: date, granularity: str):
+    # start ~ end 를 덮는 구간의 시작 날짜
+    current = period_start(start, granularity)
+    while current <= end:
+        yield current
+        current = next_period(current, granularity)
+
+
+def count_periods(start: date, end: date, granularity: str) -> int:
+    first = period_start(start, granularity)
+    if granularity == 'week':
+        return (end - first).days // 7 + 1
+    if granularity == 'month':
+        return (end.year - first.year) * 12 + end.month - first.month + 1
+    return (end - start).days + 1
+
+
+def _average(total: int, count: int, ndigits: int = 1):
+    return round(total / count, ndigits) if count else None
+
+
+def moving_averages(counts: list[int], sums: dict[str, list[int]], window: int) -> dict:
+    """
+    직전 window 개 구간(현재 포함)의 이동 평균, 구간별 평균의 평균이 아니라 일기 수로 가중한 평균
+    """
+    count_prefix = [0, *accumulate(counts)]
+    result = {'window': window}
+    for field, values in sums.items():
+        prefix = [0, *accumulate(values)]
+        result[field] = [
+            _average(prefix[i + 1] - prefix[max(0, i + 1 - window)], count_prefix[i + 1] - count_prefix[max(0, i + 1 - window)])
+            for i in range(len(counts))
+        ]
+    return result
+
+
+def emotion_timeseries(user, start: date, end: date, granularity: str = 'day', window: int | None = None) -> dict:
+    """
+    start ~ end (둘 다 포함) 의 구간별 일기 수와 행복지수 / 감정 평균
+    구간 경계는 달력 기준이라 첫/마지막 구간은 기간에 걸친 날짜만 집계함
+    """
+    rows = (
+        DailyEmotionRollup.objects.filter(user=user, date__gte=start, date__lte=end)
+        .annotate(period=GRANULARITIES[granularity]('date'))
+        .values('period')
+        .annotate(total=Sum('count'), **{field: Sum(field) for field in SERIES_FIELDS})
+        .order_by('period')
+    )
+    by_period = {row['period']: row for row in rows}
+
+    periods = list(iter_periods(start, end, granularity))
+    counts = [by_period[p]['total'] if p in by_period else 0 for p in periods]
+    sums = {
+        name: [by_period[p][field] if p in by_period else 0 for p in periods]
+        for field, name in SERIES_FIELDS.items()
+    }
+
+    series = {
+        'granularity': granularity,
+        'from': str(start),
+        'to': str(end),
+        'period': [str(p) for p in periods],
+        'count': counts,
+        **{name: [_average(total, count) for total, count in zip(values, counts)] for name, values in sums.items()},
+    }
+    if window:
+        series['moving_average'] = moving_averages(counts, sums, window)
+    return series
@@ -0,0 +1,302 @@
+"""
+일기 내보내기 / 가져오기 (NDJSON, 한 줄에 레코드 하나)
+
+레코드 형식: {"type": "entry" | "summary", 필드...}
+- type 이 없으면 일기(entry)로 취급
+- 일기 원문은 raw_input 이 없으면 input, body, text 순서로 찾음 (JSONL 로 정리된 기록을 그대로 넣을 수 있음)
+
+내보내기는 .iterator() 로 청크 단위로 읽어 한 줄씩 만들어 보내므로 전체 기록 크기와 관계없이 메모리 사용량이 일정하다.
+가져오기는 batch_size 개씩 트랜잭션 하나로 bulk_create 하고, 끝나면 감정 집계를 다시 만든다.
+(bulk_create 는 post_save 시그널을 보내지 않으므로 집계, 해시태그 색인, 검색 임베딩, 조회 캐시를 직접 갱신)
+"""
+import contextvars
+import gzip
+import json
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .embeddings import index_user_documents
+from .models import DailySummaryDiary, DiaryEntry
+from .read_cache import invalidate_user_payloads
+from .rollups import rebuild_rollups
+from .search import rebuild_hashtag_index
+from .services import apply_gpt_result, generate_diary_with_gpt
+
+ENTRY_FIELDS = (
+    'raw_input', 'generated_diary', 'emotion', 'happiness_score', 'joy', 'anger', 'sadness', 'pleasure',
+    'hashtags', 'is_public', 'created_at',
+)
+SUMMARY_FIELDS = (
+    'date', 'original_inputs', 'summary', 'emotion', 'happiness_score', 'joy', 'anger', 'sadness', 'pleasure',
+    'hashtags', 'raw_input', 'generated_diary', 'created_at',
+)
+# 일기를 생성하지 않고 그대로 쓰는 필드 (generated_diary 외)
+PRECOMPUTED_FIELDS = ('emotion', 'happiness_score', 'joy', 'anger', 'sadness', 'pleasure', 'hashtags')
+EXPORT_TYPES = {
+    'entry': (DiaryEntry, ENTRY_FIELDS),
+    'summary': (DailySummaryDiary, SUMMARY_FIELDS),
+}
+RAW_INPUT_KEYS = ('raw_input', 'input', 'body', 'text')
+GZIP_MAGIC = b'\x1f\x8b'
+MAX_REPORTED_ERRORS = 100
+
+
+# ======================
+# 내보내기
+# ======================
+
+def iter_export_records(user, types=tuple(EXPORT_TYPES), chunk_size: int = 1000):
+    for type_name in types:
+        model, fields = EXPORT_TYPES[type_name]
+        rows = model.objects.filter(user=user).order_by('pk').values(*fields)
+        for row in rows.iterator(chunk_size=chunk_size):
+            yield {'type': type_name, **row}
+
+
+def iter_ndjson(records):
+    for record in records:
+        yield (json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n").encode('utf-8')
+
+
+def gzip_stream(chunks):
+    # 압축기 내부 버퍼가 찰 때마다 조각을 내보냄 (전체를 모았다가 압축하지 않음)
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)  # gzip 헤더 포함
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_filename(user, compress: bool) -> str:
+    return f"diary-{user.user_id}-{timezone.localdate():%Y%m%d}.ndjson{'.gz' if compress else ''}"
+
+
+# ======================
+# 가져오기
+# ======================
+
+class ImportReport:
+    def __init__(self):
+        self.entries = 0
+        self.summaries = 0
+        self.generated = 0  # 가져오면서 LLM 으로 일기를 생성한 수
+        self.skipped = 0
+        self.truncated = False  # 최대 레코드 수를 넘어서 나머지를 읽지 않음
+        self.errors = []  # [(줄 번호, 오류)]
+
+    def error(self, line: int, message: str):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+    def as_dict(self) -> dict:
+        return {
+            'entries': self.entries,
+            'summaries': self.summaries,
+            'generated': self.generated,
+            'skipped': self.skipped,
+            'truncated': self.truncated,
+            'errors': [{'line': line, 'error': message} for line, message in self.errors],
+        }
+
+
+def open_ndjson(fileobj):
+    """
+    gzip 이면 풀어서 읽는 파일 객체 반환 (앞 두 바이트로 판단)
+    """
+    if hasattr(fileobj, 'peek'):
+        magic = fileobj.peek(2)[:2]
+    else:
+        magic = fileobj.read(2)
+        fileobj.seek(0)
+    return gzip.GzipFile(fileobj=fileobj) if magic == GZIP_MAGIC else fileobj
+
+
+def _validated(instance, line: int, report: ImportReport):
+    try:
+        instance.clean_fields(exclude=['user', 'created_at', 'updated_at'])
+    except ValidationError as e:
+        report.error(line, '; '.join(f"{field}: {' '.join(messages)}" for field, messages in e.message_dict.items()))
+        return None
+    return instance
+
+
+def _created_at(record: dict, line: int, report: ImportReport):
+    value = record.get('created_at')
+    if not value:
+        return None
+    parsed = parse_datetime(value) if isinstance(value, str) else None
+    if parsed is None:
+        report.error(line, f"created_at 형식이 잘못되었습니다: {value}")
+        return False
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+
+def _save_batch(model, rows: list[tuple], batch_size: int):
+    """
+    rows: [(인스턴스, created_at 또는 None)]
+    created_at 은 auto_now_add 라서 bulk_create 때 현재 시각으로 바뀌므로, 저장 후 원래 값으로 되돌림
+    """
+    with transaction.atomic():
+        instances = model.objects.bulk_create([instance for instance, _ in rows], batch_size=batch_size)
+        restored = []
+        for instance, created_at in zip(instances, (created_at for _, created_at in rows)):
+            if created_at is not None:
+                instance.created_at = created_at
+                restored.append(instance)
+        if restored:
+            model.objects.bulk_update(restored, ['created_at'], batch_size=batch_size)
+
+
+def _generate_in_worker(context, raw_input: str) -> dict:
+    try:
+        return context.copy().run(generate_diary_with_gpt, raw_input)
+    finally:
+        # 워커 스레드마다 열린 DB 커넥션 정리 (LLM_CACHE 'db' 백엔드 등)
+        connection.close()
+
+
+def _generate_entries(pending: list, workers: int) -> list[dict]:
+    # 호출한 쪽의 사용량 기록 대상(usage_scope)이 워커 스레드에도 유지되도록 컨텍스트를 복사해서 실행
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='diary-import') as pool:
+        return list(pool.map(lambda raw_input: _generate_in_worker(context, raw_input), pending))
+
+
+def _import_entries(user, batch: list[tuple[int, dict]], report: ImportReport, generate: bool,
+                    regenerate: bool, workers: int, batch_size: int, admit=None):
+    rows = []
+    to_generate = []  # [(rows 안의 위치, 줄 번호, 원문)]
+    for line, record in batch:
+        raw_input = next((record[key] for key in RAW_INPUT_KEYS if record.get(key)), '')
+        created_at = _created_at(record, line, report)
+        if created_at is False:
+            continue
+        entry = DiaryEntry(user=user, raw_input=raw_input, is_public=record.get('is_public', True))
+        if record.get('generated_diary') and not regenerate:
+            # 미리 생성된 결과가 있으면 LLM 을 호출하지 않음
+            apply_gpt_result(entry, {
+                'diary': record['generated_diary'],
+                **{field: record[field] for field in PRECOMPUTED_FIELDS if record.get(field) is not None},
+            })
+        elif not raw_input:
+            report.error(line, "일기 원문(raw_input)이 없습니다.")
+            continue
+        elif not generate:
+            report.error(line, "생성된 일기(generated_diary)가 없습니다.")
+            continue
+        elif admit is not None and admit() is not None:
+            report.error(line, "LLM 사용 한도를 초과해서 일기를 생성하지 않았습니다.")
+            continue
+        else:
+            to_generate.append((len(rows), line, raw_input))
+        rows.append((entry, created_at, line))
+
+    if to_generate:
+        results = _generate_entries([raw_input for _, _, raw_input in to_generate], workers)
+        failed = set()
+        for (index, line, _), result in zip(to_generate, results):
+            if 'error' in result:
+                report.error(line, result['error'])
+                failed.add(index)
+            else:
+                apply_gpt_result(rows[index][0], result)
+                report.generated += 1
+        rows = [row for index, row in enumerate(rows) if index not in failed]
+
+    valid = [(entry, created_at) for entry, created_at, line in rows if _validated(entry, line, report)]
+    if valid:
+        _save_batch(DiaryEntry, valid, batch_size)
+        report.entries += len(valid)
+
+
+def _import_summaries(user, batch: list[tuple[int, dict]], report: ImportReport, batch_size: int):
+    # (사용자, 날짜) 가 유니크라서 이미 있는 날짜는 건너뜀
+    rows = {}
+    for line, record in batch:
+        created_at = _created_at(record, line, report)
+        if created_at is False:
+            continue
+        summary = DailySummaryDiary(
+            user=user,
+            **{field: record[field] for field in SUMMARY_FIELDS if field != 'created_at' and record.get(field) is not None},
+        )
+        if not _validated(summary, line, report):
+            continue
+        if summary.date in rows:
+            report.error(line, f"같은 날짜({summary.date})의 하루 종합 일기가 중복되었습니다.")
+            continue
+        rows[summary.date] = (summary, created_at)
+
+    existing = set(
+        DailySummaryDiary.objects.filter(user=user, date__in=list(rows)).values_list('date', flat=True)
+    )
+    report.skipped += len(existing)
+    new_rows = [row for day, row in rows.items() if day not in existing]
+    if new_rows:
+        _save_batch(DailySummaryDiary, new_rows, batch_size)
+        report.summaries += len(new_rows)
+
+
+def import_records(user, lines, batch_size: int = 500, generate: bool = True, regenerate: bool = False,
+                   workers: int = 4, max_records: int | None = None, admit=None) -> ImportReport:
+    """
+    NDJSON 줄(bytes 또는 str)을 읽어 user 의 일기 / 하루 종합 일기로 저장
+    - generate: 생성된 일기가 없는 레코드는 LLM 으로 생성 (False 면 건너뜀)
+    - regenerate: 생성된 일기가 있어도 원문으로 다시 생성
+    - max_records: 읽을 최대 레코드 수 (넘으면 나머지는 읽지 않고 truncated 표시)
+    - admit: LLM 으로 생성하기 전 레코드마다 호출, None 이 아니면(쿼터 초과) 그 레코드는 건너뜀
+    """
+    report = ImportReport()
+    batches = {'entry': [], 'summary': []}
+
+    def flush(type_name: str):
+        batch, batches[type_name] = batches[type_name], []
+        if type_name == 'entry':
+            _import_entries(user, batch, report, generate, regenerate, workers, batch_size, admit)
+        else:
+            _import_summaries(user, batch, report, batch_size)
+
+    records = 0
+    for number, line in enumerate(lines, 1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.strip():
+            continue
+        records += 1
+        if max_records is not None and records > max_records:
+            report.truncated = True
+            break
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            report.error(number, f"JSON 형식 오류: {e}")
+            continue
+        if not isinstance(record, dict):
+            report.error(number, "JSON 객체가 아닙니다.")
+            continue
+        type_name = record.get('type', 'entry')
+        if type_name not in batches:
+            report.error(number, f"알 수 없는 type: {type_name}")
+            continue
+        batches[type_name].append((number, record))
+        if len(batches[type_name]) >= batch_size:
+            flush(type_name)
+
+    for type_name in batches:
+        if batches[type_name]:
+            flush(type_name)
+
+    if report.entries or report.summaries:
+        rebuild_rollups(user_ids=[user.pk])
+        rebuild_hashtag_index(user_ids=[user.pk])
+        index_user_documents([user.pk])
+        transaction.on_commit(lambda: invalidate_user_payloads(user.pk))
+    return report
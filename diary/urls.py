@@ -1,19 +1,41 @@
 from django.urls import path
-from . import views
+from . import views, async_views
 
 urlpatterns = [
     # 일기 CRUD
     path('generate/', views.DiaryGenerateAPIView.as_view(), name='generate-diary'),
+    path('generate/stream/', views.DiaryGenerateStreamAPIView.as_view(), name='generate-diary-stream'),
     path('entries/', views.DiaryEntryListAPIView.as_view(), name='diary-list'),
     path('entries/<int:pk>/', views.DiaryEntryDetailAPIView.as_view(), name='diary-detail'),
     path('edit/<int:pk>/', views.DiaryEntryUpdateDeleteAPIView.as_view(), name='diary-edit'),
+    path('search/', views.DiarySearchAPIView.as_view(), name='diary-search'),
+    path('search/text/', views.search_entries_text, name='diary-search-text'),
+
+    # 해시태그 (빈도 / 태그별 일기)
+    path('hashtags/', views.hashtag_frequencies, name='hashtag-frequencies'),
+    path('hashtags/entries/', views.hashtag_entries, name='hashtag-entries'),
 
     # 하루 종합 일기 (GET + POST 통합)
     path('daily-summary/', views.daily_summary_view, name='daily-summary'),
     path('daily-summary/delete/<int:pk>/', views.delete_daily_summary, name='delete-daily-summary'),
 
+    # 내보내기 / 가져오기 (NDJSON)
+    path('export/', views.export_diaries, name='export-diaries'),
+    path('import/', views.import_diaries, name='import-diaries'),
+
+    # 백그라운드 생성 작업 상태 조회
+    path('jobs/<int:pk>/', views.generation_job_status, name='generation-job-status'),
+
     # 회고록 관련
     path('missing-summaries/', views.missing_daily_summaries, name='missing-daily-summaries'),
+    path('admin/backfill-summaries/', views.backfill_daily_summaries_view, name='backfill-daily-summaries'),
+    path('admin/llm-stats/', views.llm_stats, name='llm-stats'),
     path('monthly-retrospect/', views.monthly_retrospect, name='monthly-retrospect'),
     path('monthly-retrospect-llm/', views.MonthlyRetrospectView.as_view(), name='monthly-retrospect-llm'),
+    path('stats/timeseries/', views.emotion_timeseries_view, name='emotion-timeseries'),
+
+    # 비동기(ASGI) LLM 호출 API
+    path('async/generate/', async_views.generate_diary_view, name='async-generate-diary'),
+    path('async/daily-summary/', async_views.daily_summary_view, name='async-daily-summary'),
+    path('async/monthly-retrospect/', async_views.monthly_retrospect_view, name='async-monthly-retrospect'),
 ]
\ No newline at end of file
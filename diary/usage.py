@@ -0,0 +1,159 @@
+"""
+LLM 사용량 기록 (LLMUsage)
+
+요청 처리 중에는 메모리 버퍼에 쌓기만 하고, 백그라운드 스레드가 BATCH_SIZE 개가 모이거나
+FLUSH_INTERVAL 초가 지날 때마다 bulk_create 로 한 번에 저장한다. (요청마다 DB 쓰기가 늘지 않음)
+
+누가/어디서 호출했는지는 usage_scope 로 지정한다.
+HTTP 요청은 LLMUsageScopeMiddleware 가, 백그라운드 작업은 jobs/backfill 에서 직접 지정한다.
+"""
+import atexit
+import contextvars
+import threading
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .models import LLMUsage
+
+# LLM_USAGE_LEDGER 설정 기본값 (settings.LLM_USAGE_LEDGER 로 덮어씀)
+DEFAULT_LLM_USAGE_LEDGER = {
+    'ENABLED': True,
+    'BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 5,  # 초
+}
+
+# (user_id, endpoint) 를 돌려주는 함수 (HTTP 요청은 인증이 끝난 뒤에 사용자를 읽어야 해서 지연 평가)
+_usage_scope = contextvars.ContextVar('llm_usage_scope', default=None)
+
+
+@contextmanager
+def usage_scope(user=None, endpoint: str = ''):
+    token = _usage_scope.set(lambda: (user.pk if user is not None else None, endpoint))
+    try:
+        yield
+    finally:
+        _usage_scope.reset(token)
+
+
+def current_scope() -> tuple[int | None, str]:
+    scope = _usage_scope.get()
+    return scope() if scope else (None, '')
+
+
+def _request_scope(request):
+    def scope():
+        user = getattr(request, 'user', None)
+        user_id = user.pk if user is not None and user.is_authenticated else None
+        match = getattr(request, 'resolver_match', None)
+        return user_id, (match.url_name if match and match.url_name else request.path)[:100]
+    return scope
+
+
+class LLMUsageScopeMiddleware:
+    """
+    요청 단위로 사용량 기록 대상(사용자, URL 이름)을 지정
+    DRF 는 인증한 사용자를 원래 HttpRequest.user 에도 넣어 주므로 기록 시점에 읽으면 됨.
+    스트리밍 응답은 미들웨어가 끝난 뒤에 LLM 을 호출하므로 값을 되돌리지 않음 (다음 요청에서 덮어씀)
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        _usage_scope.set(_request_scope(request))
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        _usage_scope.set(_request_scope(request))
+        return await self.get_response(request)
+
+
+class UsageLedger:
+    def __init__(self, enabled: bool = True, batch_size: int = 100, flush_interval: float = 5):
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def record(self, model: str, prompt: str = '', prompt_tokens: int = 0, completion_tokens: int = 0,
+               latency_ms: int = 0, cache_hit: bool = False):
+        if not self.enabled:
+            return
+        user_id, endpoint = current_scope()
+        usage = LLMUsage(
+            user_id=user_id,
+            endpoint=endpoint,
+            model=model or '',
+            prompt=prompt,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            latency_ms=latency_ms,
+            cache_hit=cache_hit,
+            created_at=timezone.now(),
+        )
+        with self._lock:
+            self._buffer.append(usage)
+            full = len(self._buffer) >= self.batch_size
+            self._ensure_thread()
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return 0
+        try:
+            LLMUsage.objects.bulk_create(batch, batch_size=500)
+        except Exception as e:
+            # 사용량 기록 실패가 서비스에 영향을 주지 않도록 로그만 남김
+            print("❌ LLM 사용량 기록 오류:", str(e))
+            return 0
+        return len(batch)
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='llm-usage-ledger', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                connection.close()
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_usage_ledger() -> UsageLedger:
+    global _ledger
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                config = {**DEFAULT_LLM_USAGE_LEDGER, **getattr(settings, 'LLM_USAGE_LEDGER', {})}
+                _ledger = UsageLedger(
+                    enabled=config['ENABLED'],
+                    batch_size=config['BATCH_SIZE'],
+                    flush_interval=config['FLUSH_INTERVAL'],
+                )
+                # 프로세스 종료 시 남은 기록 저장 (관리 명령 등)
+                atexit.register(_ledger.flush)
+    return _ledger
@@ -1,18 +1,43 @@
 from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
-from .models import DiaryEntry, DailySummaryDiary
-from .serializers import DiaryEntrySerializer, DailySummarySerializer
+from rest_framework.renderers import JSONRenderer
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from .models import DiaryEntry, DailySummaryDiary, GenerationJob
+from .quotas import get_quota
+from .throttles import LLMQuotaThrottle, check_llm_quota
+from .serializers import DiaryEntrySerializer, DailySummarySerializer, GenerationJobSerializer
 from .services import (
+    DAILY_SUMMARY_MODES,
+    apply_gpt_result,
     generate_diary_with_gpt,
-    generate_monthly_summary,
+    find_monthly_retrospect,
     generate_monthly_retrospect,
-    generate_daily_summary
+    get_or_generate_monthly_retrospect,
+    llm_gateway,
+    monthly_fingerprint,
+    parse_metrics,
+    generate_daily_summary,
+    find_missing_summary_dates,
+    stream_diary_with_gpt,
+    token_usage,
 )
+from .dates import day_bounds, parse_date_param, parse_year_month
+from .jobs import enqueue_job
+from .llm_cache import get_llm_cache
+from .pagination import decode_cursor, paginate_diary_stream
+from .embeddings import KINDS, get_embedder, search_user_diaries
+from .timeseries import GRANULARITIES, MAX_POINTS, count_periods, emotion_timeseries
+from .search import entries_with_tag, normalize_tag, search_entries_fulltext, tag_frequencies
+from .read_cache import cached_payload, cached_user_payload, entry_payload_key
+from .transfer import EXPORT_TYPES, export_filename, gzip_stream, import_records, iter_export_records, iter_ndjson, open_ndjson
+from .renderers import EventStreamRenderer, format_sse
+from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
 from datetime import datetime, timedelta
-from collections import Counter
 
 
 # ======================
@@ -23,35 +48,60 @@ def regenerate_summary_if_needed(user, date):
     pass
 
 
+def is_background_request(request) -> bool:
+    # background=true 이면 LLM 호출을 워커에 맡기고 202 + job_id 반환
+    value = request.data.get('background', request.query_params.get('background'))
+    return str(value).lower() in ('1', 'true', 'yes')
+
+
+def parse_range_params(request):
+    # from / to (YYYY-MM-DD, 둘 다 포함) → (시작 날짜, 끝 날짜, 시작 시각, 끝 시각(다음 날 0시)), 형식 오류는 ValueError
+    start_day = parse_date_param(request.GET.get('from'))
+    end_day = parse_date_param(request.GET.get('to'))
+    start = day_bounds(start_day)[0] if start_day else None
+    end = day_bounds(end_day)[1] if end_day else None
+    return start_day, end_day, start, end
+
+
+def etag_matches(request, etag: str) -> bool:
+    # If-None-Match 헤더에 현재 ETag(또는 *)가 있으면 True
+    etags = parse_etags(request.headers.get('If-None-Match', ''))
+    return '*' in etags or etag in etags
+
+
+def job_accepted_response(job):
+    return Response(
+        {"job_id": job.id, "status": job.status},
+        status=status.HTTP_202_ACCEPTED,
+    )
+
+
 # ======================
 # 일기 관련 API
 # ======================
 
 class DiaryGenerateAPIView(APIView):
     permission_classes = [IsAuthenticated]
+    throttle_classes = [LLMQuotaThrottle]
 
     def post(self, request):
         user_input = request.data.get('input')
         if not user_input:
             return Response({"error": "input 값이 필요합니다."}, status=status.HTTP_400_BAD_REQUEST)
 
+        if is_background_request(request):
+            job = enqueue_job(request.user, GenerationJob.KIND_DIARY, {"input": user_input})
+            return job_accepted_response(job)
+
         gpt_result = generate_diary_with_gpt(user_input)
         if 'error' in gpt_result:
             return Response(gpt_result, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        diary_entry = DiaryEntry.objects.create(
-            user=request.user,
-            raw_input=user_input,
-            generated_diary=gpt_result.get('diary', ''),
-            emotion=gpt_result.get('emotion', ''),
-            happiness_score=gpt_result.get('happiness_score', 0),
-            joy=gpt_result.get('joy', 0),
-            anger=gpt_result.get('anger', 0),
-            sadness=gpt_result.get('sadness', 0),
-            pleasure=gpt_result.get('pleasure', 0),
-            hashtags=gpt_result.get('hashtags', []),
-            is_public=True
+        diary_entry = apply_gpt_result(
+            DiaryEntry(user=request.user, raw_input=user_input, is_public=True),
+            gpt_result,
         )
+        diary_entry.save()
 
         regenerate_summary_if_needed(request.user, diary_entry.created_at.date())
 
@@ -59,19 +109,173 @@ class DiaryGenerateAPIView(APIView):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
+class DiaryGenerateStreamAPIView(APIView):
+    """
+    GPT 스트리밍 응답을 Server-Sent Events 로 전달하는 일기 생성 API
+    - section: 구간 시작 (diary / emotion / hashtags)
+    - token: 해당 구간의 텍스트 조각
+    - done: 저장된 일기 데이터 / error: 오류
+    """
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+    throttle_classes = [LLMQuotaThrottle]
+
+    def post(self, request):
+        user_input = request.data.get('input')
+        if not user_input:
+            return Response({"error": "input 값이 필요합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(
+            self.event_stream(request.user, user_input),
+            content_type='text/event-stream',
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # nginx 버퍼링 끄기
+        return response
+
+    def event_stream(self, user, user_input):
+        try:
+            for event in stream_diary_with_gpt(user_input):
+                if event['event'] != 'result':
+                    yield format_sse(event.pop('event'), event)
+                    continue
+
+                # 스트림이 끝나면 파싱 결과로 일기 저장
+                diary_entry = apply_gpt_result(
+                    DiaryEntry(user=user, raw_input=user_input, is_public=True),
+                    event['gpt'],
+                )
+                diary_entry.save()
+                yield format_sse('done', DiaryEntrySerializer(diary_entry).data)
+
+        except Exception as e:
+            print("❌ GPT 스트리밍 오류:", str(e))
+            yield format_sse('error', {"error": f"OpenAI API 호출 중 오류: {str(e)}"})
+
+
 class DiaryEntryListAPIView(APIView):
     """
     현재 로그인한 사용자의 전체 일기 및 하루 종합 일기 목록 통합 조회 API
+
+    limit / cursor / fields 중 하나라도 주면 최신순 커서 페이지로 응답
+    - limit: 페이지 크기 (기본 50, 최대 200)
+    - cursor: 이전 응답의 next_cursor
+    - fields: 필요한 필드만 쉼표로 지정 (예: id,date,emotion,happiness_score,hashtags)
     """
     permission_classes = [IsAuthenticated]
 
+    DEFAULT_LIMIT = 50
+    MAX_LIMIT = 200
+    # fields 로 요청할 수 있는 필드 → 모델별 실제 컬럼 (date 는 일기의 경우 created_at 에서 계산)
+    ENTRY_COLUMNS = {field: field for field in DiaryEntrySerializer.Meta.fields} | {'date': 'created_at'}
+    SUMMARY_COLUMNS = {field: field for field in DailySummarySerializer.Meta.fields}
+
+    @staticmethod
+    def all_entries(user) -> list:
+        diary_entries = DiaryEntry.objects.filter(user=user)
+        summary_entries = DailySummaryDiary.objects.filter(user=user)
+        diary_data = DiaryEntrySerializer(diary_entries, many=True).data
+        summary_data = DailySummarySerializer(summary_entries, many=True).data
+        return diary_data + [dict(item, is_summary=True) for item in summary_data]
+
     def get(self, request):
+        if not {'limit', 'cursor', 'fields'} & set(request.query_params):
+            return Response(cached_user_payload(request.user.pk, 'entries', lambda: self.all_entries(request.user)))
+
+        try:
+            limit = min(int(request.query_params.get('limit', self.DEFAULT_LIMIT)), self.MAX_LIMIT)
+            cursor = request.query_params.get('cursor')
+            cursor = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            return Response({"error": "limit 또는 cursor 값이 잘못되었습니다."}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({"error": "limit는 1 이상이어야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        fields = None
+        if request.query_params.get('fields'):
+            fields = [f.strip() for f in request.query_params['fields'].split(',') if f.strip()]
+            unknown = set(fields) - set(self.ENTRY_COLUMNS) - set(self.SUMMARY_COLUMNS)
+            if unknown:
+                return Response({"error": f"알 수 없는 필드: {', '.join(sorted(unknown))}"}, status=status.HTTP_400_BAD_REQUEST)
+
         diary_entries = DiaryEntry.objects.filter(user=request.user)
         summary_entries = DailySummaryDiary.objects.filter(user=request.user)
-        diary_data = DiaryEntrySerializer(diary_entries, many=True).data
-        summary_data = DailySummarySerializer(summary_entries, many=True).data
-        combined = diary_data + [dict(item, is_summary=True) for item in summary_data]
-        return Response(combined)
+        if fields is not None:
+            # 요청한 컬럼 + 정렬 키만 읽음
+            diary_entries = diary_entries.only(
+                'id', 'created_at', *{self.ENTRY_COLUMNS[f] for f in fields if f in self.ENTRY_COLUMNS}
+            )
+            summary_entries = summary_entries.only(
+                'id', 'date', *{self.SUMMARY_COLUMNS[f] for f in fields if f in self.SUMMARY_COLUMNS}
+            )
+
+        page, next_cursor = paginate_diary_stream(diary_entries, summary_entries, limit, cursor)
+        results = [self.serialize_item(kind, obj, fields) for _, kind, obj in page]
+        return Response({"results": results, "next_cursor": next_cursor})
+
+    def serialize_item(self, kind, obj, fields):
+        is_summary = kind == 'summary'
+        if fields is None:
+            if is_summary:
+                return dict(DailySummarySerializer(obj).data, is_summary=True)
+            return DiaryEntrySerializer(obj).data
+
+        columns = self.SUMMARY_COLUMNS if is_summary else self.ENTRY_COLUMNS
+        data = {}
+        for field in fields:
+            if field not in columns:
+                continue
+            if field == 'date':
+                data['date'] = str(obj.date if is_summary else timezone.localdate(obj.created_at))
+            elif field == 'user':
+                data['user'] = obj.user_id
+            else:
+                data[field] = getattr(obj, field)
+        data['is_summary'] = is_summary
+        return data
+
+
+class DiarySearchAPIView(APIView):
+    """
+    내 일기 / 하루 종합 일기 의미 검색
+    - q: 검색어 (예: 외로웠던 날)
+    - k: 결과 수 (기본 10, 최대 50)
+    - types: entry,summary 중 쉼표로 지정 (기본 둘 다)
+    """
+    permission_classes = [IsAuthenticated]
+
+    DEFAULT_K = 10
+    MAX_K = 50
+
+    def get_throttles(self):
+        # 외부 임베딩 API 를 호출할 때만 LLM 쿼터 적용
+        return [] if get_embedder().local else [LLMQuotaThrottle()]
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"error": "q 파라미터가 필요합니다."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            k = min(int(request.query_params.get('k', self.DEFAULT_K)), self.MAX_K)
+        except ValueError:
+            return Response({"error": "k는 숫자여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+        types = [t.strip() for t in request.query_params.get('types', ','.join(KINDS)).split(',') if t.strip()]
+        if k < 1 or not types or set(types) - set(KINDS):
+            return Response({"error": f"k는 1 이상, types는 {', '.join(KINDS)} 중에서 지정해야 합니다."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        hits = search_user_diaries(request.user.pk, query, k, types)
+        entries = DiaryEntry.objects.filter(user=request.user).in_bulk([pk for kind, pk, _ in hits if kind == 'entry'])
+        summaries = DailySummaryDiary.objects.filter(user=request.user).in_bulk(
+            [pk for kind, pk, _ in hits if kind == 'summary']
+        )
+        results = []
+        for kind, pk, score in hits:
+            if kind == 'entry' and pk in entries:
+                results.append({'type': kind, 'score': round(score, 4), **DiaryEntrySerializer(entries[pk]).data})
+            elif kind == 'summary' and pk in summaries:
+                results.append({'type': kind, 'score': round(score, 4), **DailySummarySerializer(summaries[pk]).data})
+        return Response({'query': query, 'results': results})
 
 
 class DiaryEntryDetailAPIView(generics.RetrieveAPIView):
@@ -79,6 +283,14 @@ class DiaryEntryDetailAPIView(generics.RetrieveAPIView):
     serializer_class = DiaryEntrySerializer
     permission_classes = [IsAuthenticated]
 
+    def retrieve(self, request, *args, **kwargs):
+        # 일기가 수정/삭제되면 signals.py 에서 캐시를 지움 (없는 일기의 404 는 캐시하지 않음)
+        data = cached_payload(
+            entry_payload_key(self.kwargs['pk']),
+            lambda: dict(self.get_serializer(self.get_object()).data),
+        )
+        return Response(data)
+
 
 class DiaryEntryUpdateDeleteAPIView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = DiaryEntrySerializer
@@ -93,23 +305,25 @@ class DiaryEntryUpdateDeleteAPIView(generics.RetrieveUpdateDestroyAPIView):
         generated_diary = request.data.get('generated_diary')
         hashtags = request.data.get('hashtags')
 
-        print("📩 수정 요청:", request.data)
-
         if raw_input is not None:
             raw_input = raw_input.strip()
             if raw_input:
+                # 원문을 바꾸면 일기를 다시 생성하므로(LLM 호출) 이때만 쿼터 차감
+                check_llm_quota(request.user)
+                if is_background_request(request):
+                    job = enqueue_job(
+                        request.user,
+                        GenerationJob.KIND_REGENERATE,
+                        {"diary_id": diary.id, "raw_input": raw_input},
+                    )
+                    return job_accepted_response(job)
+
                 gpt_result = generate_diary_with_gpt(raw_input)
                 if 'error' in gpt_result:
                     return Response(gpt_result, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
                 diary.raw_input = raw_input
-                diary.generated_diary = gpt_result.get('diary', '')
-                diary.emotion = gpt_result.get('emotion', '')
-                diary.happiness_score = gpt_result.get('happiness_score', 0)
-                diary.joy = gpt_result.get('joy', 0)
-                diary.anger = gpt_result.get('anger', 0)
-                diary.sadness = gpt_result.get('sadness', 0)
-                diary.pleasure = gpt_result.get('pleasure', 0)
+                apply_gpt_result(diary, gpt_result)
 
         elif generated_diary is not None:
             diary.generated_diary = generated_diary
@@ -130,6 +344,7 @@ class DiaryEntryUpdateDeleteAPIView(generics.RetrieveUpdateDestroyAPIView):
 
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
+@throttle_classes([LLMQuotaThrottle.for_methods('POST')])  # 조회(GET)는 LLM 을 호출하지 않음
 def daily_summary_view(request):
     if request.method == 'GET':
         date_str = request.GET.get('date')
@@ -140,11 +355,14 @@ def daily_summary_view(request):
         except ValueError:
             return Response({"error": "날짜 형식이 잘못되었습니다."}, status=400)
         try:
-            summary = DailySummaryDiary.objects.get(user=request.user, date=date)
+            data = cached_user_payload(
+                request.user.pk,
+                f"daily-summary:{date}",
+                lambda: dict(DailySummarySerializer(DailySummaryDiary.objects.get(user=request.user, date=date)).data),
+            )
         except DailySummaryDiary.DoesNotExist:
             return Response({"error": "해당 날짜의 하루 종합 일기가 없습니다."}, status=404)
-        serializer = DailySummarySerializer(summary)
-        return Response(serializer.data)
+        return Response(data)
 
     elif request.method == 'POST':
         date_str = request.data.get('date')
@@ -155,28 +373,268 @@ def daily_summary_view(request):
         except ValueError:
             return Response({"error": "날짜 형식이 잘못되었습니다."}, status=400)
 
-        summary_data = generate_daily_summary(request.user, date)
+        # full: 하루 일기 전체로 재생성 / incremental: 기존 요약 이후 추가된 일기만 반영
+        mode = request.data.get('mode', 'full')
+        if mode not in DAILY_SUMMARY_MODES:
+            return Response({"error": "mode는 full 또는 incremental 이어야 합니다."}, status=400)
+
+        if is_background_request(request):
+            job = enqueue_job(request.user, GenerationJob.KIND_DAILY_SUMMARY, {"date": str(date), "mode": mode})
+            return job_accepted_response(job)
+
+        summary_data = generate_daily_summary(request.user, date, mode)
         return Response(summary_data)
 
 
+# ======================
+# 백그라운드 작업 API
+# ======================
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def generation_job_status(request, pk):
+    try:
+        job = GenerationJob.objects.get(pk=pk, user=request.user)
+    except GenerationJob.DoesNotExist:
+        return Response({"error": "작업을 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
+
+    serializer = GenerationJobSerializer(job)
+    return Response(serializer.data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_entries_text(request):
+    """
+    내 일기 원문(raw_input) / 생성된 일기(generated_diary) 전문 검색 (관련도 순)
+    - q: 검색어, 모든 단어가 들어 있는 일기만 (단어는 앞부분만 맞아도 됨: 외로 → 외로운, 외로웠다)
+    - limit: 결과 수 (기본 20, 최대 100)
+    """
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return Response({"error": "q 파라미터가 필요합니다."}, status=400)
+    try:
+        limit = min(int(request.GET.get('limit', 20)), 100)
+    except ValueError:
+        return Response({"error": "limit는 숫자여야 합니다."}, status=400)
+    if limit < 1:
+        return Response({"error": "limit는 1 이상이어야 합니다."}, status=400)
+
+    ids = search_entries_fulltext(request.user, query, limit)
+    entries = DiaryEntry.objects.filter(user=request.user).in_bulk(ids)
+    results = [DiaryEntrySerializer(entries[pk]).data for pk in ids if pk in entries]
+    return Response({"query": query, "results": results})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def hashtag_frequencies(request):
+    """
+    기간 안의 내 일기 해시태그 빈도 (많은 순)
+    - from / to: 기간 (YYYY-MM-DD, 선택)
+    - limit: 상위 N개 (선택)
+    """
+    try:
+        start_day, end_day, start, end = parse_range_params(request)
+        limit = int(request.GET['limit']) if 'limit' in request.GET else None
+    except ValueError:
+        return Response({"error": "파라미터 형식이 잘못되었습니다."}, status=400)
+    if limit is not None and limit < 1:
+        return Response({"error": "limit는 1 이상이어야 합니다."}, status=400)
+
+    def build():
+        return [{"tag": tag, "count": count} for tag, count in tag_frequencies(request.user, start, end, limit)]
+
+    hashtags = cached_user_payload(request.user.pk, f"hashtags:{start_day}:{end_day}:{limit}", build)
+    return Response({
+        "from": str(start_day) if start_day else None,
+        "to": str(end_day) if end_day else None,
+        "hashtags": hashtags,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def hashtag_entries(request):
+    """
+    해시태그가 달린 내 일기 목록 (최신순 커서 페이지)
+    - tag: 해시태그 (# 없이, 있어도 됨)
+    - from / to: 기간 (YYYY-MM-DD, 선택)
+    - limit: 페이지 크기 (기본 50, 최대 200), cursor: 이전 응답의 next_cursor
+    """
+    tag = normalize_tag(request.GET.get('tag', ''))
+    if not tag:
+        return Response({"error": "tag 파라미터가 필요합니다."}, status=400)
+    try:
+        _, _, start, end = parse_range_params(request)
+        limit = min(int(request.GET.get('limit', DiaryEntryListAPIView.DEFAULT_LIMIT)), DiaryEntryListAPIView.MAX_LIMIT)
+        cursor = request.GET.get('cursor')
+        cursor = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        return Response({"error": "파라미터 형식이 잘못되었습니다."}, status=400)
+    if limit < 1:
+        return Response({"error": "limit는 1 이상이어야 합니다."}, status=400)
+
+    entries = entries_with_tag(request.user, tag, start, end)
+    page, next_cursor = paginate_diary_stream(entries, DailySummaryDiary.objects.none(), limit, cursor)
+    return Response({
+        "tag": tag,
+        "results": [DiaryEntrySerializer(entry).data for _, _, entry in page],
+        "next_cursor": next_cursor,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def emotion_timeseries_view(request):
+    """
+    기간별 일기 수 / 행복지수 / 감정 평균 추이 (필드별 배열)
+    - from / to: 기간 (YYYY-MM-DD, 둘 다 포함, 기본 오늘까지 1년)
+    - granularity: day / week / month (기본 day)
+    - window: 이동 평균 구간 수 (선택, 2 이상)
+    """
+    granularity = request.GET.get('granularity', 'day')
+    if granularity not in GRANULARITIES:
+        return Response({"error": f"granularity는 {', '.join(GRANULARITIES)} 중 하나여야 합니다."}, status=400)
+    try:
+        end = parse_date_param(request.GET.get('to')) or timezone.localdate()
+        start = parse_date_param(request.GET.get('from')) or end - timedelta(days=364)
+        window = int(request.GET['window']) if request.GET.get('window') else None
+    except ValueError:
+        return Response({"error": "파라미터 형식이 잘못되었습니다."}, status=400)
+    if start > end:
+        return Response({"error": "from은 to보다 늦을 수 없습니다."}, status=400)
+    if window is not None and window < 2:
+        return Response({"error": "window는 2 이상이어야 합니다."}, status=400)
+    if count_periods(start, end, granularity) > MAX_POINTS:
+        return Response({"error": f"구간 수가 {MAX_POINTS}개를 넘습니다. 기간을 줄이거나 granularity를 늘려주세요."},
+                        status=400)
+
+    return Response(cached_user_payload(
+        request.user.pk,
+        f"timeseries:{start}:{end}:{granularity}:{window}",
+        lambda: emotion_timeseries(request.user, start, end, granularity, window),
+    ))
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def missing_daily_summaries(request):
-    user = request.user
-    first_entry = DiaryEntry.objects.filter(user=user).order_by("created_at").first()
-    if not first_entry:
-        return Response({"missing_daily_summaries": []})
+    # from / to: 조회 범위 (YYYY-MM-DD, 선택), page / page_size: 페이지 단위 조회 (선택)
+    try:
+        start = parse_date_param(request.GET.get('from'))
+        end = parse_date_param(request.GET.get('to'))
+        page = int(request.GET.get('page', 1))
+        page_size = int(request.GET['page_size']) if 'page_size' in request.GET else None
+    except ValueError:
+        return Response({"error": "파라미터 형식이 잘못되었습니다."}, status=400)
+    if page < 1 or (page_size is not None and page_size < 1):
+        return Response({"error": "page, page_size는 1 이상이어야 합니다."}, status=400)
+
+    missing_dates = find_missing_summary_dates(request.user, start, end)
+    count = len(missing_dates)
+
+    next_page = None
+    if page_size is not None:
+        offset = (page - 1) * page_size
+        if offset + page_size < count:
+            next_page = page + 1
+        missing_dates = missing_dates[offset:offset + page_size]
+
+    return Response({
+        "missing_daily_summaries": [str(day) for day in missing_dates],
+        "count": count,
+        "next_page": next_page,
+    })
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def backfill_daily_summaries_view(request):
+    # 관리자용: 빠진 하루 종합 일기 일괄 생성을 백그라운드 작업으로 등록 (진행 결과는 jobs/<id>/ 로 조회)
+    try:
+        start = parse_date_param(request.data.get('from'))
+        end = parse_date_param(request.data.get('to'))
+        user_ids = [int(user_id) for user_id in request.data.get('user_ids') or []]
+        concurrency = int(request.data.get('concurrency', 4))
+        rate = float(request.data['rate']) if request.data.get('rate') else None
+    except (TypeError, ValueError):
+        return Response({"error": "파라미터 형식이 잘못되었습니다."}, status=400)
+    mode = request.data.get('mode', 'full')
+    if mode not in DAILY_SUMMARY_MODES:
+        return Response({"error": "mode는 full 또는 incremental 이어야 합니다."}, status=400)
+    if concurrency < 1:
+        return Response({"error": "concurrency는 1 이상이어야 합니다."}, status=400)
+
+    job = enqueue_job(request.user, GenerationJob.KIND_SUMMARY_BACKFILL, {
+        'from': str(start) if start else None,
+        'to': str(end) if end else None,
+        'user_ids': user_ids,
+        'concurrency': concurrency,
+        'rate': rate,
+        'mode': mode,
+    })
+    return job_accepted_response(job)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_diaries(request):
+    """
+    내 일기 / 하루 종합 일기 전체를 NDJSON 으로 내려받기
+    - types: entry,summary 중 쉼표로 지정 (기본 둘 다)
+    - gzip: true 면 gzip 압축
+    """
+    types = [t.strip() for t in request.query_params.get('types', ','.join(EXPORT_TYPES)).split(',') if t.strip()]
+    unknown = set(types) - set(EXPORT_TYPES)
+    if unknown or not types:
+        return Response({"error": f"types는 {', '.join(EXPORT_TYPES)} 중에서 지정해야 합니다."}, status=400)
+    compress = str(request.query_params.get('gzip', '')).lower() in ('1', 'true', 'yes')
+
+    stream = iter_ndjson(iter_export_records(request.user, types))
+    response = StreamingHttpResponse(
+        gzip_stream(stream) if compress else stream,
+        content_type='application/gzip' if compress else 'application/x-ndjson',
+    )
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(request.user, compress)}"'
+    return response
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def import_diaries(request):
+    """
+    NDJSON(gzip 가능) 파일(file)을 내 일기로 가져오기 (최대 DIARY_IMPORT_MAX_RECORDS 개)
+    - generate: false 면 생성된 일기가 없는 레코드는 LLM 을 호출하지 않고 건너뜀 (기본 true)
+    - regenerate: true 면 생성된 일기가 있어도 원문으로 다시 생성
+    LLM 으로 생성하는 레코드마다 LLM 쿼터를 1회씩 차감하고, 한도를 넘은 레코드는 건너뜀
+    기록이 많으면 import_diaries 관리 명령을 사용
+    """
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({"error": "file 이 필요합니다."}, status=400)
+    generate = str(request.data.get('generate', 'true')).lower() in ('1', 'true', 'yes')
+    regenerate = str(request.data.get('regenerate', '')).lower() in ('1', 'true', 'yes')
 
-    start_date = first_entry.created_at.date()
-    end_date = datetime.now().date()
-    missing_dates = []
+    quota = get_quota()
+    report = import_records(
+        request.user, open_ndjson(upload), generate=generate, regenerate=regenerate,
+        max_records=getattr(settings, 'DIARY_IMPORT_MAX_RECORDS', 5000),
+        admit=lambda: quota.admit(request.user),
+    )
+    return Response(report.as_dict())
 
-    for day in (start_date + timedelta(days=n) for n in range((end_date - start_date).days + 1)):
-        if DiaryEntry.objects.filter(user=user, created_at__date=day).exists():
-            if not DailySummaryDiary.objects.filter(user=user, date=day).exists():
-                missing_dates.append(str(day))
 
-    return Response({"missing_daily_summaries": missing_dates})
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def llm_stats(request):
+    # 관리자용: 현재 프로세스의 LLM 호출 현황 (토큰 사용량, 응답 형식별 파싱 실패율, 캐시, 서킷 상태)
+    return Response({
+        "token_usage": token_usage.snapshot(),
+        "parse": parse_metrics.snapshot(),
+        "cache": get_llm_cache().stats(),
+        "circuit": llm_gateway.breaker.state,
+    })
 
 
 @api_view(['DELETE'])
@@ -198,58 +656,42 @@ def delete_daily_summary(request, pk):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def monthly_retrospect(request):
-    year = int(request.GET.get('year'))
-    month = int(request.GET.get('month'))
+    try:
+        year, month = parse_year_month(request.GET)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
     user = request.user
 
-    entries = DiaryEntry.objects.filter(user=user, created_at__year=year, created_at__month=month)
-    if not entries.exists():
+    # 일기가 바뀌지 않았으면 저장된 회고를 그대로 사용 (클라이언트가 같은 ETag 를 보내면 304)
+    fingerprint = monthly_fingerprint(user, year, month)
+    if fingerprint is None:
         return Response({"message": "해당 월의 일기가 없습니다."}, status=404)
 
-    total_happy = sum(e.happiness_score or 0 for e in entries)
-    avg_happy = round(total_happy / entries.count(), 1)
+    etag = quote_etag(fingerprint)
+    if etag_matches(request, etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
 
-    total_joy = sum(e.joy or 0 for e in entries)
-    total_anger = sum(e.anger or 0 for e in entries)
-    total_sadness = sum(e.sadness or 0 for e in entries)
-    total_pleasure = sum(e.pleasure or 0 for e in entries)
-
-    avg_emotions = {
-        "joy": round(total_joy / entries.count()),
-        "anger": round(total_anger / entries.count()),
-        "sadness": round(total_sadness / entries.count()),
-        "pleasure": round(total_pleasure / entries.count())
-    }
-
-    all_tags = [tag for e in entries for tag in e.hashtags or []]
-    top_tags = [tag for tag, _ in Counter(all_tags).most_common(5)]
-
-    highlight = max(entries, key=lambda e: e.happiness_score or 0)
-    summary = generate_monthly_summary([e.generated_diary for e in entries])
-
-    return Response({
-        "year": year,
-        "month": month,
-        "average_happiness": avg_happy,
-        "average_emotions": avg_emotions,
-        "top_hashtags": top_tags,
-        "summary": summary,
-        "highlight_entry": {
-            "id": highlight.id,
-            "created_at": highlight.created_at,
-            "generated_diary": highlight.generated_diary,
-            "happiness_score": highlight.happiness_score,
-            "emotion": highlight.emotion,
-            "hashtags": highlight.hashtags
-        }
-    })
+    retrospect = find_monthly_retrospect(user, year, month, fingerprint)
+    if retrospect is None:
+        # 저장된 회고가 없을 때만 LLM 을 호출하므로 이때만 쿼터 차감
+        check_llm_quota(user)
+        retrospect = get_or_generate_monthly_retrospect(user, year, month, fingerprint)
+    if retrospect is None:
+        return Response({"message": "해당 월의 일기가 없습니다."}, status=404)
+    return Response(retrospect.payload, headers={"ETag": etag})
 
 
 class MonthlyRetrospectView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        year = int(request.query_params.get("year", datetime.now().year))
-        month = int(request.query_params.get("month", datetime.now().month))
+        now = datetime.now()
+        try:
+            year, month = parse_year_month({
+                "year": request.query_params.get("year", now.year),
+                "month": request.query_params.get("month", now.month),
+            })
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         result = generate_monthly_retrospect(request.user, year, month)
         return Response(result)
\ No newline at end of file
@@ -0,0 +1,31 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from diary.read_cache import get_cached_auth_user, set_cached_auth_user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication 과 같지만 토큰의 사용자를 캐시에서 먼저 찾아 요청마다 사용자 조회 쿼리를 생략
+    (사용자가 저장/삭제되면 users/signals.py 에서 캐시를 지움, 공유 캐시가 아니면 캐시하지 않음)
+    """
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        cached = get_cached_auth_user(user_id) if user_id is not None else None
+        if cached is None:
+            user = super().get_user(validated_token)
+            set_cached_auth_user(user_id, user, get_md5_hash_password(user.password))
+            return user
+
+        # 캐시에서 꺼낸 사용자도 simplejwt 와 같은 검사를 거침
+        user, password_digest = cached
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != password_digest:
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
@@ -0,0 +1,24 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from diary.read_cache import invalidate_auth_user
+
+User = get_user_model()
+
+
+@receiver(pre_save, sender=User)
+def remember_previous_user_id(sender, instance, raw=False, **kwargs):
+    # 인증 캐시 키는 토큰의 user_id(로그인 아이디)라서 아이디가 바뀌면 이전 키도 지워야 함
+    if raw or instance.pk is None:
+        return
+    instance._previous_user_id = User.objects.filter(pk=instance.pk).values_list('user_id', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_auth_user(sender, instance, **kwargs):
+    # 비활성화, 비밀번호 변경 등이 다음 요청부터 바로 반영되도록 인증 캐시 삭제
+    user_ids = {instance.user_id, getattr(instance, '_previous_user_id', None)} - {None}
+    transaction.on_commit(lambda: [invalidate_auth_user(user_id) for user_id in user_ids])
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import RegisterView, LoginView, AdminUserListView, UserListAPIView, UserUpdateAPIView, UserDeleteAPIView
+from .views import RegisterView, LoginView, AdminUserListView, AdminLLMUsageView, UserListAPIView, UserUpdateAPIView, UserDeleteAPIView
 
 urlpatterns = [
     path("register/", RegisterView.as_view(), name="register"),
@@ -11,6 +11,7 @@ urlpatterns = [
 
 urlpatterns += [
     path('admin/custom-users/', AdminUserListView.as_view(), name='admin-user-list'),
+    path('admin/llm-usage/', AdminLLMUsageView.as_view(), name='admin-llm-usage'),
 ]
 
 urlpatterns += [
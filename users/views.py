@@ -4,8 +4,12 @@ from django.contrib.auth import get_user_model
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAdminUser
+from django.db.models import Avg, Count, Q, Sum
+from django.db.models.functions import TruncDate
 from rest_framework_simplejwt.views import TokenObtainPairView
 from .serializers import UserAdminListSerializer, UserListSerializer
+from diary.models import LLMUsage
+from diary.dates import day_bounds, parse_date_param
 
 
 
@@ -26,6 +30,66 @@ class AdminUserListView(APIView):
         serializer = UserAdminListSerializer(users, many=True)
         return Response(serializer.data)
 
+class AdminLLMUsageView(APIView):
+    """
+    관리자용: 기간별 LLM 사용량 집계
+    ?from=YYYY-MM-DD&to=YYYY-MM-DD&group_by=user|endpoint|model|prompt|day
+    """
+    permission_classes = [IsAdminUser]
+
+    GROUP_FIELDS = {
+        'user': 'user_id',
+        'endpoint': 'endpoint',
+        'model': 'model',
+        'prompt': 'prompt',
+        'day': 'day',
+    }
+
+    def get(self, request):
+        group_by = request.query_params.get('group_by', 'user')
+        if group_by not in self.GROUP_FIELDS:
+            return Response({"error": f"group_by는 {', '.join(self.GROUP_FIELDS)} 중 하나여야 합니다."}, status=400)
+        try:
+            start = parse_date_param(request.query_params.get('from'))
+            end = parse_date_param(request.query_params.get('to'))
+        except ValueError:
+            return Response({"error": "날짜 형식은 YYYY-MM-DD 입니다."}, status=400)
+
+        usage = LLMUsage.objects.all()
+        if start:
+            usage = usage.filter(created_at__gte=day_bounds(start)[0])
+        if end:
+            usage = usage.filter(created_at__lt=day_bounds(end)[1])
+        if group_by == 'day':
+            usage = usage.annotate(day=TruncDate('created_at'))
+
+        field = self.GROUP_FIELDS[group_by]
+        rows = usage.values(field).annotate(
+            calls=Count('id'),
+            cache_hits=Count('id', filter=Q(cache_hit=True)),
+            prompt_tokens=Sum('prompt_tokens'),
+            completion_tokens=Sum('completion_tokens'),
+            avg_latency_ms=Avg('latency_ms', filter=Q(cache_hit=False)),
+        ).order_by(field)
+
+        return Response({
+            'from': str(start) if start else None,
+            'to': str(end) if end else None,
+            'group_by': group_by,
+            'results': [
+                {
+                    group_by: row[field],
+                    'calls': row['calls'],
+                    'cache_hits': row['cache_hits'],
+                    'prompt_tokens': row['prompt_tokens'] or 0,
+                    'completion_tokens': row['completion_tokens'] or 0,
+                    'total_tokens': (row['prompt_tokens'] or 0) + (row['completion_tokens'] or 0),
+                    'avg_latency_ms': round(row['avg_latency_ms'] or 0),
+                }
+                for row in rows
+            ],
+        })
+
 class UserListAPIView(generics.ListAPIView):
     permission_classes = [permissions.IsAdminUser]
     serializer_class = UserListSerializer